@@ -0,0 +1,225 @@
+"""Mock OpenAI-Compatible LLM Server
+A local stand-in for the chat completions API, so the summarizer can be load
+tested without a paid model. Point the app at it with
+`BASE_URL=http://127.0.0.1:8100/v1`.
+
+Latency, streaming speed and failures are configurable:
+
+    python -m benchmarks.mock_llm --port 8100 --latency lognormal:0.8:0.4 \
+        --token-rate 50 --error-rate 0.01 --rate-limit-rate 0.02
+
+Latency specs: `fixed:SEC`, `uniform:LOW:HIGH`, `normal:MEAN:STD` and
+`lognormal:MEDIAN:SIGMA`. For streamed calls the latency is the time to the
+first token; further tokens follow at `--token-rate` tokens per second.
+
+Key Components:
+- LatencyDistribution: Samples per-call latencies from a spec string.
+- MockConfig: Server behaviour (latency, reply length, error injection).
+- create_app: FastAPI app serving `/v1/chat/completions` and `/mock/stats`.
+"""
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+WORDS = ("the event was attended by local leaders who raised demands about employment education "
+         "housing and inflation and the gathering concluded peacefully after the speeches").split()
+
+
+class LatencyDistribution:
+    """
+    Per-call latency (sec) drawn from a named distribution.
+    """
+
+    def __init__(self, spec: str = "fixed:0"):
+        kind, *params = spec.split(":")
+        self.spec = spec
+        self.kind = kind
+        self.params = [float(param) for param in params]
+        if kind not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution '{kind}'")
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            value = self.params[0] if self.params else 0.0
+        elif self.kind == "uniform":
+            value = rng.uniform(*self.params)
+        elif self.kind == "normal":
+            value = rng.gauss(*self.params)
+        else:
+            median, sigma = self.params
+            value = median * rng.lognormvariate(0, sigma)
+        return max(0.0, value)
+
+
+@dataclass
+class MockConfig:
+    """
+    Behaviour of the mock server.
+
+    Attributes:
+        latency (str): Latency spec of non-streamed calls and of the first streamed token.
+        token_rate (float): Streamed tokens per second (0 sends them at once).
+        reply_tokens (int): Words per reply, capped by the request's `max_tokens`.
+        error_rate (float): Fraction of calls failing with a 500.
+        rate_limit_rate (float): Fraction of calls rejected with a 429.
+        retry_after (float): `Retry-After` seconds sent with 429s.
+        seed (Optional[int]): Seed for reproducible latencies and failures.
+    """
+    latency: str = "fixed:0.2"
+    token_rate: float = 50.0
+    reply_tokens: int = 120
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: float = 1.0
+    seed: Optional[int] = None
+
+
+@dataclass
+class MockStats:
+    calls: int = 0
+    streamed: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latencies: List[float] = field(default_factory=list, repr=False)
+
+
+def _reply(length: int) -> List[str]:
+    return [WORDS[i % len(WORDS)] for i in range(length)]
+
+
+def _error(status: int, kind: str, message: str, headers: Optional[Dict] = None) -> JSONResponse:
+    return JSONResponse({"error": {"message": message, "type": kind, "code": status}},
+                        status_code=status, headers=headers)
+
+
+def create_app(config: MockConfig) -> FastAPI:
+    """
+    Builds the mock server for `config`.
+    """
+    app = FastAPI(title="Mock LLM")
+    rng = random.Random(config.seed)
+    latency = LatencyDistribution(config.latency)
+    app.state.stats = MockStats()
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats: MockStats = app.state.stats
+        stats.calls += 1
+        draw = rng.random()
+        if draw < config.rate_limit_rate:
+            stats.rate_limited += 1
+            return _error(429, "rate_limit_exceeded", "Rate limit reached (mock)",
+                          {"retry-after": str(config.retry_after)})
+        if draw < config.rate_limit_rate + config.error_rate:
+            stats.errors += 1
+            return _error(500, "server_error", "Injected failure (mock)")
+
+        prompt_tokens = sum(len(str(message.get("content", ""))) for message in body.get("messages", [])) // 4
+        words = _reply(min(config.reply_tokens, body.get("max_tokens") or config.reply_tokens))
+        stats.prompt_tokens += prompt_tokens
+        stats.completion_tokens += len(words)
+        delay = latency.sample(rng)
+        stats.latencies.append(delay)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        model = body.get("model") or "mock-model"
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(words),
+                 "total_tokens": prompt_tokens + len(words)}
+
+        if not body.get("stream"):
+            await asyncio.sleep(delay)
+            return {
+                "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": " ".join(words)}}],
+                "usage": usage,
+            }
+
+        stats.streamed += 1
+
+        async def stream():
+            await asyncio.sleep(delay)
+            for i, word in enumerate(words):
+                if i and config.token_rate:
+                    await asyncio.sleep(1 / config.token_rate)
+                chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                         "model": model,
+                         "choices": [{"index": 0, "finish_reason": None,
+                                      "delta": {"content": word if i == 0 else " " + word}}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+            done = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "finish_reason": "stop", "delta": {}}]}
+            yield f"data: {json.dumps(done)}\n\n"
+            if (body.get("stream_options") or {}).get("include_usage"):
+                usage_chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                               "model": model, "choices": [], "usage": usage}
+                yield f"data: {json.dumps(usage_chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    @app.get("/v1/models")
+    async def list_models():
+        # Used by health checks
+        return {"object": "list", "data": [{"id": "mock-model", "object": "model", "created": 0,
+                                            "owned_by": "mock"}]}
+
+    @app.get("/mock/stats")
+    async def get_stats():
+        stats = asdict(app.state.stats)
+        stats.pop("latencies")
+        return {**stats, "config": asdict(config)}
+
+    @app.post("/mock/reset")
+    async def reset_stats():
+        app.state.stats = MockStats()
+        return {"reset": True}
+
+    return app
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """
+    Adds the mock behaviour options to a parser (shared with the benchmark harness).
+    """
+    defaults = MockConfig()
+    parser.add_argument("--latency", default=defaults.latency, help="Latency spec, e.g. lognormal:0.8:0.4")
+    parser.add_argument("--token-rate", type=float, default=defaults.token_rate, help="Streamed tokens per second")
+    parser.add_argument("--reply-tokens", type=int, default=defaults.reply_tokens, help="Words per reply")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate, help="Fraction of 500 responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=defaults.rate_limit_rate,
+                        help="Fraction of 429 responses")
+    parser.add_argument("--retry-after", type=float, default=defaults.retry_after, help="Retry-After sent with 429s")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible runs")
+
+
+def config_from_args(args: argparse.Namespace) -> MockConfig:
+    return MockConfig(latency=args.latency, token_rate=args.token_rate, reply_tokens=args.reply_tokens,
+                      error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+                      retry_after=args.retry_after, seed=args.seed)
+
+
+def main(argv: Optional[List[str]] = None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible chat completions server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    uvicorn.run(create_app(config_from_args(args)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""Summarizer Benchmark Harness
+Drives `/summarizer/v1/summarize` with synthetic documents at a fixed
+concurrency and reports latency percentiles, time to first token (streamed
+runs), LLM calls per document, throughput and memory use. Results are saved
+as JSON and can be compared with an earlier run.
+
+By default the harness starts the mock LLM server and the app itself (both
+via uvicorn), with the app's response cache disabled so every run does the
+same work:
+
+    python -m benchmarks.run --documents 32 --concurrency 8 --paragraphs 200 \
+        --stream --latency lognormal:0.5:0.3 --output results/stream.json
+
+    python -m benchmarks.run ... --baseline results/stream.json
+
+Use `--url` to drive an app that is already running; LLM call counts are then
+read from `--mock-url`, and server memory from `--server-pid`.
+
+Key Components:
+- make_document: Reproducible synthetic paragraphs.
+- percentiles: p50/p95/p99 summary of samples.
+- run_benchmark: Sends the documents and collects per-request measurements.
+- compare: Prints relative changes against a baseline result file.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import resource
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.mock_llm import WORDS, add_arguments
+
+SUMMARIZE_PATH = "/summarizer/v1/summarize"
+
+
+def make_document(index: int, paragraphs: int, words_per_paragraph: int = 80) -> List[str]:
+    """
+    Returns reproducible, document-specific paragraphs.
+    """
+    rng = random.Random(index)
+    return [f"Document {index} paragraph {p}: " + " ".join(rng.choice(WORDS) for _ in range(words_per_paragraph))
+            for p in range(paragraphs)]
+
+
+def percentiles(samples: List[float]) -> Optional[Dict[str, float]]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+
+    def at(percentile: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))]
+
+    return {"p50": at(50), "p95": at(95), "p99": at(99), "mean": sum(ordered) / len(ordered),
+            "max": ordered[-1]}
+
+
+def rss_mb(pid: int) -> Optional[float]:
+    """
+    Resident memory of a process in MiB, read from /proc (Linux only).
+    """
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+async def sample_rss(pid: int, peak: Dict[str, float], interval: float = 0.25):
+    while True:
+        current = rss_mb(pid)
+        if current is not None:
+            peak["peak"] = max(peak.get("peak", 0.0), current)
+            peak.setdefault("start", current)
+        await asyncio.sleep(interval)
+
+
+async def summarize_once(client: httpx.AsyncClient, url: str, payload: Dict) -> Dict:
+    """
+    Sends one request and measures its latency, and for streamed requests the
+    time until the first final summary token.
+    """
+    start = time.monotonic()
+    ttft = None
+    ok = False
+    if payload["stream"]:
+        async with client.stream("POST", url, json=payload) as response:
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                event = json.loads(line[6:])
+                if event["type"] == "final_summary" and ttft is None:
+                    ttft = time.monotonic() - start
+                elif event["type"] in ("completed", "error"):
+                    ok = event["type"] == "completed"
+    else:
+        response = await client.post(url, json=payload)
+        ok = response.status_code == 200
+    return {"latency": time.monotonic() - start, "ttft": ttft, "ok": ok}
+
+
+async def run_benchmark(url: str, documents: int, concurrency: int, paragraphs: int, stream: bool,
+                        request_options: Dict) -> List[Dict]:
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(timeout=None, limits=limits) as client:
+        async def one(index: int) -> Dict:
+            async with semaphore:
+                payload = {"paragraphs": make_document(index, paragraphs), "stream": stream, **request_options}
+                try:
+                    return await summarize_once(client, url + SUMMARIZE_PATH, payload)
+                except httpx.HTTPError as e:
+                    return {"latency": None, "ttft": None, "ok": False, "error": repr(e)}
+
+        return await asyncio.gather(*[one(index) for index in range(documents)])
+
+
+def wait_until_up(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def start_servers(args: argparse.Namespace) -> List[subprocess.Popen]:
+    """
+    Starts the mock LLM and the app as subprocesses wired to each other.
+    """
+    mock_args = ["--port", str(args.mock_port), "--latency", args.latency, "--token-rate", str(args.token_rate),
+                 "--reply-tokens", str(args.reply_tokens), "--error-rate", str(args.error_rate),
+                 "--rate-limit-rate", str(args.rate_limit_rate), "--retry-after", str(args.retry_after)]
+    if args.seed is not None:
+        mock_args += ["--seed", str(args.seed)]
+    mock = subprocess.Popen([sys.executable, "-m", "benchmarks.mock_llm", *mock_args])
+    env = {**os.environ, "BASE_URL": f"http://127.0.0.1:{args.mock_port}/v1", "OPENAI_API_KEY": "mock-key",
+           "LLM_MODEL": "mock-model", "LLM_CACHE_BACKEND": "none",
+           "RESULT_STORE_BACKEND": "none", "OTEL_EXPORTER": "none"}
+    app = subprocess.Popen([sys.executable, "-m", "uvicorn", "src.endpoints:app", "--port", str(args.app_port),
+                            "--log-level", "warning"], env=env)
+    wait_until_up(f"{args.mock_url}/mock/stats")
+    wait_until_up(f"{args.url}/summarizer/v1/stats")
+    return [mock, app]
+
+
+def compare(result: Dict, baseline: Dict):
+    """
+    Prints current vs. baseline values of the headline metrics.
+    """
+    rows = [("latency p50", ("latency", "p50")), ("latency p95", ("latency", "p95")),
+            ("latency p99", ("latency", "p99")), ("ttft p50", ("ttft", "p50")),
+            ("ttft p95", ("ttft", "p95")), ("llm calls/doc", ("llm_calls_per_document",)),
+            ("docs/sec", ("throughput (docs/sec)",)), ("server rss peak", ("rss_mb", "server_peak"))]
+    for label, path in rows:
+        current, previous = result, baseline
+        for key in path:
+            current = current.get(key) if isinstance(current, dict) else None
+            previous = previous.get(key) if isinstance(previous, dict) else None
+        if current is None or previous is None:
+            continue
+        change = (current - previous) / previous * 100 if previous else 0.0
+        print(f"{label:>16}: {previous:10.3f} -> {current:10.3f} ({change:+.1f}%)")
+
+
+async def main_async(args: argparse.Namespace) -> Dict:
+    request_options = json.loads(args.request_options) if args.request_options else {}
+    server_pid = args.server_pid
+    processes = [] if args.external else start_servers(args)
+    if processes:
+        server_pid = processes[1].pid
+    rss = {}
+    sampler = asyncio.create_task(sample_rss(server_pid, rss)) if server_pid else None
+    try:
+        async with httpx.AsyncClient() as client:
+            calls_before = (await client.get(f"{args.mock_url}/mock/stats")).json()["calls"] if args.mock_url else None
+            started = time.monotonic()
+            results = await run_benchmark(args.url, args.documents, args.concurrency, args.paragraphs,
+                                          args.stream, request_options)
+            elapsed = time.monotonic() - started
+            mock_stats = (await client.get(f"{args.mock_url}/mock/stats")).json() if args.mock_url else None
+    finally:
+        if sampler:
+            sampler.cancel()
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    completed = [r for r in results if r["ok"]]
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {"documents": args.documents, "concurrency": args.concurrency, "paragraphs": args.paragraphs,
+                   "stream": args.stream, "request_options": request_options,
+                   "mock": mock_stats["config"] if mock_stats else None},
+        "requests": len(results),
+        "failed": len(results) - len(completed),
+        "latency": percentiles([r["latency"] for r in completed]),
+        "ttft": percentiles([r["ttft"] for r in completed if r["ttft"] is not None]),
+        "llm_calls_per_document": ((mock_stats["calls"] - calls_before) / len(results)
+                                   if mock_stats and results else None),
+        "llm_stats": mock_stats,
+        "throughput (docs/sec)": len(completed) / elapsed if elapsed else None,
+        "elapsed (sec)": elapsed,
+        "rss_mb": {"server_start": rss.get("start"), "server_peak": rss.get("peak"),
+                   "harness_peak": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024},
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark the summarizer against a mock LLM.")
+    parser.add_argument("--documents", type=int, default=16, help="Documents to summarize")
+    parser.add_argument("--concurrency", type=int, default=4, help="Documents in flight at once")
+    parser.add_argument("--paragraphs", type=int, default=100, help="Paragraphs per document")
+    parser.add_argument("--stream", action="store_true", help="Request SSE streams and measure TTFT")
+    parser.add_argument("--request-options", help="JSON merged into every payload, e.g. '{\"primary_chunk_size\": 20}'")
+    parser.add_argument("--url", help="Running app to benchmark; by default the app and mock are started")
+    parser.add_argument("--mock-url", help="Mock LLM used by a running app, for call counts")
+    parser.add_argument("--server-pid", type=int, help="PID of a running app, for memory sampling")
+    parser.add_argument("--app-port", type=int, default=8109)
+    parser.add_argument("--mock-port", type=int, default=8100)
+    parser.add_argument("--output", help="Write the results JSON here")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    args.external = args.url is not None
+    if not args.external:
+        args.url = f"http://127.0.0.1:{args.app_port}"
+        args.mock_url = f"http://127.0.0.1:{args.mock_port}"
+
+    result = asyncio.run(main_async(args))
+    print(json.dumps(result, indent=2))
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(result, indent=2))
+    if args.baseline:
+        compare(result, json.loads(Path(args.baseline).read_text()))
+    return 0 if result["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,110 @@
-from opentelemetry import trace
+"""OpenTelemetry Setup
+Configures tracing and metrics for the summarizer. `OTEL_EXPORTER` selects
+where telemetry goes: an OTLP gRPC endpoint such as "localhost:4317" (unset:
+the OTLP exporter's default endpoint), "console" to print spans and metrics
+(offline debugging), or "none" to keep the instrumentation as a no-op that
+exports nowhere.
+
+Key Components:
+- tracer: Tracer for pipeline and per-LLM-call spans.
+- meter: Meter holding the instruments below.
+- Instruments: LLM call latency, time to first token, token usage, errors,
+  in-flight calls and active SSE subscribers.
+- llm_call_span: Span and metrics around a single LLM call attempt.
+"""
+from opentelemetry import trace, metrics
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
-from opentelemetry.sdk.resources import Resource, SERVICE_NAME
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader, ConsoleMetricExporter
 import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
 resource = Resource(attributes={"service.name": os.getenv("APP_NAME", "summarizer")})
+exporter = os.getenv("OTEL_EXPORTER")
+export_interval = int(float(os.getenv("OTEL_METRIC_EXPORT_INTERVAL", "60")) * 1000)
 
 trace.set_tracer_provider(TracerProvider(resource=resource))
+metric_readers = []
+if exporter == "console":
+    trace.get_tracer_provider().add_span_processor(BatchSpanProcessor(ConsoleSpanExporter()))
+    metric_readers.append(PeriodicExportingMetricReader(ConsoleMetricExporter(),
+                                                        export_interval_millis=export_interval))
+elif exporter != "none":
+    # Unset, the exporters use OTEL_EXPORTER_OTLP_ENDPOINT or localhost:4317
+    from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+    from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
+    trace.get_tracer_provider().add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=exporter)))
+    metric_readers.append(PeriodicExportingMetricReader(OTLPMetricExporter(endpoint=exporter),
+                                                        export_interval_millis=export_interval))
+metrics.set_meter_provider(MeterProvider(resource=resource, metric_readers=metric_readers))
+
 tracer = trace.get_tracer(__name__)
+meter = metrics.get_meter(__name__)
+
+llm_call_latency = meter.create_histogram(
+    "llm.call.duration", unit="s", description="Duration of LLM calls, excluding scheduler queueing")
+llm_queue_wait = meter.create_histogram(
+    "llm.call.queue_wait", unit="s", description="Time LLM calls waited for a scheduler slot")
+llm_time_to_first_token = meter.create_histogram(
+    "llm.call.time_to_first_token", unit="s", description="Time until the first streamed token")
+llm_tokens = meter.create_counter(
+    "llm.tokens", unit="{token}", description="Prompt and completion tokens reported by the LLM")
+llm_errors = meter.create_counter(
+    "llm.errors", unit="{error}", description="Failed LLM call attempts")
+llm_in_flight = meter.create_up_down_counter(
+    "llm.calls.in_flight", unit="{call}", description="LLM calls currently running")
+sse_subscribers = meter.create_up_down_counter(
+    "sse.subscribers", unit="{subscriber}", description="Active progress stream subscribers")
+
+
+@contextmanager
+def llm_call_span(stage: Dict, model: Optional[str], queued_at: Optional[float] = None,
+                  temperature: Optional[float] = None, max_tokens: Optional[int] = None):
+    """
+    Wraps one LLM call in an `llm_call` span tagged with the pipeline stage and
+    its generation settings, and records its queue wait, latency, in-flight
+    count and failure.
+    """
+    attributes = {"stage": stage["stage"], "model": model or ""}
+    start_time = time.monotonic()
+    span_attributes = {f"llm.{key}": value for key, value in stage.items()}
+    span_attributes["llm.model"] = model or ""
+    if temperature is not None:
+        span_attributes["llm.temperature"] = temperature
+    if max_tokens is not None:
+        span_attributes["llm.max_tokens"] = max_tokens
+    if queued_at is not None:
+        span_attributes["llm.queue_wait"] = start_time - queued_at
+        llm_queue_wait.record(start_time - queued_at, attributes)
+    llm_in_flight.add(1, attributes)
+    with tracer.start_as_current_span("llm_call", attributes=span_attributes) as span:
+        try:
+            yield span
+        except Exception as e:
+            llm_errors.add(1, {**attributes, "error.type": type(e).__name__})
+            raise
+        finally:
+            latency = time.monotonic() - start_time
+            span.set_attribute("llm.latency", latency)
+            llm_call_latency.record(latency, attributes)
+            llm_in_flight.add(-1, attributes)
 
-otlp_exporter = OTLPSpanExporter(
-    endpoint=os.getenv("OTEL_EXPORTER"),  # Use with OTEL endpoint like "localhost:4317"
-)
 
-span_processor = BatchSpanProcessor(otlp_exporter)
-trace.get_tracer_provider().add_span_processor(span_processor)
-tracer = trace.get_tracer(__name__)
\ No newline at end of file
+def record_usage(span, stage: str, usage):
+    """
+    Adds the token usage reported with a completion to the span and the token counter.
+    """
+    if usage is None:
+        return
+    for kind, count in (("prompt", getattr(usage, "prompt_tokens", None)),
+                        ("completion", getattr(usage, "completion_tokens", None))):
+        if isinstance(count, int):
+            span.set_attribute(f"llm.usage.{kind}_tokens", count)
+            llm_tokens.add(count, {"stage": stage, "kind": kind})
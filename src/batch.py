@@ -0,0 +1,281 @@
+"""Batch Summarization
+This module runs summary requests in bulk from a JSONL file, one
+`SummaryRequestModel` record per line. Documents are summarized concurrently
+(their LLM calls still go through the shared scheduler), and every finished
+record is appended to an output JSONL file right away. The output file is the
+durable state of the batch: when a batch is restarted with the same output
+path, records already completed there are skipped.
+
+Key Components:
+- BatchJob: Runs one input file and tracks per-record status.
+- batch_router: `/batches` endpoints to start batches and report progress.
+- CLI: `python -m src.batch input.jsonl output.jsonl`
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import ValidationError
+
+from src.models import SummaryRequestModel, BatchRequestModel
+from src.log import logger
+from src.executor import build_summarizer, resolve_prompts
+from src.clients import client_registry
+
+BATCH_DIR = os.getenv("BATCH_DIR", "batches")
+
+
+class BatchJob:
+    """
+    Summarizes every record of an input JSONL file into an output JSONL file.
+
+    Attributes:
+        batch_id (str): Identifier of the batch.
+        input_path (str): JSONL file with one summary request per line.
+        output_path (str): JSONL file receiving one result per record.
+        max_concurrent_documents (int): Documents summarized at the same time.
+        status (Dict[int, str]): Per-record status: pending, running, completed,
+            skipped (completed by an earlier run) or failed.
+    """
+
+    def __init__(self, input_path: str, output_path: str, max_concurrent_documents: int = 4,
+                 batch_id: Optional[str] = None):
+        self.batch_id = batch_id or str(uuid.uuid4())
+        self.input_path = input_path
+        self.output_path = output_path
+        self.max_concurrent_documents = max(1, max_concurrent_documents)
+        self.status: Dict[int, str] = {}
+        self.state = "pending"
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._write_lock = asyncio.Lock()
+
+    def _read_input(self) -> List[str]:
+        with open(self.input_path, "r") as f:
+            return [line for line in f if line.strip()]
+
+    def _read_completed(self) -> set:
+        """
+        Returns the indices of records already completed in the output file.
+        A partially written last line (from a crash) is truncated away.
+        """
+        completed = set()
+        if not os.path.exists(self.output_path):
+            return completed
+        with open(self.output_path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+        with open(self.output_path, "r") as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if result.get("status") == "completed":
+                    completed.add(result["index"])
+        return completed
+
+    def _append(self, result: Dict):
+        with open(self.output_path, "a") as f:
+            f.write(json.dumps(result, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def _write_result(self, result: Dict):
+        async with self._write_lock:
+            await asyncio.to_thread(self._append, result)
+
+    async def _run_record(self, index: int, line: str, semaphore: asyncio.Semaphore):
+        async with semaphore:
+            self.status[index] = "running"
+            task_id = f"{self.batch_id}:{index}"
+            start_time = time.time()
+            summarizer = None
+            try:
+                request = SummaryRequestModel(**json.loads(line))
+                prompts = resolve_prompts(request)
+                summarizer = build_summarizer(request)
+                outcome = await summarizer.summarize(task_id, request.paragraphs, *prompts, request.document_id)
+                result = {"index": index, "status": "completed", "summary": outcome.summary,
+                          "time_taken (sec)": time.time() - start_time, "timings": outcome.timings}
+                if outcome.plan is not None:
+                    result["plan"] = outcome.plan
+            except (json.JSONDecodeError, ValidationError) as e:
+                result = {"index": index, "status": "failed", "error": f"Invalid record: {e}"}
+            except HTTPException as e:
+                result = {"index": index, "status": "failed", "error": e.detail}
+            except Exception as e:
+                result = {"index": index, "status": "failed", "error": str(e)}
+            if summarizer is not None:
+                summarizer.task_manager.cleanup_task(task_id)
+            await self._write_result(result)
+            self.status[index] = result["status"]
+            if result["status"] == "failed":
+                logger.error("Batch %s record %s failed: %s", self.batch_id, index, result["error"])
+
+    async def run(self):
+        """
+        Summarizes all records not yet completed in the output file.
+        """
+        self.state = "running"
+        self.started_at = time.time()
+        try:
+            lines = await asyncio.to_thread(self._read_input)
+            completed = await asyncio.to_thread(self._read_completed)
+            self.status = {index: "skipped" if index in completed else "pending" for index in range(len(lines))}
+            logger.info("Batch %s: %s records, %s already completed", self.batch_id, len(lines), len(completed))
+            semaphore = asyncio.Semaphore(self.max_concurrent_documents)
+            await asyncio.gather(*[
+                self._run_record(index, line, semaphore)
+                for index, line in enumerate(lines) if index not in completed
+            ])
+            self.state = "completed"
+        except Exception as e:
+            self.state = "failed"
+            logger.error("Batch %s failed: %s", self.batch_id, e)
+            raise
+        finally:
+            self.finished_at = time.time()
+
+    def progress(self) -> Dict:
+        """
+        Reports the batch state and record counts per status.
+        """
+        counts: Dict[str, int] = {}
+        for status in self.status.values():
+            counts[status] = counts.get(status, 0) + 1
+        end = self.finished_at or time.time()
+        return {
+            "batch_id": self.batch_id,
+            "state": self.state,
+            "input_path": self.input_path,
+            "output_path": self.output_path,
+            "total": len(self.status),
+            "records": counts,
+            "elapsed (sec)": end - self.started_at if self.started_at else 0.0,
+        }
+
+
+def resolve_batch_path(path: str) -> str:
+    """
+    Resolves a path given to the API relative to `BATCH_DIR`, so clients can
+    only read and write batch files there.
+
+    Raises:
+        HTTPException: 400 for absolute paths or paths leaving `BATCH_DIR`.
+    """
+    if os.path.isabs(path) or ".." in path.replace("\\", "/").split("/"):
+        raise HTTPException(status_code=400, detail=f"Batch paths must be relative to the batch folder: {path}")
+    root = os.path.realpath(BATCH_DIR)
+    resolved = os.path.realpath(os.path.join(root, path))
+    # Also catches symlinks pointing out of the folder
+    if os.path.commonpath([root, resolved]) != root:
+        raise HTTPException(status_code=400, detail=f"Batch path leaves the batch folder: {path}")
+    return resolved
+
+
+batch_router = APIRouter()
+batches: Dict[str, BatchJob] = {}
+_batch_tasks: Dict[str, asyncio.Task] = {}
+
+
+def _start(job: BatchJob) -> Dict:
+    batches[job.batch_id] = job
+    _batch_tasks[job.batch_id] = asyncio.create_task(job.run())
+    _batch_tasks[job.batch_id].add_done_callback(lambda _: _batch_tasks.pop(job.batch_id, None))
+    return job.progress()
+
+
+@batch_router.post("/batches")
+async def create_batch(request: BatchRequestModel):
+    """
+    Endpoint starting a batch over a JSONL file in `BATCH_DIR`.
+
+    Request:
+        BatchRequestModel with input and optional output paths relative to `BATCH_DIR`.
+
+    Response:
+        Batch progress, including the `batch_id` to poll.
+    """
+    input_path = resolve_batch_path(request.input_path)
+    if not os.path.isfile(input_path):
+        raise HTTPException(status_code=404, detail=f"Input file {request.input_path} not found")
+    os.makedirs(BATCH_DIR, exist_ok=True)
+    output_path = resolve_batch_path(request.output_path or (
+        os.path.splitext(os.path.basename(input_path))[0] + ".output.jsonl"))
+    for job in batches.values():
+        if job.output_path == output_path and job.state == "running":
+            raise HTTPException(status_code=409, detail=f"Batch {job.batch_id} is already writing {output_path}")
+    return _start(BatchJob(input_path, output_path, request.max_concurrent_documents))
+
+
+@batch_router.post("/batches/upload")
+async def upload_batch(request: Request, max_concurrent_documents: int = 4):
+    """
+    Endpoint starting a batch from a JSONL request body.
+
+    Response:
+        Batch progress, including the `batch_id` and the output file path.
+    """
+    batch_id = str(uuid.uuid4())
+    os.makedirs(BATCH_DIR, exist_ok=True)
+    input_path = os.path.join(BATCH_DIR, f"{batch_id}.input.jsonl")
+    body = await request.body()
+    await asyncio.to_thread(_write_bytes, input_path, body)
+    output_path = os.path.join(BATCH_DIR, f"{batch_id}.output.jsonl")
+    return _start(BatchJob(input_path, output_path, max_concurrent_documents, batch_id=batch_id))
+
+
+def _write_bytes(path: str, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+@batch_router.get("/batches")
+async def list_batches():
+    """
+    Endpoint listing the progress of all batches started by this process.
+    """
+    return {"batches": [job.progress() for job in batches.values()]}
+
+
+@batch_router.get("/batches/{batch_id}")
+async def get_batch(batch_id: str):
+    """
+    Endpoint reporting the progress of one batch.
+    """
+    if batch_id not in batches:
+        raise HTTPException(status_code=404, detail=f"Batch {batch_id} not found")
+    return batches[batch_id].progress()
+
+
+async def _run_until_done(job: BatchJob):
+    try:
+        await job.run()
+    finally:
+        await client_registry.aclose()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Summarize a JSONL file of summary requests.")
+    parser.add_argument("input_path", help="JSONL file with one summary request per line")
+    parser.add_argument("output_path", help="JSONL output; rerunning with the same file resumes the batch")
+    parser.add_argument("--concurrency", type=int, default=4, help="Documents summarized at the same time")
+    args = parser.parse_args(argv)
+
+    job = BatchJob(args.input_path, args.output_path, args.concurrency)
+    asyncio.run(_run_until_done(job))
+    progress = job.progress()
+    print(json.dumps(progress, indent=2))
+    return 0 if progress["records"].get("failed", 0) == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
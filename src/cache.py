@@ -0,0 +1,200 @@
+"""LLM Response Cache
+This module provides a content-addressed cache for chunk summaries. Entries are
+keyed on a hash of everything that determines the model output (model,
+generation parameters and prompts), so identical calls across jobs are served
+without contacting the model.
+
+Key Components:
+- make_key: Stable SHA-256 key over the call inputs.
+- MemoryCache: In-process LRU with size and TTL limits, optionally backed by a
+  persistent cache.
+- SQLiteCache: On-disk cache that survives restarts.
+- response_cache: Shared instance configured from the environment.
+"""
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import hashlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+def make_key(*parts) -> str:
+    """
+    Returns a SHA-256 hex digest identifying the given call inputs.
+    """
+    payload = json.dumps(parts, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache(ABC):
+    """
+    Base class for cache backends. Keeps hit/miss counters; subclasses
+    implement `_get` and `_set`.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self._get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: str):
+        await self._set(key, value)
+
+    @abstractmethod
+    async def _get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def _set(self, key: str, value: str):
+        ...
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class NullCache(ResponseCache):
+    """
+    Cache that never stores anything, used when caching is disabled.
+    """
+
+    async def _get(self, key: str) -> Optional[str]:
+        return None
+
+    async def _set(self, key: str, value: str):
+        pass
+
+
+class MemoryCache(ResponseCache):
+    """
+    In-memory LRU cache with an entry limit and a TTL.
+
+    Attributes:
+        max_entries (int): Entries kept before the least recently used is evicted.
+        ttl (float): Seconds an entry stays valid; 0 disables expiry.
+        backing (ResponseCache): Optional slower cache consulted on a miss and
+            written through on every set.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 0,
+                 backing: Optional[ResponseCache] = None):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.backing = backing
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    async def _get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, stored_at = entry
+            if not self.ttl or time.time() - stored_at < self.ttl:
+                self._entries.move_to_end(key)
+                return value
+            del self._entries[key]
+        if self.backing is not None:
+            value = await self.backing.get(key)
+            if value is not None:
+                self._store(key, value)
+            return value
+        return None
+
+    async def _set(self, key: str, value: str):
+        self._store(key, value)
+        if self.backing is not None:
+            await self.backing.set(key, value)
+
+    def _store(self, key: str, value: str):
+        self._entries[key] = (value, time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        stats = {**super().stats(), "entries": len(self._entries)}
+        if self.backing is not None:
+            stats["backing"] = self.backing.stats()
+        return stats
+
+
+class SQLiteCache(ResponseCache):
+    """
+    Persistent cache stored in a SQLite file. Queries run in a worker thread
+    so the event loop is never blocked on disk I/O.
+
+    Attributes:
+        path (str): Location of the database file.
+        ttl (float): Seconds an entry stays valid; 0 disables expiry.
+    """
+
+    def __init__(self, path: str, ttl: float = 0):
+        super().__init__()
+        self.path = path
+        self.ttl = ttl
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS responses "
+                         "(key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _read(self, key: str) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, stored_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self.ttl and time.time() - row[1] >= self.ttl:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            return row[0]
+
+    def _write(self, key: str, value: str):
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO responses (key, value, stored_at) VALUES (?, ?, ?)",
+                         (key, value, time.time()))
+
+    async def _get(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self._read, key)
+
+    async def _set(self, key: str, value: str):
+        await asyncio.to_thread(self._write, key, value)
+
+
+def create_cache(backend: str = "memory", max_entries: int = 10000, ttl: float = 0,
+                 path: Optional[str] = None) -> ResponseCache:
+    """
+    Builds a cache for the given backend name: "none", "memory" or "sqlite".
+    The SQLite backend is fronted by an in-memory LRU.
+    """
+    if backend == "none":
+        return NullCache()
+    if backend == "sqlite":
+        return MemoryCache(max_entries, ttl, backing=SQLiteCache(path or "cache/llm_cache.sqlite3", ttl))
+    return MemoryCache(max_entries, ttl)
+
+
+response_cache = create_cache(
+    os.getenv("LLM_CACHE_BACKEND", "memory"),
+    max_entries=int(os.getenv("LLM_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("LLM_CACHE_TTL", "86400")),
+    path=os.getenv("LLM_CACHE_PATH"),
+)
@@ -0,0 +1,95 @@
+"""Token-Budget Chunking
+This module packs input paragraphs into chunks bounded by an estimated token
+count rather than by paragraph count, so every primary LLM call carries a
+similar amount of text regardless of how long individual paragraphs are.
+
+Key Components:
+- estimate_tokens: Local tokenizer (tiktoken, when installed) or a fast estimator.
+- split_paragraph: Splits an oversized paragraph at sentence boundaries.
+- pack_paragraphs: Greedy, single-pass packing of paragraphs into token budgets.
+"""
+import re
+from typing import List
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken is optional
+    _encoding = None
+
+# Rough average for English prose with BPE tokenizers
+CHARS_PER_TOKEN = 4
+
+_sentence_boundary = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Returns the token count of `text`, estimated from its length when no
+    local tokenizer is available.
+    """
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def split_paragraph(paragraph: str, max_tokens: int) -> List[str]:
+    """
+    Splits a paragraph into pieces of at most `max_tokens`, breaking at sentence
+    boundaries. Sentences that are longer than the budget are split on words.
+    """
+    pieces, current, current_tokens = [], [], 0
+    for sentence in _sentence_boundary.split(paragraph):
+        sentence_tokens = estimate_tokens(sentence)
+        if sentence_tokens > max_tokens:
+            if current:
+                pieces.append(" ".join(current))
+                current, current_tokens = [], 0
+            pieces.extend(_split_words(sentence, max_tokens))
+            continue
+        if current and current_tokens + sentence_tokens > max_tokens:
+            pieces.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(sentence)
+        current_tokens += sentence_tokens
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def _split_words(sentence: str, max_tokens: int) -> List[str]:
+    pieces, current, current_tokens = [], [], 0
+    for word in sentence.split():
+        word_tokens = estimate_tokens(word) + 1
+        if current and current_tokens + word_tokens > max_tokens:
+            pieces.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(word)
+        current_tokens += word_tokens
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def pack_paragraphs(paragraphs: List[str], max_tokens: int) -> List[List[str]]:
+    """
+    Greedily packs consecutive paragraphs into chunks of at most `max_tokens`.
+    Paragraph order is preserved and each paragraph is tokenized once, so the
+    packing is linear in the input size.
+    """
+    max_tokens = max(1, max_tokens)
+    chunks, current, current_tokens = [], [], 0
+    for paragraph in paragraphs:
+        tokens = estimate_tokens(paragraph)
+        pieces = [(paragraph, tokens)]
+        if tokens > max_tokens:
+            pieces = [(piece, estimate_tokens(piece)) for piece in split_paragraph(paragraph, max_tokens)]
+        for piece, piece_tokens in pieces:
+            if current and current_tokens + piece_tokens > max_tokens:
+                chunks.append(current)
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += piece_tokens
+    if current:
+        chunks.append(current)
+    return chunks
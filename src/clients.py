@@ -0,0 +1,106 @@
+"""Shared LLM HTTP Client
+This module owns the HTTP connection pool used by every `AsyncOpenAI` client in
+the process. Summarizers are still created per request, with their own
+configuration, but they all send requests through one pooled, keep-alive
+`httpx` client instead of opening new connections for every job.
+
+Key Components:
+- ClientRegistry: Lazily builds, shares and closes the pooled HTTP client.
+- client_registry: Application-lifetime instance, closed by the FastAPI lifespan.
+"""
+import os
+import asyncio
+import importlib.util
+from typing import Optional, Set
+
+import httpx
+from openai import DefaultAsyncHttpxClient
+
+from src.log import logger
+
+
+class ClientRegistry:
+    """
+    Holds the process-wide pooled HTTP client for LLM requests.
+
+    Attributes:
+        max_connections (int): Upper bound on open connections.
+        max_keepalive_connections (int): Idle connections kept for reuse.
+        keepalive_expiry (float): Seconds an idle connection is kept alive.
+        http2 (bool): Negotiate HTTP/2 when the `h2` package is installed.
+    """
+
+    def __init__(self, max_connections: int = 100, max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30.0, http2: bool = True):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing: Set[asyncio.Task] = set()
+
+    def _build(self) -> httpx.AsyncClient:
+        logger.info("Creating LLM connection pool (max_connections=%s, http2=%s)", self.max_connections, self.http2)
+        return DefaultAsyncHttpxClient(
+            limits=httpx.Limits(max_connections=self.max_connections,
+                                max_keepalive_connections=self.max_keepalive_connections,
+                                keepalive_expiry=self.keepalive_expiry),
+            http2=self.http2,
+        )
+
+    async def _close_stale(self, client: httpx.AsyncClient):
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning("Closing the previous LLM connection pool failed: %s", e)
+
+    def _discard(self, client: httpx.AsyncClient, loop: Optional[asyncio.AbstractEventLoop]):
+        """
+        Schedules closing a replaced client: on its own loop if that is still
+        running, otherwise on the current one.
+        """
+        if loop is not None and loop.is_running() and not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self._close_stale(client), loop)
+            return
+        task = asyncio.get_running_loop().create_task(self._close_stale(client))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    def http_client(self) -> httpx.AsyncClient:
+        """
+        Returns the shared HTTP client, creating it on first use. Connections
+        belong to an event loop, so a new pool is built if the loop changed,
+        and the previous one is closed.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if self._client is None or self._client.is_closed or (
+                loop is not None and self._loop is not None and loop is not self._loop):
+            if self._client is not None and not self._client.is_closed:
+                self._discard(self._client, self._loop)
+            self._client = self._build()
+            self._loop = loop
+        elif self._loop is None:
+            self._loop = loop
+        return self._client
+
+    async def aclose(self):
+        """
+        Closes the pooled connections. Called on application shutdown.
+        """
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logger.info("LLM connection pool closed")
+        self._client = None
+        self._loop = None
+
+
+client_registry = ClientRegistry(
+    max_connections=int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "100")),
+    max_keepalive_connections=int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "20")),
+    keepalive_expiry=float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", "30")),
+    http2=os.getenv("LLM_HTTP2", "1") == "1",
+)
@@ -0,0 +1,153 @@
+"""Near-Duplicate Paragraph Deduplication
+Inputs such as templated event records often repeat the same paragraph
+verbatim or with a few changed words. This module collapses such groups
+before the map phase, so each group costs one paragraph of LLM input instead
+of one per copy.
+
+Exact duplicates are matched on a hash of the normalized text. The remaining
+paragraphs are compared with MinHash signatures of their word shingles,
+computed for all shingles of a paragraph at once with NumPy, and candidate
+pairs are found with banded locality-sensitive hashing (LSH). Only pairs that
+share a band are verified against the similarity threshold, so the stage runs
+in time linear in the input rather than comparing every pair.
+
+Key Components:
+- minhash_signatures: MinHash signature matrix of a list of texts.
+- DedupResult: Collapsed paragraphs and how many were removed.
+- deduplicate: Groups exact and near-duplicate paragraphs, keeping the first
+  paragraph of each group with a count annotation.
+"""
+import re
+import zlib
+import hashlib
+from itertools import combinations
+from dataclasses import dataclass, field
+from collections import defaultdict
+from typing import Dict, List
+
+import numpy as np
+
+_word = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    return " ".join(_word.findall(text.lower()))
+
+
+def shingles(text: str, size: int = 3) -> np.ndarray:
+    """
+    Returns the distinct hashed word `size`-grams of `text`.
+    """
+    words = normalize(text).split()
+    if len(words) < size:
+        grams = [" ".join(words)]
+    else:
+        grams = [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+    return np.unique(np.fromiter((zlib.crc32(g.encode()) for g in grams), dtype=np.uint32, count=len(grams)))
+
+
+def minhash_signatures(texts: List[str], num_perm: int = 128, shingle_size: int = 3, seed: int = 1) -> np.ndarray:
+    """
+    Returns a (len(texts), num_perm) matrix of MinHash signatures. The
+    fraction of equal columns of two rows estimates the Jaccard similarity of
+    the texts' shingle sets.
+    """
+    rng = np.random.default_rng(seed)
+    # Multiply-shift hashing: products wrap modulo 2^64 and the high 32 bits are kept
+    a = rng.integers(1, 1 << 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint64)
+    for row, text in enumerate(texts):
+        hashed = shingles(text, shingle_size).astype(np.uint64)
+        signatures[row] = ((np.multiply.outer(hashed, a) + b) >> np.uint64(32)).min(axis=0)
+    return signatures
+
+
+@dataclass
+class DedupResult:
+    """
+    Outcome of the deduplication stage.
+
+    Attributes:
+        paragraphs (List[str]): One paragraph per group, in input order; a
+            representative of several paragraphs carries a count annotation.
+        removed (int): Paragraphs dropped as duplicates.
+        exact (int): Of those, paragraphs identical to their representative after normalization.
+        groups (Dict[int, List[int]]): Input indices of each multi-paragraph
+            group, keyed by the index of its representative.
+    """
+    paragraphs: List[str]
+    removed: int = 0
+    exact: int = 0
+    groups: Dict[int, List[int]] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict:
+        return {"kept": len(self.paragraphs), "removed": self.removed,
+                "exact": self.exact, "near": self.removed - self.exact}
+
+
+def annotate(paragraph: str, count: int) -> str:
+    return f"{paragraph}\n[This record stands for {count} identical or near-identical records.]"
+
+
+def deduplicate(paragraphs: List[str], threshold: float = 0.85, num_perm: int = 128, bands: int = 16) -> DedupResult:
+    """
+    Collapses exact and near-duplicate paragraphs.
+
+    Paragraphs whose estimated shingle Jaccard similarity is at least
+    `threshold` are grouped, transitively, and each group is replaced by its
+    first paragraph annotated with the group size. With `threshold` of 1 only
+    exact duplicates are collapsed.
+    """
+    parent = list(range(len(paragraphs)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i: int, j: int):
+        i, j = find(i), find(j)
+        if i != j:
+            parent[max(i, j)] = min(i, j)
+
+    # Exact duplicates
+    first_by_digest: Dict[bytes, int] = {}
+    unique: List[int] = []
+    for index, paragraph in enumerate(paragraphs):
+        digest = hashlib.sha1(normalize(paragraph).encode()).digest()
+        if digest in first_by_digest:
+            union(first_by_digest[digest], index)
+        else:
+            first_by_digest[digest] = index
+            unique.append(index)
+    exact = len(paragraphs) - len(unique)
+
+    # Near duplicates among the distinct paragraphs
+    if threshold < 1.0 and len(unique) > 1:
+        signatures = minhash_signatures([paragraphs[i] for i in unique], num_perm)
+        rows = num_perm // bands
+        candidates = set()
+        for band in range(bands):
+            buckets = defaultdict(list)
+            for position, key in enumerate(map(bytes, signatures[:, band * rows:(band + 1) * rows])):
+                buckets[key].append(position)
+            # All pairs: two members may be alike even if neither resembles the first
+            for members in buckets.values():
+                candidates.update(combinations(members, 2))
+        if candidates:
+            pairs = np.array(sorted(candidates))
+            similarity = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+            for first, second in pairs[similarity >= threshold]:
+                union(unique[first], unique[second])
+
+    groups: Dict[int, List[int]] = defaultdict(list)
+    for index in range(len(paragraphs)):
+        groups[find(index)].append(index)
+    collapsed = [paragraphs[root] if len(members) == 1 else annotate(paragraphs[root], len(members))
+                 for root, members in sorted(groups.items())]
+    return DedupResult(paragraphs=collapsed,
+                       removed=len(paragraphs) - len(collapsed),
+                       exact=exact,
+                       groups={root: members for root, members in groups.items() if len(members) > 1})
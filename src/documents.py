@@ -0,0 +1,100 @@
+"""Document Reduction Store
+This module keeps the reduction tree of previously summarized documents so that
+a later run over the same document ID only pays for the chunks that changed.
+Tree nodes are content addressed (the same key as the response cache), so an
+unchanged chunk or an unchanged reduction group maps to the same node and is
+reused, while any change propagates only along its own branch.
+
+Key Components:
+- DocumentStore: In-memory LRU of document trees, optionally persisted as JSON files.
+- document_store: Shared instance configured from the environment.
+"""
+import os
+import re
+import json
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class DocumentStore:
+    """
+    Stores the reduction tree of each document under its ID.
+
+    A tree is a mapping of node key to {"level", "chunk", "summary"}, where
+    level 0 holds primary chunk summaries and higher levels hold reductions.
+
+    Attributes:
+        max_documents (int): Trees kept in memory before the least recently used is evicted.
+        directory (str): Optional folder where trees are persisted across restarts.
+    """
+
+    def __init__(self, max_documents: int = 1000, directory: Optional[str] = None):
+        self.max_documents = max_documents
+        self.directory = directory
+        self._documents: "OrderedDict[str, Dict]" = OrderedDict()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, document_id: str) -> str:
+        safe_id = re.sub(r"[^A-Za-z0-9_.-]", "_", document_id)
+        return os.path.join(self.directory, f"{safe_id}.json")
+
+    def _read(self, document_id: str) -> Optional[Dict]:
+        try:
+            with open(self._path(document_id), "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write(self, document_id: str, document: Dict):
+        path = self._path(document_id)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(document, f)
+        os.replace(f"{path}.tmp", path)
+
+    def _remember(self, document_id: str, document: Dict):
+        self._documents[document_id] = document
+        self._documents.move_to_end(document_id)
+        while len(self._documents) > self.max_documents:
+            self._documents.popitem(last=False)
+
+    async def load(self, document_id: str) -> Optional[Dict]:
+        """
+        Returns the stored document ({"nodes", "updated_at"}) or None.
+        """
+        document = self._documents.get(document_id)
+        if document is None and self.directory:
+            document = await asyncio.to_thread(self._read, document_id)
+            if document is not None:
+                self._remember(document_id, document)
+        return document
+
+    async def save(self, document_id: str, nodes: Dict[str, Dict]):
+        """
+        Replaces the stored tree of a document with the nodes of its latest run.
+        """
+        document = {"nodes": nodes, "updated_at": time.time()}
+        self._remember(document_id, document)
+        if self.directory:
+            await asyncio.to_thread(self._write, document_id, document)
+
+    async def delete(self, document_id: str) -> bool:
+        """
+        Forgets a document. Returns whether it was stored.
+        """
+        found = self._documents.pop(document_id, None) is not None
+        if self.directory:
+            try:
+                await asyncio.to_thread(os.remove, self._path(document_id))
+                found = True
+            except FileNotFoundError:
+                pass
+        return found
+
+
+document_store = DocumentStore(
+    max_documents=int(os.getenv("DOCUMENT_STORE_SIZE", "1000")),
+    directory=os.getenv("DOCUMENT_STORE_DIR"),
+)
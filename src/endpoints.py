@@ -4,26 +4,59 @@ from starlette.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from typing import Dict
+import asyncio
 import os
 
 from src.log import logger
 from src.executor import new_router
+from src.batch import batch_router
+from src.jobs import jobs_router
+from src.clients import client_registry
+from src.prompts import prompt_registry
+from src.router import llm_router
 from monitoring.otel import tracer
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan: loads the prompt templates and opens the shared LLM
+    connection pool on startup, watches the templates for changes, health-checks
+    the routed LLM endpoints, and closes everything on shutdown.
+    """
+    prompt_registry.load()
+    client_registry.http_client()
+    prompt_watcher = asyncio.create_task(prompt_registry.watch())
+    if llm_router is not None:
+        llm_router.start()
+    yield
+    prompt_watcher.cancel()
+    if llm_router is not None:
+        await llm_router.aclose()
+    await client_registry.aclose()
+
+
 # Metadata for Swagger documentation
 tags_metadata = [
     {
         "name": "Summary",
         "description": "These APIs trigger summarization tasks in asynchronous mode.",
     },
+    {
+        "name": "Jobs",
+        "description": "These APIs run detached summarization jobs that clients can reattach to.",
+    },
+    {
+        "name": "Batch",
+        "description": "These APIs summarize JSONL files of requests in the background.",
+    },
 ]
 
 # Versioned app
 app_v1 = FastAPI(openapi_tags=tags_metadata,
                 title="Streaming Summary Generator")
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.mount("/summarizer/v1",app_v1)
 
 
@@ -40,18 +73,17 @@ app_v1.add_middleware(
 LOG_FOLDER = "logs"
 os.makedirs(LOG_FOLDER, exist_ok=True)
 
-# Helper function to log
-def log_error(data, error):
-    logger.error(f"Error: {error}, Data: {data}")
+# Helper function to log; identifies the request without logging its body
+def log_error(request: Request, body: bytes, error):
+    logger.error("Error: %s, Request: %s %s (%s bytes)", error, request.method, request.url.path, len(body))
 
 invalid_dtype = "Invalid data type, expected a dictionary"
 
 # Global Exception Handler for Request Validation Errors
 @app_v1.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    # Log the validation error
-    logger.error(f"Validation error: {exc}")
-    log_error({"request_body": await request.body()}, exc)
+    # Log where validation failed, not the submitted values
+    log_error(request, await request.body(), [(error.get("loc"), error.get("msg")) for error in exc.errors()])
     
     # Return a custom error response
     return JSONResponse(
@@ -68,4 +100,6 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     )
     
 # Attach router for summarization tasks
-app_v1.include_router(new_router, tags=['Summary'])
\ No newline at end of file
+app_v1.include_router(new_router, tags=['Summary'])
+app_v1.include_router(jobs_router, tags=['Jobs'])
+app_v1.include_router(batch_router, tags=['Batch'])
\ No newline at end of file
@@ -0,0 +1,151 @@
+"""Progress Event Fan-out
+This module holds the building blocks used by the TaskManager to deliver
+progress events to SSE subscribers without letting one slow client hold up the
+others or grow memory without bound.
+
+Key Components:
+- Event: Progress event dict carrying its per-task sequence number and its
+  SSE encoding, computed once and shared by all subscribers.
+- SubscriberQueue: Bounded, non-blocking subscriber buffer that drops or
+  coalesces token events once full.
+- TokenBatcher: Groups streamed tokens into fewer events by time window or size.
+"""
+import json
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional
+
+# High-volume event types that may be dropped or merged under backpressure
+TOKEN_EVENTS = frozenset({"final_summary"})
+
+
+class Event(dict):
+    """
+    A progress event. Behaves as the plain event dict; `seq` is the event's
+    position in its task's stream (used as the SSE event ID).
+    """
+
+    def __init__(self, data: Dict, seq: int = 0):
+        super().__init__(data)
+        self.seq = seq
+        self._data_line: Optional[str] = None
+
+    @property
+    def data_line(self) -> str:
+        """
+        The SSE `data:` message of the event, JSON-encoded on first use only.
+        """
+        if self._data_line is None:
+            self._data_line = f"data: {json.dumps(self)}\n\n"
+        return self._data_line
+
+
+class SubscriberQueue(asyncio.Queue):
+    """
+    Per-subscriber event buffer with non-blocking `offer`.
+
+    Once `max_buffer` events are waiting, token events are either dropped or
+    coalesced into the last queued token event, depending on `policy`.
+    Control events (progress, status, completion, errors) are always queued.
+
+    Attributes:
+        max_buffer (int): Queued events before backpressure applies.
+        policy (str): "coalesce" (merge tokens, lossless) or "drop".
+        dropped (int): Token events discarded under the drop policy.
+        coalesced (int): Token events merged under the coalesce policy.
+        stale_through (int): Sequence number up to which the queue was filled by
+            replaying a finished run, 0 if it was not.
+    """
+
+    def __init__(self, max_buffer: int = 1000, policy: str = "coalesce"):
+        super().__init__()
+        self.max_buffer = max_buffer
+        self.policy = policy
+        self.dropped = 0
+        self.coalesced = 0
+        self.stale_through = 0
+
+    def offer(self, event: Event):
+        """
+        Queues an event without waiting, applying the overflow policy.
+        """
+        if event.get("type") in TOKEN_EVENTS and self.qsize() >= self.max_buffer:
+            if self.policy == "drop":
+                self.dropped += 1
+                return
+            tail = self._queue[-1] if self._queue else None
+            if tail is not None and tail.get("type") == event["type"]:
+                self._queue[-1] = Event({**tail, "token": tail["token"] + event["token"]}, seq=event.seq)
+                self.coalesced += 1
+                return
+        self.put_nowait(event)
+
+    def discard_stale(self):
+        """
+        Drops queued events replayed from a finished run that a new run replaces.
+        """
+        if self.stale_through:
+            self._queue = type(self._queue)(event for event in self._queue if event.seq > self.stale_through)
+            self.stale_through = 0
+
+
+class TokenBatcher:
+    """
+    Coalesces streamed tokens before they are emitted as events.
+
+    Buffered tokens are emitted together once `flush_interval` seconds passed
+    since the first of them or once they reach `flush_bytes`, and on `aclose`.
+    With both limits at 0, or once closed, every token is emitted on its own.
+
+    Attributes:
+        emit (Callable): Coroutine function receiving the joined tokens.
+        flush_interval (float): Longest time a token is held back (sec).
+        flush_bytes (int): Buffered UTF-8 bytes that trigger a flush.
+    """
+
+    def __init__(self, emit: Callable[[str], Awaitable[None]], flush_interval: float = 0.05,
+                 flush_bytes: int = 512):
+        self.emit = emit
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self._tokens: List[str] = []
+        self._size = 0
+        self._timer: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self._closed = False
+
+    async def add(self, token: str):
+        if self._closed or (self.flush_interval <= 0 and self.flush_bytes <= 0):
+            await self.emit(token)
+            return
+        self._tokens.append(token)
+        self._size += len(token.encode())
+        if self.flush_bytes and self._size >= self.flush_bytes:
+            await self.flush()
+        elif self.flush_interval and self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self):
+        """
+        Emits the buffered tokens, if any, as one string.
+        """
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+            self._timer = None
+        async with self._lock:
+            if not self._tokens:
+                return
+            text, self._tokens, self._size = "".join(self._tokens), [], 0
+            await self.emit(text)
+
+    async def aclose(self):
+        """
+        Emits the buffered tokens and stops the pending timer, so nothing is
+        emitted later behind the caller's back.
+        """
+        self._closed = True
+        await self.flush()
@@ -7,29 +7,40 @@ and final aggregation of summaries.
 
 Key Components:
 - Summarizer: Manages chunking, LLM interactions, and progress updates.
-- TaskManager: Handles subscribers and progress tracking.
+- TaskManager: Handles subscribers and progress tracking (see src/task_backends.py).
 - FastAPI route: `/summarize` endpoint for summary generation.
 """
 import os
 from src.models import SummaryRequestModel
-from src.log import logger
+from src.log import logger, task_id_var
 from typing import List, Dict, Optional, AsyncGenerator, Tuple
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse, JSONResponse
-from pydantic import Field
 import asyncio
-import json
-from collections import defaultdict
-import uuid
 from collections import defaultdict
 import uuid
 from openai import AsyncOpenAI,OpenAIError
 from dotenv import load_dotenv
-from dataclasses import dataclass
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from contextlib import nullcontext
 from datetime import datetime
 import time
-from monitoring.otel import tracer
+from monitoring.otel import tracer, llm_call_span, record_usage, llm_time_to_first_token
+from src.scheduler import scheduler
+from src.chunking import pack_paragraphs, estimate_tokens
+from src.cache import ResponseCache, response_cache, make_key
+from src.documents import document_store
+from src.clients import client_registry
+from src.prompts import prompt_registry
+from src.retry import RetryPolicy, call_with_retry, call_latencies
+from src.task_backends import TaskManager, TaskManagerBackend, task_backend
+from src.events import Event, TokenBatcher
+from src.stats import RunStats, pipeline_stats
+from src.planner import Plan, plan_request
+from src.dedup import deduplicate
+from src.extractive import extract_summary
+from src.router import LLMRouter, llm_router
+from src.results import Flight, request_key, result_store
 
 load_dotenv()
 
@@ -40,11 +51,43 @@ class SummaryConfig:
     
     Attributes:
         primary_chunk_size (int): Number of paragraphs per primary chunk.
-        secondary_chunk_size (int): Number of items per secondary reduction chunk.
+        secondary_chunk_size (int): Reduction fan-in, i.e. the maximum number of
+            summaries combined per reduction call. 0 derives it from tokens only.
         max_parallel_requests (int): Maximum concurrent requests allowed.
         model (str): OpenAI model identifier.
         temperature (float): LLM creativity control.
         max_tokens_per_request (int): Maximum tokens allowed per request.
+        chunking_mode (str): "paragraphs" to chunk by paragraph count or
+            "tokens" to pack paragraphs up to `primary_chunk_tokens`.
+        primary_chunk_tokens (int): Token budget per primary chunk in "tokens" mode.
+        final_input_tokens (int): Token budget for the content of the final call
+            (and of each reduction call). Summaries are reduced level by level
+            until they fit.
+        max_reduction_levels (int): Safety cap on the depth of the reduction tree.
+        use_cache (bool): Serve identical chunk calls from the response cache.
+        max_retries (int): Retries of a failed LLM call (backoff with jitter,
+            honouring Retry-After on rate limits).
+        request_timeout (float): Per-attempt timeout of an LLM call in seconds.
+        hedge_percentile (float): Send a duplicate request once a call runs
+            longer than this latency percentile; 0 disables hedging.
+        sse_flush_interval (float): Seconds streamed tokens are batched into one
+            `final_summary` event; with `sse_flush_bytes` 0 as well, every token
+            is sent on its own.
+        sse_flush_bytes (int): Batched token bytes that trigger an event early.
+        deduplicate (bool): Collapse exact and near-duplicate paragraphs before chunking.
+        dedup_threshold (float): Estimated word-shingle Jaccard similarity at
+            which paragraphs count as near-duplicates; 1 collapses exact duplicates only.
+        engine (str): "llm" to summarize with the model, "extractive" to select
+            sentences locally without any LLM call, or "hybrid" for extractive
+            primary chunks and LLM reductions and final summary.
+        extractive_fallback (bool): Answer an LLM call that still fails after its
+            retries with an extractive summary instead of failing the job.
+        primary_model, secondary_model, final_model (Optional[str]): Model of
+            each stage; None uses `model`.
+        primary_temperature, secondary_temperature, final_temperature
+            (Optional[float]): Temperature of each stage; None uses `temperature`.
+        primary_max_tokens, secondary_max_tokens, final_max_tokens (Optional[int]):
+            Completion token limit of each stage; None uses `max_tokens_per_request`.
     """
     primary_chunk_size: int = 10
     secondary_chunk_size: int = 10
@@ -52,121 +95,330 @@ class SummaryConfig:
     model: str = os.getenv('LLM_MODEL')
     temperature: float = 0.3
     max_tokens_per_request: int = 800
+    chunking_mode: str = "paragraphs"
+    primary_chunk_tokens: int = 2000
+    final_input_tokens: int = 6000
+    max_reduction_levels: int = 8
+    use_cache: bool = True
+    max_retries: int = 3
+    request_timeout: float = 120.0
+    hedge_percentile: float = 0.0
+    sse_flush_interval: float = 0.05
+    sse_flush_bytes: int = 512
+    deduplicate: bool = False
+    dedup_threshold: float = 0.85
+    engine: str = "llm"
+    extractive_fallback: bool = False
+    primary_model: Optional[str] = None
+    secondary_model: Optional[str] = None
+    final_model: Optional[str] = None
+    primary_temperature: Optional[float] = None
+    secondary_temperature: Optional[float] = None
+    final_temperature: Optional[float] = None
+    primary_max_tokens: Optional[int] = None
+    secondary_max_tokens: Optional[int] = None
+    final_max_tokens: Optional[int] = None
 
-class TaskManager:
-    """
-    Manages task lifecycle and progress broadcasting for each summarization job.
-
-    Responsibilities:
-        - Tracks progress for each task.
-        - Manages multiple SSE subscribers per task.
-        - Cleans up completed tasks.
-    """
-
-    def __init__(self):
-        self.tasks = defaultdict(lambda: {
-            'primary_progress': 0,
-            'secondary_progress': 0,
-            'primary_chunks': [],
-            'secondary_chunks': [],
-            'subscribers': set()
-        })
-
-    async def create_subscriber(self, task_id: str) -> asyncio.Queue:
+    def for_stage(self, stage: str) -> "StageSettings":
         """
-        Registers a new subscriber to a task's progress stream.
+        Returns the generation settings of a stage ("primary", "secondary" or
+        "final"), falling back to the shared ones where the stage sets none.
         """
-        queue = asyncio.Queue()
-        self.tasks[task_id]['subscribers'].add(queue)
-        return queue
+        model = getattr(self, f"{stage}_model")
+        temperature = getattr(self, f"{stage}_temperature")
+        max_tokens = getattr(self, f"{stage}_max_tokens")
+        return StageSettings(model=model or self.model,
+                             temperature=self.temperature if temperature is None else temperature,
+                             max_tokens=max_tokens or self.max_tokens_per_request)
 
-    async def remove_subscriber(self, task_id: str, queue: asyncio.Queue):
+    @property
+    def max_summary_tokens(self) -> int:
         """
-        Unsubscribes a listener from a task's progress events.
+        Worst-case size of a chunk or reduction summary, used to plan reductions.
         """
-        if task_id in self.tasks:
-            self.tasks[task_id]['subscribers'].discard(queue)
+        return max(self.for_stage("primary").max_tokens, self.for_stage("secondary").max_tokens)
 
-    async def broadcast_progress(self, task_id: str, event_type: str, data: Dict):
-        """
-        Broadcasts progress updates to all subscribers of a task.
-        """
-        event = {'type': event_type, **data}
-        for queue in self.tasks[task_id]['subscribers']:
-            await queue.put(event)
 
-    def cleanup_task(self, task_id: str):
-        """
-        Deletes the task's metadata and removes all subscribers.
-        """
-        if task_id in self.tasks:
-            del self.tasks[task_id]
+@dataclass
+class StageSettings:
+    """
+    Generation settings of one pipeline stage.
 
+    Attributes:
+        model (str): Model identifier.
+        temperature (float): LLM creativity control.
+        max_tokens (int): Completion token limit.
+    """
+    model: Optional[str]
+    temperature: float
+    max_tokens: int
+
+
+@dataclass
+class SummaryResult:
+    """
+    Outcome of a summarization run.
+
+    Attributes:
+        summary (str): Final summary.
+        timings (Dict[str, float]): Wall-clock seconds per step ("chunking",
+            "map_reduce", "final", "final_first_token" when streamed) and in total.
+        streamed (bool): Whether the final summary was streamed as token events.
+        stats (Dict): Per-stage call counts, latencies, queue waits and token usage.
+        plan (Optional[Dict]): Settings and estimates chosen by the auto-tuning planner.
+    """
+    summary: str
+    timings: Dict[str, float]
+    streamed: bool = True
+    stats: Dict = field(default_factory=dict)
+    plan: Optional[Dict] = None
 
 class Summarizer:
     """
     Handles the chunking, processing, and summarization logic using OpenAI's API.
     
     Attributes:
-        client (AsyncOpenAI): OpenAI async client.
+        client (AsyncOpenAI): OpenAI async client on top of the shared connection pool.
         config (SummaryConfig): Configuration for the summarization.
-        task_manager (TaskManager): Task progress manager.
+        task_manager (TaskManagerBackend): Task progress manager, shared process-wide by default.
+        cache (ResponseCache): Cache of chunk summaries, shared process-wide by default.
+        plan (Optional[Plan]): Auto-tuning plan the config was derived from, if any.
+        router (Optional[LLMRouter]): Spreads calls over several endpoints; without
+            one, every call goes to `client`. Shared process-wide by default.
     """
-    def __init__(self, api_key: str, config: Optional[SummaryConfig] = None):
+    def __init__(self, api_key: str, config: Optional[SummaryConfig] = None,
+                 cache: Optional[ResponseCache] = None,
+                 task_manager: Optional[TaskManagerBackend] = None,
+                 plan: Optional[Plan] = None,
+                 router: Optional[LLMRouter] = None):
         self.client = AsyncOpenAI(api_key=api_key,
-                                  base_url=os.getenv("BASE_URL")
+                                  base_url=os.getenv("BASE_URL"),
+                                  http_client=client_registry.http_client(),
+                                  max_retries=0  # retries are handled by the RetryPolicy
                                   )
         self.config = config or SummaryConfig()
-        self.task_manager = TaskManager()
+        self.task_manager = task_manager if task_manager is not None else task_backend
+        self.cache = cache if cache is not None else response_cache
+        self.plan = plan
+        self.router = router if router is not None else llm_router
+        self._completed = defaultdict(int)  # finished calls per (task_id, level)
+        self._documents: Dict[str, Dict] = {}  # reduction trees of incremental runs per task_id
+        self._runs: Dict[str, RunStats] = {}  # statistics of running summarizations per task_id
+        self.retry_policy = RetryPolicy(max_retries=self.config.max_retries,
+                                        timeout=self.config.request_timeout,
+                                        hedge_percentile=self.config.hedge_percentile)
 
     def create_chunks(self, paragraphs: List[str]) -> Tuple[List[List[str]], int, int]:
         """
         Splits input paragraphs into primary and secondary chunks for processing.
         
+        In "tokens" chunking mode, paragraphs are packed up to the primary
+        token budget and oversized paragraphs are split at sentence boundaries.
+        
         Returns:
             Tuple of (primary_chunks, num_primary_chunks, num_secondary_chunks)
         """
         # Create primary chunks
-        primary_chunks = [
-            paragraphs[i:i + self.config.primary_chunk_size]
-            for i in range(0, len(paragraphs), self.config.primary_chunk_size)
-        ]
-        
-        # Create secondary chunks
-        secondary_chunks = []
-        for primary in primary_chunks:
-            chunk_group = [
-                primary[i:i + self.config.secondary_chunk_size]
-                for i in range(0, len(primary), self.config.secondary_chunk_size)
+        if self.config.chunking_mode == "tokens":
+            primary_chunks = pack_paragraphs(paragraphs, self.config.primary_chunk_tokens)
+        else:
+            primary_chunks = [
+                paragraphs[i:i + self.config.primary_chunk_size]
+                for i in range(0, len(paragraphs), self.config.primary_chunk_size)
             ]
-            secondary_chunks.extend(chunk_group)
+        
+        # Estimate first-level reduction groups
+        fan_in = self.config.secondary_chunk_size or len(primary_chunks)
+        num_secondary_chunks = -(-len(primary_chunks) // max(fan_in, 1))
             
-        return primary_chunks, len(primary_chunks), len(secondary_chunks)
+        return primary_chunks, len(primary_chunks), num_secondary_chunks
+
+    def fits_final_budget(self, summaries: List[str]) -> bool:
+        """
+        Checks whether the summaries fit into a single final reduction call.
+        """
+        return estimate_tokens("\n\n".join(summaries)) <= self.config.final_input_tokens
+
+    def create_reduction_groups(self, summaries: List[str]) -> List[List[str]]:
+        """
+        Groups consecutive summaries for one reduction level. A group is closed
+        when it reaches the fan-in (`secondary_chunk_size`) or the token budget
+        of a reduction call; every group holds at least two summaries so each
+        level shrinks the tree.
+        """
+        fan_in = max(self.config.secondary_chunk_size or len(summaries), 2)
+        groups, current, current_tokens = [], [], 0
+        for summary in summaries:
+            tokens = estimate_tokens(summary)
+            if len(current) >= 2 and (len(current) >= fan_in
+                                      or current_tokens + tokens > self.config.final_input_tokens):
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(summary)
+            current_tokens += tokens
+        if current:
+            groups.append(current)
+        return groups
+
+    def pipelined_fan_in(self) -> int:
+        """
+        Fan-in for groups formed before their inputs are known: the configured
+        fan-in, capped so that worst-case summaries still fit one reduction call.
+        """
+        by_tokens = self.config.final_input_tokens // max(self.config.max_summary_tokens, 1)
+        fan_in = min(self.config.secondary_chunk_size or by_tokens, by_tokens)
+        return max(fan_in, 2)
+
+    def requires_reduction(self, count: int) -> bool:
+        """
+        Checks whether `count` summaries could overflow the final call if each
+        used its full token limit, in which case the next level is planned
+        before the summaries are known.
+        """
+        return count * self.config.max_summary_tokens > self.config.final_input_tokens
+
+    @staticmethod
+    def _resolved(value: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(value)
+        return future
+
+    async def _reduce_when_ready(self, task_id: str, chunk_idx: int, inputs: List[asyncio.Future],
+                                 total_chunks: int, system_prompt: str, secondary_reduction_prompt: str,
+                                 level: int) -> str:
+        summaries = await asyncio.gather(*inputs)
+        return await self.process_secondary_chunk(task_id, chunk_idx, list(summaries), total_chunks,
+                                                  system_prompt, secondary_reduction_prompt, level=level)
 
     async def process_chunk(self, system_prompt: str, 
-                          user_prompt: str) -> str:
+                          user_prompt: str, task_id: Optional[str] = None,
+                          level: int = 0, chunk_idx: int = 0) -> str:
         """
         Calls the OpenAI model with given prompts, processes a single chunk of text, 
         and returns the response.
+        The call waits for a slot from the shared scheduler, which enforces
+        `max_parallel_requests` for the task and the process-wide limit, and is
+        retried (or hedged) per the retry policy; retries are broadcast as
+        progress events. A call that still fails fails the job with a 503.
+        Responses are looked up in the task's previous document tree and in the
+        cache first, keyed on the model, generation parameters and both prompts.
         """
+        stage = {"stage": "primary" if level == 0 else "secondary", "level": level, "chunk": chunk_idx + 1}
+        settings = self.config.for_stage(stage["stage"])
+        key = make_key(settings.model, settings.temperature, settings.max_tokens, system_prompt, user_prompt)
+        document = self._documents.get(task_id)
+        run = self._runs.get(task_id)
+        summary = None
+        if document is not None and key in document["previous"]:
+            summary = document["previous"][key]["summary"]
+            document["reused"] += 1
+        elif self.config.use_cache:
+            summary = await self.cache.get(key)
+        if summary is not None and run is not None:
+            run.record_cached(stage["stage"])
+        if summary is None:
+
+            async def request(started: asyncio.Event) -> str:
+                queued_at = time.monotonic()
+                async with scheduler.slot(task_id or "default", self.config.max_parallel_requests):
+                    started.set()
+                    with llm_call_span(stage, settings.model, queued_at,
+                                       settings.temperature, settings.max_tokens) as span:
+                        start_time = time.monotonic()
+                        async with self.route() as client:
+                            span.set_attribute("llm.endpoint", str(getattr(client, "base_url", "")))
+                            response = await asyncio.wait_for(client.chat.completions.create(
+                                model=settings.model,
+                                messages=[
+                                    {"role": "system", "content": system_prompt},
+                                    {"role": "user", "content": user_prompt}
+                                ],
+                                temperature=settings.temperature,
+                                max_tokens=settings.max_tokens,
+                                stream=False
+                            ), self.retry_policy.timeout)
+                        latency = time.monotonic() - start_time
+                        call_latencies.add(latency)
+                        record_usage(span, stage["stage"], getattr(response, "usage", None))
+                        if run is not None:
+                            run.record_call(stage["stage"], start_time, latency, start_time - queued_at,
+                                            getattr(response, "usage", None), model=settings.model)
+                return response.choices[0].message.content
+
+            async def on_retry(attempt: int, delay: float, error: Exception):
+                logger.warning("Retrying chunk %s (level %s) in %.2fs after: %r", chunk_idx + 1, level, delay, error)
+                if run is not None:
+                    run.record_retry(stage["stage"])
+                if task_id:
+                    await self.task_manager.broadcast_progress(task_id, "retry", {
+                        **stage, "attempt": attempt, "delay": delay, "error": repr(error)
+                    })
+
+            async def on_hedge():
+                if run is not None:
+                    run.record_hedge(stage["stage"])
+                if task_id:
+                    await self.task_manager.broadcast_progress(task_id, "hedge", stage)
+
+            try:
+                summary = await call_with_retry(request, self.retry_policy, call_latencies, on_retry, on_hedge)
+            except OpenAIError as e:
+                raise HTTPException(503, detail=f"LLM unavailable.\n{e}")
+            except Exception as e:
+                logger.error("Error processing chunk: %s", e)
+                raise HTTPException(503, detail=f"LLM unavailable.\n{e!r}")
+            if self.config.use_cache and summary:
+                await self.cache.set(key, summary)
+        if document is not None and summary:
+            document["current"][key] = {"level": level, "chunk": chunk_idx + 1, "summary": summary}
+        return summary
+
+    def route(self, measure_latency: bool = True):
+        """
+        Returns an async context yielding the client for one LLM call: the
+        router's choice of endpoint, or the summarizer's own client.
+        """
+        if self.router is None:
+            return nullcontext(self.client)
+        return self.router.route(measure_latency)
+
+    def extract(self, content: str, task_id: Optional[str], stage: str) -> str:
+        """
+        Summarizes `content` with the local extractive engine, within the
+        same token limit as an LLM call.
+        """
+        start_time = time.monotonic()
+        summary = extract_summary(content, self.config.for_stage(stage).max_tokens)
+        if task_id in self._runs:
+            self._runs[task_id].record_extractive(stage, start_time, time.monotonic() - start_time)
+        return summary
+
+    async def _fall_back(self, task_id: Optional[str], stage: Dict, error: HTTPException):
+        logger.warning("LLM call failed, falling back to the extractive engine (%s): %s", stage, error.detail)
+        if task_id in self._runs:
+            self._runs[task_id].record_fallback(stage["stage"])
+        if task_id:
+            await self.task_manager.broadcast_progress(task_id, "fallback", {
+                **stage, "engine": "extractive", "error": error.detail
+            })
+
+    async def summarize_chunk(self, system_prompt: str, user_prompt: str, content: str,
+                              task_id: Optional[str] = None, level: int = 0, chunk_idx: int = 0) -> str:
+        """
+        Summarizes a primary chunk (level 0) or a reduction group with the
+        configured engine, falling back to the extractive engine on LLM
+        failure when `extractive_fallback` is set.
+        """
+        stage = {"stage": "primary" if level == 0 else "secondary", "level": level, "chunk": chunk_idx + 1}
+        if self.config.engine == "extractive" or (self.config.engine == "hybrid" and level == 0):
+            return self.extract(content, task_id, stage["stage"])
         try:
-            response = await self.client.chat.completions.create(
-                model=self.config.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=self.config.temperature,
-                max_tokens=self.config.max_tokens_per_request,
-                stream=False
-            )
-            return response.choices[0].message.content
-                
-        except OpenAIError as e:
-            raise HTTPException(503, detail=f"LLM unavailable.\n{e}")
-        except Exception as e:
-            logger.error(f"Error processing chunk: {str(e)}")
-            return ""
+            return await self.process_chunk(system_prompt, user_prompt, task_id, level, chunk_idx)
+        except HTTPException as e:
+            if not self.config.extractive_fallback:
+                raise
+            await self._fall_back(task_id, stage, e)
+            return self.extract(content, task_id, stage["stage"])
 
     async def process_primary_chunk(self, task_id: str, chunk_idx: int, 
                                   chunks: List[str], total_chunks: int,
@@ -178,8 +430,9 @@ class Summarizer:
         content = "\n\n".join(chunks)
         user_prompt = primary_prompt + f"\n\nContent:\n{content}"
         
-        summary = await self.process_chunk(system_prompt, user_prompt)
-        progress = int(((chunk_idx + 1) / total_chunks) * 100)
+        summary = await self.summarize_chunk(system_prompt, user_prompt, content, task_id, 0, chunk_idx)
+        self._completed[(task_id, 0)] += 1
+        progress = int((self._completed[(task_id, 0)] / total_chunks) * 100)
         
         await self.task_manager.broadcast_progress(task_id, "primary_progress", {
             "progress": progress,
@@ -192,18 +445,21 @@ class Summarizer:
 
     async def process_secondary_chunk(self, task_id: str, chunk_idx: int,
                                     chunks: List[str], total_chunks: int,
-                                    system_prompt:str, secondary_reduction_prompt:str) -> str:
+                                    system_prompt:str, secondary_reduction_prompt:str,
+                                    level: int = 1) -> str:
         """
-        Summarizes a secondary chunk and broadcasts its progress.
+        Summarizes a secondary chunk at the given reduction level and broadcasts its progress.
         """
         content = "\n\n".join(chunks)
         user_prompt = secondary_reduction_prompt + f"\n\nContent:\n{content}"
         
-        summary = await self.process_chunk(system_prompt, user_prompt)
-        progress = int(((chunk_idx + 1) / total_chunks) * 100)
+        summary = await self.summarize_chunk(system_prompt, user_prompt, content, task_id, level, chunk_idx)
+        self._completed[(task_id, level)] += 1
+        progress = int((self._completed[(task_id, level)] / total_chunks) * 100)
         
         await self.task_manager.broadcast_progress(task_id, "secondary_progress", {
             "progress": progress,
+            "level": level,
             "chunk": chunk_idx + 1,
             "total": total_chunks,
             "summary": summary
@@ -211,136 +467,464 @@ class Summarizer:
         
         return summary
 
+    @staticmethod
+    def _final_messages(summaries: List[str], system_prompt: str, final_reduction_prompt: str) -> List[Dict]:
+        content = "\n\n".join(summaries)
+        user_prompt = final_reduction_prompt + f"\n\nContent:\n{content}"
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+
+    async def _report_final_retry(self, task_id: str, attempt: int, delay: float, error: Exception):
+        logger.warning("Retrying final summary in %.2fs after: %r", delay, error)
+        if task_id in self._runs:
+            self._runs[task_id].record_retry("final")
+        await self.task_manager.broadcast_progress(task_id, "retry", {
+            "stage": "final", "attempt": attempt, "delay": delay, "error": repr(error)
+        })
+
+    async def complete_final_summary(self, task_id: str, summaries: List[str],
+                                     system_prompt: str, final_reduction_prompt: str) -> str:
+        """
+        Non-streaming variant of `generate_final_summary` for runs nobody is
+        watching: a single completion, retried as a whole, without token events.
+        """
+        messages = self._final_messages(summaries, system_prompt, final_reduction_prompt)
+        settings = self.config.for_stage("final")
+
+        async def request(started: asyncio.Event) -> str:
+            queued_at = time.monotonic()
+            async with scheduler.slot(task_id, self.config.max_parallel_requests):
+                started.set()
+                with llm_call_span({"stage": "final"}, settings.model, queued_at,
+                                   settings.temperature, settings.max_tokens) as span:
+                    start_time = time.monotonic()
+                    async with self.route() as client:
+                        span.set_attribute("llm.endpoint", str(getattr(client, "base_url", "")))
+                        response = await asyncio.wait_for(client.chat.completions.create(
+                            model=settings.model,
+                            messages=messages,
+                            temperature=settings.temperature,
+                            max_tokens=settings.max_tokens,
+                            stream=False
+                        ), self.retry_policy.timeout)
+                    record_usage(span, "final", getattr(response, "usage", None))
+                    if task_id in self._runs:
+                        self._runs[task_id].record_call("final", start_time, time.monotonic() - start_time,
+                                                        start_time - queued_at, getattr(response, "usage", None),
+                                                        model=settings.model)
+            return response.choices[0].message.content or ""
+
+        async def on_retry(attempt: int, delay: float, error: Exception):
+            await self._report_final_retry(task_id, attempt, delay, error)
+
+        try:
+            return await call_with_retry(request, RetryPolicy(max_retries=self.retry_policy.max_retries,
+                                                              timeout=self.retry_policy.timeout),
+                                         on_retry=on_retry)
+        except Exception as e:
+            raise HTTPException(503, detail=f"LLM error in generating final summary .{e}")
+
     async def generate_final_summary(self, task_id: str, summaries: List[str],
                                     system_prompt:str, final_reduction_prompt:str
                                     ) -> AsyncGenerator[str, None]:
         """
         Aggregates all secondary summaries into a final summary. 
-        Streams tokens to subscribers in real-time.
+        Streams tokens to subscribers in real-time, batched per
+        `sse_flush_interval` / `sse_flush_bytes`.
         """
-        content = "\n\n".join(summaries)
-        user_prompt = final_reduction_prompt + f"\n\nContent:\n{content}"
-        
+        messages = self._final_messages(summaries, system_prompt, final_reduction_prompt)
+        settings = self.config.for_stage("final")
+
+        async def request(started: asyncio.Event):
+            # Routed on opening the stream; its latency is not that of a full call
+            async with self.route(measure_latency=False) as client:
+                return await asyncio.wait_for(client.chat.completions.create(
+                    model=settings.model,
+                    messages=messages,
+                    temperature=settings.temperature,
+                    max_tokens=settings.max_tokens,
+                    stream=True,
+                    # Usage is only reported on a final chunk when asked for
+                    stream_options={"include_usage": True}
+                ), self.retry_policy.timeout)
+
+        async def on_retry(attempt: int, delay: float, error: Exception):
+            await self._report_final_retry(task_id, attempt, delay, error)
+
+        async def emit(text: str):
+            await self.task_manager.broadcast_progress(task_id, "final_summary", {"token": text})
+
+        batcher = TokenBatcher(emit, self.config.sse_flush_interval, self.config.sse_flush_bytes)
+        queued_at = time.monotonic()
         try:
-            response = await self.client.chat.completions.create(
-                model=self.config.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=self.config.temperature,
-                max_tokens=self.config.max_tokens_per_request,
-                stream=True
-            )
-            
-            async for chunk in response:
-                if chunk.choices[0].delta.content:
-                    token = chunk.choices[0].delta.content
-                    await self.task_manager.broadcast_progress(task_id, "final_summary", {
-                        "token": token
-                    })
-                    yield token
+            async with scheduler.slot(task_id, self.config.max_parallel_requests):
+                with llm_call_span({"stage": "final", "streamed": True}, settings.model, queued_at,
+                                   settings.temperature, settings.max_tokens) as span:
+                    start_time = time.monotonic()
+                    first_token = True
+                    # Only opening the stream is retried; tokens already sent cannot be replayed
+                    response = await call_with_retry(request, RetryPolicy(max_retries=self.retry_policy.max_retries,
+                                                                          timeout=self.retry_policy.timeout),
+                                                     on_retry=on_retry)
+
+                    usage = None
+                    async for chunk in response:
+                        if getattr(chunk, "usage", None) is not None:
+                            usage = chunk.usage
+                            record_usage(span, "final", usage)
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            token = chunk.choices[0].delta.content
+                            if first_token:
+                                first_token = False
+                                ttft = time.monotonic() - start_time
+                                llm_time_to_first_token.record(ttft, {"stage": "final", "model": settings.model or ""})
+                                span.set_attribute("llm.time_to_first_token", ttft)
+                                if task_id in self._runs:
+                                    self._runs[task_id].timings["final_first_token"] = ttft
+                            await batcher.add(token)
+                            yield token
+                    if task_id in self._runs:
+                        self._runs[task_id].record_call("final", start_time, time.monotonic() - start_time,
+                                                        start_time - queued_at, usage, model=settings.model)
         except Exception as e:
             raise HTTPException(503, detail=f"LLM error in generating final summary .{e}")
+        finally:
+            # Tokens already yielded go out before any error event, and no timer outlives the call
+            await batcher.aclose()
+
+    async def final_summary(self, task_id: str, summaries: List[str], system_prompt: str,
+                            final_reduction_prompt: str, stream: bool) -> str:
+        """
+        Produces the final summary with the configured engine, streamed as
+        token events when `stream` is set. With `extractive_fallback`, a failed
+        LLM call is answered extractively, unless tokens were already streamed.
+        """
+        if self.config.engine != "extractive":
+            tokens = []
+            try:
+                if not stream:
+                    return await self.complete_final_summary(task_id, summaries, system_prompt, final_reduction_prompt)
+                async for token in self.generate_final_summary(task_id, summaries, system_prompt, final_reduction_prompt):
+                    tokens.append(token)
+                return "".join(tokens)
+            except HTTPException as e:
+                if not self.config.extractive_fallback or tokens:
+                    raise
+                await self._fall_back(task_id, {"stage": "final"}, e)
+        summary = self.extract("\n\n".join(summaries), task_id, "final")
+        if stream:
+            await self.task_manager.broadcast_progress(task_id, "final_summary", {"token": summary})
+        return summary
 
     async def process_text(self, task_id: str, paragraphs: List[str],
-                           system_prompt:str, primary_prompt:str, secondary_reduction_prompt:str, final_reduction_prompt:str
-                           ) -> None:
+                           system_prompt:str, primary_prompt:str, secondary_reduction_prompt:str, final_reduction_prompt:str,
+                           document_id: Optional[str] = None
+                           ) -> str:
         """
-        Orchestrates the full summarization pipeline:
+        Runs `summarize` with the final summary streamed to subscribers and
+        returns the final summary.
+        """
+        result = await self.summarize(task_id, paragraphs, system_prompt, primary_prompt,
+                                      secondary_reduction_prompt, final_reduction_prompt,
+                                      document_id, stream_final=True)
+        return result.summary
+
+    async def summarize(self, task_id: str, paragraphs: List[str],
+                        system_prompt: str, primary_prompt: str, secondary_reduction_prompt: str,
+                        final_reduction_prompt: str, document_id: Optional[str] = None,
+                        stream_final: Optional[bool] = None) -> SummaryResult:
+        """
+        Orchestrates the full summarization pipeline and returns the final
+        summary with stage timings:
         - Primary summarization
-        - Secondary reduction
+        - Secondary reduction, repeated level by level until the summaries
+          fit the final call's token budget
         - Final summary generation
+
+        Map and reduce calls run as a dataflow: when worst-case summary sizes
+        would overflow the final call, the next level is planned up front and
+        each group is dispatched as soon as its own inputs finish instead of
+        waiting for the whole level.
+        Group membership is positional, so the output order is deterministic.
+
+        With a `document_id`, the reduction tree of the document's previous run
+        is reused: only chunks and reduction groups whose input changed are sent
+        to the model, and the new tree replaces the stored one on success.
+
+        The final summary is streamed as token events when `stream_final` is
+        set, or, if it is None, when the task has subscribers at that point;
+        otherwise it is fetched with one non-streaming call.
         """
+        pending: List[asyncio.Task] = []
+        await self.task_manager.start_run(task_id)
+        run = self._runs[task_id] = RunStats()
+        timings = run.timings
+        start_time = run.start_time
+        failed = True
+        # Tags this run's log records; tasks started below inherit it
+        log_context = task_id_var.set(task_id)
         try:
+            if document_id:
+                previous = await document_store.load(document_id)
+                self._documents[task_id] = {"previous": previous["nodes"] if previous else {},
+                                            "current": {}, "reused": 0}
+            if self.config.deduplicate:
+                dedup_start = time.monotonic()
+                dedup = await asyncio.to_thread(deduplicate, paragraphs, self.config.dedup_threshold)
+                paragraphs = dedup.paragraphs
+                run.deduplication = dedup.to_dict()
+                timings["deduplication"] = time.monotonic() - dedup_start
+                logger.info("Deduplication removed %s of %s paragraphs (%s exact)",
+                            dedup.removed, dedup.removed + len(paragraphs), dedup.exact)
+                await self.task_manager.broadcast_progress(task_id, "status", {
+                    "message": f"Removed {dedup.removed} duplicate paragraphs",
+                    "deduplication": run.deduplication
+                })
             # Create chunks
             primary_chunks, primary_count, *_ = self.create_chunks(paragraphs)
-            logger.info(f"Primary count: {primary_count}")
-            if primary_count>1:
-                # Process primary chunks
-                primary_tasks = [
-                    self.process_primary_chunk(task_id, idx, chunk, primary_count,system_prompt,primary_prompt)
-                    for idx, chunk in enumerate(primary_chunks)
-                ]
-                with tracer.start_as_current_span("primary_summarization"):
-                    primary_summaries = await asyncio.gather(*primary_tasks)
-            else:
-                primary_summaries = primary_chunks[0]
-                logger.info(f"Skipping to secondary processing as initial chunk size is {len(primary_chunks)}.......")
-
-            # Process secondary chunks
-            chunk_size = 3  # Number of primary summaries to combine
-            secondary_chunks = [
-                primary_summaries[i:i + chunk_size]
-                for i in range(0, len(primary_summaries), chunk_size)
-            ]
-            
-            secondary_tasks = [
-                self.process_secondary_chunk(task_id, idx, chunk, len(secondary_chunks),system_prompt, secondary_reduction_prompt)
-                for idx, chunk in enumerate(secondary_chunks)
-            ]
-            with tracer.start_as_current_span("secondary_summarization"):
-                secondary_summaries = await asyncio.gather(*secondary_tasks)
+            timings["chunking"] = time.monotonic() - start_time
+            logger.info("Primary count: %s", primary_count)
+            with tracer.start_as_current_span("map_reduce"):
+                if primary_count>1:
+                    # Dispatch primary chunks; reductions below pick them up as they finish
+                    nodes = [
+                        asyncio.create_task(self.process_primary_chunk(task_id, idx, chunk, primary_count,
+                                                                       system_prompt, primary_prompt))
+                        for idx, chunk in enumerate(primary_chunks)
+                    ]
+                    pending.extend(nodes)
+                else:
+                    nodes = [self._resolved(paragraph) for paragraph in primary_chunks[0]]
+                    logger.info("Skipping to secondary processing as initial chunk size is %s", len(primary_chunks))
+
+                # Reduce summaries level by level until they fit the final call.
+                # Raw paragraphs from a single chunk are always reduced at least once.
+                level = 0
+                while len(nodes) > 1 and level < self.config.max_reduction_levels:
+                    if self.requires_reduction(len(nodes)):
+                        # Worst-case sizes overflow the final call: group by position and
+                        # start each group as soon as its own inputs are done.
+                        level += 1
+                        fan_in = self.pipelined_fan_in()
+                        groups = [nodes[i:i + fan_in] for i in range(0, len(nodes), fan_in)]
+                        logger.info("Reduction level %s: %s summaries into %s pipelined groups", level, len(nodes), len(groups))
+                        nodes = [
+                            asyncio.create_task(self._reduce_when_ready(task_id, idx, group, len(groups),
+                                                                        system_prompt, secondary_reduction_prompt, level))
+                            for idx, group in enumerate(groups)
+                        ]
+                        pending.extend(nodes)
+                        continue
+
+                    summaries = list(await asyncio.gather(*nodes))
+                    if self.fits_final_budget(summaries) and not (level == 0 and primary_count <= 1):
+                        break
+                    level += 1
+                    reduction_groups = self.create_reduction_groups(summaries)
+                    logger.info("Reduction level %s: %s summaries into %s groups", level, len(summaries), len(reduction_groups))
+                    nodes = [
+                        asyncio.create_task(self.process_secondary_chunk(task_id, idx, chunk, len(reduction_groups),
+                                                                         system_prompt, secondary_reduction_prompt,
+                                                                         level=level))
+                        for idx, chunk in enumerate(reduction_groups)
+                    ]
+                    pending.extend(nodes)
+                secondary_summaries = list(await asyncio.gather(*nodes))
+            timings["map_reduce"] = time.monotonic() - start_time
             
             # Generate final summary
             await self.task_manager.broadcast_progress(task_id, "status", {
                 "message": "Generating final summary..."
             })
             
+            if stream_final is None:
+                stream_final = await self.task_manager.has_subscribers(task_id)
+            final_start = time.monotonic()
             with tracer.start_as_current_span("final_summarization"):
-                async for _ in self.generate_final_summary(task_id, secondary_summaries,system_prompt,final_reduction_prompt):
-                    # generate final summary
-                    pass
-                
-            await self.task_manager.broadcast_progress(task_id, "completed", {
-                "message": "Summary generation completed"
-            })
+                summary = await self.final_summary(task_id, secondary_summaries, system_prompt,
+                                                   final_reduction_prompt, stream_final)
+            timings["final"] = time.monotonic() - final_start
+            timings["total"] = time.monotonic() - start_time
+
+            completed = {"stats": run.to_dict()}
+            if self.plan is not None:
+                completed["plan"] = self.plan.to_dict()
+            if document_id:
+                document = self._documents[task_id]
+                await document_store.save(document_id, document["current"])
+                completed.update({"document_id": document_id, "reused_chunks": document["reused"]})
+            # Clients match on the message closing the event, so it stays last
+            completed["message"] = "Summary generation completed"
+            await self.task_manager.broadcast_progress(task_id, "completed", completed)
+            failed = False
+            return SummaryResult(summary, dict(timings), streamed=stream_final, stats=completed["stats"],
+                                 plan=completed.get("plan"))
         except Exception as e:
+            for task in pending:
+                task.cancel()
             await self.task_manager.broadcast_progress(task_id, "error", {
                 "message": str(e)
             })
             raise
+        finally:
+            for key in [key for key in self._completed if key[0] == task_id]:
+                del self._completed[key]
+            self._documents.pop(task_id, None)
+            pipeline_stats.add(self._runs.pop(task_id), failed=failed)
+            task_id_var.reset(log_context)
 
 
 
 
 new_router = APIRouter()
 
-def get_working_prompts(input_prompt_field: Optional[str], prompt_type:str)->str:
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "Access-Control-Allow-Origin": "*",
+    "Content-Type": "text/event-stream"
+}
+
+
+def result_content(result: Dict, start_time: float, cache_hit: bool) -> Dict:
+    """
+    JSON body of a summary: the run's summary, timings, stats and plan, and
+    whether it was served from the result store.
+    """
+    content = {'summary': result['summary'],
+               'time_taken (sec)': time.time() - start_time,
+               'timings': result['timings'],
+               'stats': result['stats']}
+    if result.get('plan') is not None:
+        content['plan'] = result['plan']
+    content['cache_hit'] = cache_hit
+    return content
+
+
+def stored_response(stored: Dict, stream: bool, start_time: float):
+    """
+    Answers a request from the result store, as JSON or as a short SSE stream
+    carrying the whole summary in one `final_summary` event.
+    """
+    if not stream:
+        return JSONResponse(content=result_content(stored, start_time, cache_hit=True))
+
+    async def replay():
+        yield Event({"type": "final_summary", "token": stored["summary"]}, seq=1).data_line
+        yield Event({"type": "completed", "stats": stored["stats"], "cache_hit": True,
+                     "message": "Summary generation completed"}, seq=2).data_line
+
+    return StreamingResponse(replay(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+async def flight_events(flight: Flight, queue) -> AsyncGenerator[str, None]:
+    """
+    Streams the progress events of a shared run from an existing subscription,
+    then raises the run's error, if any, like the unshared stream does.
+    """
+    try:
+        while True:
+            event = await queue.get()
+            yield event.data_line
+            if event['type'] in ('error', 'completed'):
+                break
+        await asyncio.shield(flight.task)
+    except asyncio.CancelledError:
+        raise HTTPException(status_code=503, detail="Task was cancelled.")
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+    finally:
+        await flight.summarizer.task_manager.remove_subscriber(flight.task_id, queue)
+
+def get_working_prompts(input_prompt_field: Optional[str], prompt_type:str,
+                        prompt_version: Optional[str] = None)->str:
     """Helper function to initialise default prompts in case of no input"""
     if not input_prompt_field:
-        with open(os.path.join("prompt_templates",f"{prompt_type}.txt"), "r") as f:
-            prompt = f.read()
-            logger.info(f"No {prompt_type} provided. Proceeding with default prompt")
+        try:
+            prompt = prompt_registry.get(prompt_type, prompt_version)
+        except KeyError as e:
+            raise HTTPException(status_code=422, detail=e.args[0])
+        logger.debug("No %s provided. Proceeding with default prompt", prompt_type)
     else:
         prompt = input_prompt_field
     
     return prompt
 
 
-async def get_full_text(event_generator):
+def resolve_prompts(request: SummaryRequestModel) -> Tuple[str, str, str, str]:
     """
-    Collects the streamed final summary from the generator and returns the full output.
-    
+    Resolves the request's prompts, filling the missing ones from the templates.
+
     Returns:
-        (summary_text, time_taken_in_seconds, status_code)
+        (system_prompt, primary_prompt, secondary_reduction_prompt, final_reduction_prompt)
     """
-    full_summary = []
-    start_time = time.time()
-    async for line in event_generator():
-        if line.startswith('data: '):
-            event_data = json.loads(line[6:])
-            if event_data['type'] in ['final_summary']:
-                full_summary.append(event_data['token'])
-            elif event_data['type']=='error':
-                full_summary.append(event_data['message'])
-    full_summary = ''.join(full_summary)
-    status_code = 200
-    if event_data['type'] == 'error':
-        status_code = 500
-    
-    total_time = time.time() - start_time
-    return full_summary,total_time, status_code
+    return (
+        get_working_prompts(request.system_prompt, "system_prompt", request.prompt_version),
+        get_working_prompts(request.primary_prompt, "primary_prompt", request.prompt_version),
+        get_working_prompts(request.secondary_reduction_prompt, "secondary_reduction_prompt", request.prompt_version),
+        get_working_prompts(request.final_reduction_prompt, "final_reduction_prompt", request.prompt_version),
+    )
+
+
+def build_summarizer(request: SummaryRequestModel) -> Summarizer:
+    """
+    Creates a Summarizer configured from a summary request.
+
+    With `auto_tune`, chunking and parallelism are taken from the planner
+    instead of the request, which overrides the request's own values.
+    """
+    config = SummaryConfig(
+        model = os.getenv('LLM_MODEL'),
+        primary_chunk_size = request.primary_chunk_size,
+        secondary_chunk_size = request.secondary_chunk_size,
+        max_parallel_requests= request.max_parallel_requests,
+        temperature= request.temperature,
+        max_tokens_per_request = request.max_tokens_per_request,
+        chunking_mode = request.chunking_mode,
+        primary_chunk_tokens = request.primary_chunk_tokens,
+        final_input_tokens = request.final_input_tokens,
+        use_cache = request.use_cache,
+        max_retries = request.max_retries,
+        request_timeout = request.request_timeout,
+        hedge_percentile = request.hedge_percentile,
+        sse_flush_interval = request.sse_flush_interval,
+        sse_flush_bytes = request.sse_flush_bytes,
+        deduplicate = request.deduplicate,
+        dedup_threshold = request.dedup_threshold,
+        engine = request.engine,
+        extractive_fallback = request.extractive_fallback,
+        primary_model = request.primary_model,
+        secondary_model = request.secondary_model,
+        final_model = request.final_model,
+        primary_temperature = request.primary_temperature,
+        secondary_temperature = request.secondary_temperature,
+        final_temperature = request.final_temperature,
+        primary_max_tokens = request.primary_max_tokens,
+        secondary_max_tokens = request.secondary_max_tokens,
+        final_max_tokens = request.final_max_tokens
+    )
+    plan = None
+    if request.auto_tune:
+        plan = plan_request(request.paragraphs, request.context_tokens, config.max_summary_tokens,
+                            scheduler.max_concurrency, call_latencies, request.target_latency,
+                            request.token_budget, request.final_input_tokens)
+        config.chunking_mode = "tokens"
+        config.primary_chunk_tokens = plan.primary_chunk_tokens
+        config.secondary_chunk_size = plan.secondary_chunk_size
+        config.max_parallel_requests = plan.max_parallel_requests
+        config.final_input_tokens = plan.final_input_tokens
+        logger.info("Auto-tuned plan: %s", plan.to_dict())
+    api_key = os.getenv("OPENAI_API_KEY")
+    if api_key is None and request.engine == "extractive":
+        api_key = "unused"  # the extractive engine makes no LLM calls
+    try:
+        return Summarizer(api_key, config, plan=plan)
+    except OpenAIError as e:
+        raise HTTPException(status_code=503, detail=f"Error in initialising the LLM model\n{e}")
 
 
 # Update the /summarize endpoint
@@ -357,37 +941,55 @@ async def create_summary(request: SummaryRequestModel):
         - JSONResponse with full summary and execution time otherwise
     """
     task_id = str(uuid.uuid4())
+    task_id_var.set(task_id)
     with tracer.start_as_current_span("summarize") as start_trace:
 
-        primary_prompt = get_working_prompts(request.primary_prompt, "primary_prompt")
-        secondary_reduction_prompt = get_working_prompts(request.secondary_reduction_prompt, "secondary_reduction_prompt")
-        final_reduction_prompt = get_working_prompts(request.final_reduction_prompt, "final_reduction_prompt")
-        system_prompt = get_working_prompts(request.system_prompt, "system_prompt")
-        logger.info(f"primary_chunk_size: {request.primary_chunk_size}")
-        logger.info(f"secondary_chunk_size: {request.secondary_chunk_size}")
-        logger.info(f"max_parallel_requests: {request.max_parallel_requests}")
-        logger.info(f"temperature: {request.temperature}")
-        logger.info(f"max_tokens_per_request: {request.max_tokens_per_request}")
+        system_prompt, primary_prompt, secondary_reduction_prompt, final_reduction_prompt = resolve_prompts(request)
+        logger.info("Summary request: %s paragraphs, primary_chunk_size=%s, secondary_chunk_size=%s, "
+                    "max_parallel_requests=%s, temperature=%s, max_tokens_per_request=%s, chunking_mode=%s",
+                    len(request.paragraphs), request.primary_chunk_size, request.secondary_chunk_size,
+                    request.max_parallel_requests, request.temperature, request.max_tokens_per_request,
+                    request.chunking_mode)
         
-        try:
-            summarizer = Summarizer(
-                os.getenv("OPENAI_API_KEY"),
-                SummaryConfig(
-                    model = os.getenv('LLM_MODEL'),
-                    primary_chunk_size = request.primary_chunk_size,
-                    secondary_chunk_size = request.secondary_chunk_size,
-                    max_parallel_requests= request.max_parallel_requests,
-                    temperature= request.temperature,
-                    max_tokens_per_request = request.max_tokens_per_request
-                )
+        summarizer = build_summarizer(request)
+        prompts = (system_prompt, primary_prompt, secondary_reduction_prompt, final_reduction_prompt)
+        start_time = time.time()
+
+        if request.reuse_results:
+            key = request_key(request, prompts, summarizer.config.model)
+            stored = await result_store.get(key)
+            if stored is not None:
+                logger.info("Serving stored result of an identical request")
+                return stored_response(stored, request.stream, start_time)
+            flight = result_store.attach(key)
+            if flight is not None:
+                logger.info("Attaching to running identical task %s", flight.task_id)
+            else:
+                # Always streamed: a streaming request may attach after the final call started
+                flight = result_store.start(key, task_id, summarizer,
+                                            summarizer.summarize(task_id, request.paragraphs, *prompts,
+                                                                 request.document_id, stream_final=True))
+            attached = flight.task_id != task_id
+            if request.stream:
+                # Subscribed before returning, so the stream cannot miss the end of a short run
+                queue = await flight.summarizer.task_manager.create_subscriber(flight.task_id)
+                return StreamingResponse(flight_events(flight, queue), media_type="text/event-stream",
+                                         headers=SSE_HEADERS)
+            try:
+                # Shielded: a disconnecting client must not cancel a run others are waiting for
+                result = await asyncio.shield(flight.task)
+            except HTTPException:
+                raise
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+            content = result_content(vars(result), start_time, cache_hit=False)
+            content['attached'] = attached
+            return JSONResponse(content=content)
 
-            )
-        except OpenAIError as e:
-            raise HTTPException(status_code=503, detail=f"Error in initialising the LLM model\n{e}")
-        
         async def event_generator():
             start_trace.add_event(f"Created subscriber with task_id: {task_id}", timestamp=int(time.time()))
             queue = await summarizer.task_manager.create_subscriber(task_id)
+            process_task = None
             try:
                 # Start processing in background
                 start_trace.add_event("Started Summarization process in background", timestamp=int(time.time()))
@@ -397,15 +999,16 @@ async def create_summary(request: SummaryRequestModel):
                                             system_prompt,
                                             primary_prompt,
                                             secondary_reduction_prompt,
-                                            final_reduction_prompt)
+                                            final_reduction_prompt,
+                                            request.document_id)
                 )
                 while True:
                     event = await queue.get()
                     if event['type'] in ['error','completed']:
-                        yield f"data: {json.dumps(event)}\n\n"
+                        yield event.data_line
                         break
                     else:
-                        yield f"data: {json.dumps(event)}\n\n"
+                        yield event.data_line
                         
                 await process_task
             except asyncio.CancelledError:
@@ -417,22 +1020,86 @@ async def create_summary(request: SummaryRequestModel):
                 raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
             finally:
                 await summarizer.task_manager.remove_subscriber(task_id, queue)
-                summarizer.task_manager.cleanup_task(task_id)
-        
+                if process_task is None or process_task.done():
+                    summarizer.task_manager.cleanup_task(task_id)
+                else:
+                    # Client left mid-run: the run keeps publishing, so clean up once it ends
+                    process_task.add_done_callback(lambda _: summarizer.task_manager.cleanup_task(task_id))
+
         if request.stream:
-            return StreamingResponse(
-                event_generator(),
-                media_type="text/event-stream",
-                headers={
-                    "Cache-Control": "no-cache",
-                    "Connection": "keep-alive",
-                    "Access-Control-Allow-Origin": "*",
-                    "Content-Type": "text/event-stream"
-                }
-            )
-        else:  
-            full_summary,total_time,status_code = await get_full_text(event_generator)
-            return JSONResponse(content= {'summary' : full_summary,
-                                        'time_taken (sec)' : total_time},
-                                status_code= status_code,
-                                media_type="text/event-stream")
\ No newline at end of file
+            return StreamingResponse(event_generator(), media_type="text/event-stream", headers=SSE_HEADERS)
+        else:
+            # Direct path: no subscriber, so no SSE encoding and a non-streaming final call
+            try:
+                result = await summarizer.summarize(task_id,
+                                                    request.paragraphs,
+                                                    system_prompt,
+                                                    primary_prompt,
+                                                    secondary_reduction_prompt,
+                                                    final_reduction_prompt,
+                                                    request.document_id)
+            except HTTPException:
+                raise
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+            finally:
+                summarizer.task_manager.cleanup_task(task_id)
+            return JSONResponse(content=result_content(vars(result), start_time, cache_hit=False))
+
+
+@new_router.get("/documents/{document_id}")
+async def get_document(document_id: str):
+    """
+    Endpoint describing the stored reduction tree of a document used for
+    incremental re-summarization.
+
+    Response:
+        JSON with the number of stored nodes per level and the last update time.
+    """
+    document = await document_store.load(document_id)
+    if document is None:
+        raise HTTPException(status_code=404, detail=f"Document {document_id} not found")
+    levels = defaultdict(int)
+    for node in document["nodes"].values():
+        levels[node["level"]] += 1
+    return {"document_id": document_id,
+            "nodes_per_level": dict(sorted(levels.items())),
+            "updated_at": document["updated_at"]}
+
+
+@new_router.delete("/documents/{document_id}")
+async def delete_document(document_id: str):
+    """
+    Endpoint dropping the stored reduction tree of a document, so its next
+    run is summarized from scratch.
+    """
+    if not await document_store.delete(document_id):
+        raise HTTPException(status_code=404, detail=f"Document {document_id} not found")
+    return {"document_id": document_id, "deleted": True}
+
+
+@new_router.get("/prompts")
+async def get_prompts():
+    """
+    Endpoint listing the prompt template versions selectable with `prompt_version`.
+    """
+    return {"versions": prompt_registry.versions()}
+
+
+@new_router.get("/stats")
+async def get_stats():
+    """
+    Endpoint reporting process-wide runtime statistics.
+
+    Response:
+        JSON with the LLM scheduler's in-flight calls, queue depth and wait times,
+        the response cache's and result store's hit/miss counters (and runs
+        shared by identical requests), per-stage timings, call
+        latencies, queue waits and token usage aggregated over recent runs, and
+        the state of each routed LLM endpoint (null without a router).
+    """
+    return {"scheduler": scheduler.stats(),
+            "cache": response_cache.stats(),
+            "results": result_store.stats(),
+            "pipeline": pipeline_stats.stats(),
+            "router": llm_router.stats() if llm_router is not None else None}
\ No newline at end of file
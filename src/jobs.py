@@ -0,0 +1,225 @@
+"""Detached Summarization Jobs
+This module decouples a summarization job from the HTTP connection that
+started it. A job is submitted once, runs in the background, and any number
+of connections can attach to its progress stream, resuming from the last
+event they saw via the SSE `Last-Event-ID` header. Finished jobs are retained
+for a while so their result can be fetched after a dropped connection.
+Job state and events go through the task backend, so with a shared backend a
+job can be polled and followed from any worker, not only the one running it.
+
+Key Components:
+- Job: A background summarization run and its outcome.
+- JobRegistry: Tracks jobs and evicts finished ones by TTL and count.
+- jobs_router: `/jobs` endpoints to submit, attach to and fetch jobs.
+"""
+import os
+import time
+import uuid
+import asyncio
+from collections import OrderedDict
+from typing import AsyncGenerator, Dict, Optional
+
+from fastapi import APIRouter, HTTPException, Header
+from fastapi.responses import StreamingResponse, JSONResponse
+
+from src.models import SummaryRequestModel
+from src.log import logger
+from src.events import Event
+from src.executor import Summarizer, build_summarizer, resolve_prompts
+from src.task_backends import TaskManagerBackend, task_backend
+
+TERMINAL_EVENTS = ("completed", "error")
+
+
+class Job:
+    """
+    A summarization run detached from any client connection.
+
+    Attributes:
+        task_id (str): Identifier used for the job and its progress events.
+        summarizer (Summarizer): Summarizer running the job; owns its event stream.
+        status (str): running, completed or failed.
+        result (str): Final summary once completed.
+        error (str): Failure detail if the job failed.
+    """
+
+    def __init__(self, task_id: str, summarizer: Summarizer):
+        self.task_id = task_id
+        self.summarizer = summarizer
+        self.status = "running"
+        self.result: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+    async def run(self, request: SummaryRequestModel, prompts):
+        task_manager = self.summarizer.task_manager
+        await task_manager.set_state(self.task_id, self.describe())
+        try:
+            self.result = await self.summarizer.process_text(self.task_id, request.paragraphs,
+                                                             *prompts, request.document_id)
+            self.status = "completed"
+        except HTTPException as e:
+            self.status, self.error = "failed", e.detail
+        except Exception as e:
+            self.status, self.error = "failed", str(e)
+            logger.error("Job %s failed: %s", self.task_id, e)
+        finally:
+            self.finished_at = time.time()
+            await task_manager.set_state(self.task_id, self.describe())
+
+    def describe(self) -> Dict:
+        end = self.finished_at or time.time()
+        return {
+            "task_id": self.task_id,
+            "status": self.status,
+            "summary": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "time_taken (sec)": end - self.created_at,
+        }
+
+
+class JobRegistry:
+    """
+    Keeps submitted jobs. Finished jobs are evicted once older than `ttl`
+    seconds or when more than `max_finished` of them are retained.
+    """
+
+    def __init__(self, ttl: float = 3600, max_finished: int = 100):
+        self.ttl = ttl
+        self.max_finished = max_finished
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+
+    def submit(self, request: SummaryRequestModel) -> Job:
+        """
+        Starts a job for the request in the background and returns it.
+        """
+        self.evict()
+        prompts = resolve_prompts(request)
+        job = Job(str(uuid.uuid4()), build_summarizer(request))
+        job.task = asyncio.create_task(job.run(request, prompts))
+        self._jobs[job.task_id] = job
+        return job
+
+    def get(self, task_id: str) -> Optional[Job]:
+        self.evict()
+        return self._jobs.get(task_id)
+
+    def evict(self):
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job.finished_at is not None]
+        expired = [job for job in finished if now - job.finished_at > self.ttl]
+        overflow = len(finished) - len(expired) - self.max_finished
+        if overflow > 0:
+            expired += sorted((job for job in finished if job not in expired),
+                              key=lambda job: job.finished_at)[:overflow]
+        for job in expired:
+            job.summarizer.task_manager.cleanup_task(job.task_id)
+            del self._jobs[job.task_id]
+
+
+job_registry = JobRegistry(ttl=float(os.getenv("JOB_TTL", "3600")),
+                           max_finished=int(os.getenv("JOB_MAX_RETAINED", "100")))
+
+jobs_router = APIRouter()
+
+
+def format_sse(event: Event) -> str:
+    """
+    Encodes an event as an SSE message whose ID is the event sequence number.
+    """
+    return f"id: {event.seq}\n{event.data_line}"
+
+
+def gap_event(task_id: str, last_event_id: int, next_seq: int) -> Event:
+    """
+    Tells a resuming client that the events between `last_event_id` and
+    `next_seq` have left the replay buffer, so a summary rebuilt from the
+    stream would be incomplete. Its ID lets a later reconnect resume without
+    reporting the gap again.
+    """
+    return Event({"type": "reset", "task_id": task_id, "missed_after": last_event_id, "resumes_at": next_seq,
+                  "message": f"Events {last_event_id + 1} to {next_seq - 1} are no longer available; "
+                             f"fetch the summary from /jobs/{task_id} once completed"},
+                 seq=next_seq - 1)
+
+
+async def stream_job_events(task_manager: TaskManagerBackend, task_id: str, finished: bool,
+                            last_event_id: Optional[int]) -> AsyncGenerator[str, None]:
+    queue = await task_manager.create_subscriber(task_id, last_event_id)
+    try:
+        if finished and queue.empty():
+            # The client already received the whole stream
+            return
+        expected = last_event_id + 1 if last_event_id is not None else None
+        while True:
+            event = await queue.get()
+            if expected is not None and event.seq > expected:
+                yield format_sse(gap_event(task_id, last_event_id, event.seq))
+            expected = None
+            yield format_sse(event)
+            if event['type'] in TERMINAL_EVENTS:
+                break
+    finally:
+        await task_manager.remove_subscriber(task_id, queue)
+
+
+@jobs_router.post("/jobs", status_code=202)
+async def submit_job(request: SummaryRequestModel):
+    """
+    Endpoint submitting a detached summarization job.
+
+    Response:
+        JSON with the `task_id` used to attach to the job's events and fetch its result.
+    """
+    job = job_registry.submit(request)
+    return {"task_id": job.task_id, "status": job.status}
+
+
+@jobs_router.get("/jobs/{task_id}")
+async def get_job(task_id: str):
+    """
+    Endpoint returning a job's status and, once completed, its summary. A
+    failed job is a successful lookup: its `status` is "failed" and `error`
+    holds the reason.
+    """
+    job = job_registry.get(task_id)
+    state = job.describe() if job is not None else await task_backend.get_state(task_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail=f"Job {task_id} not found")
+    return JSONResponse(content=state)
+
+
+@jobs_router.get("/jobs/{task_id}/events")
+async def get_job_events(task_id: str, last_event_id: Optional[str] = Header(default=None)):
+    """
+    Endpoint streaming a job's progress as SSE. Reconnecting clients send the
+    `Last-Event-ID` header to resume after the last event they received;
+    events still in the replay buffer are sent again first, preceded by a
+    `reset` event if some of the missed ones were already evicted from it.
+    """
+    job = job_registry.get(task_id)
+    if job is not None:
+        task_manager, finished = job.summarizer.task_manager, job.finished_at is not None
+    else:
+        # Job running on (or finished by) another worker sharing the backend
+        state = await task_backend.get_state(task_id)
+        if state is None:
+            raise HTTPException(status_code=404, detail=f"Job {task_id} not found")
+        task_manager, finished = task_backend, state["status"] != "running"
+    try:
+        resume_after = int(last_event_id) if last_event_id else None
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Last-Event-ID must be an integer")
+    return StreamingResponse(
+        stream_job_events(task_manager, task_id, finished, resume_after),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "Access-Control-Allow-Origin": "*",
+            "Content-Type": "text/event-stream"
+        }
+    )
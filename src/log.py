@@ -1,46 +1,130 @@
-from pathlib import Path
+"""Logging Setup
+Configures non-blocking, structured logging. Callers only put records on an
+in-memory queue; formatting, disk writes and file rotation happen on a
+background `QueueListener` thread, so they never stall the event loop.
+
+Records are written as JSON lines (or plain text with `LOG_FORMAT=text`) and
+carry the `task_id` of the summarization they belong to, taken from a context
+variable. Messages should use %-style arguments, e.g.
+`logger.info("Primary count: %s", count)`, so they are only rendered, on the
+listener thread, when the record is actually emitted. Debug records can be
+sampled to keep high-volume lines affordable.
+
+Key Components:
+- task_id_var: Context variable holding the current task ID.
+- JSONFormatter: Renders records as one JSON object per line.
+- ContextFilter: Attaches the task ID to records as they are logged.
+- SamplingFilter: Keeps a fraction of debug records.
+- setup_logging: Wires the queue handler, listener and output handlers.
+"""
+import os
+import json
+import queue
+import atexit
+import random
 import logging
-from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from contextvars import ContextVar
+from typing import Optional
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+
+task_id_var: ContextVar[Optional[str]] = ContextVar("task_id", default=None)
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Formats a record as a JSON object with time, level, logger, task ID and message.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "task_id": getattr(record, "task_id", None),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class ContextFilter(logging.Filter):
+    """
+    Copies the current task ID onto the record. Runs in the logging caller,
+    where the context variable is visible.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "task_id"):
+            record.task_id = task_id_var.get()
+        return True
+
 
-def setup_logging(log_filename='logs//app.log'):
+class SamplingFilter(logging.Filter):
+    """
+    Keeps every record above DEBUG and a `rate` fraction of DEBUG records.
+    """
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or self.rate >= 1 or random.random() < self.rate
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Queue handler that leaves message formatting to the listener thread.
+    The stock handler renders the message before queueing it.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _file_handler(log_filename: str) -> RotatingFileHandler:
+    log_file = Path(log_filename)
+    if not log_file.parent.exists():
+        log_file.parent.mkdir(parents=True)
+        print(f"Folder '{log_file.parent}' created.")
+    return RotatingFileHandler(log_filename, maxBytes=10*1024*1024, backupCount=10)
+
+
+def setup_logging(log_filename: str = 'logs//app.log', level: str = os.getenv("LOG_LEVEL", "INFO"),
+                  log_format: str = os.getenv("LOG_FORMAT", "json"),
+                  debug_sample_rate: float = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))):
     """
     Configures logging for the application.
-    
+
     :param log_filename: Name of the log file.
+    :param level: Minimum level logged.
+    :param log_format: "json" for structured records or "text".
+    :param debug_sample_rate: Fraction of DEBUG records kept.
     """
-    # Set up logging configuration
     logger = logging.getLogger()
-    logger.setLevel(logging.INFO)
-
-    # Create a rotating file handler
-    try:
-        handler = RotatingFileHandler(log_filename, maxBytes=10*1024*1024, backupCount=10)
-    except FileNotFoundError:
-        log_folder = Path(log_filename.split('//')[0])
-        log_file = Path(log_filename)
-        if not log_folder.exists():
-            log_folder.mkdir()
-            print(f"Folder '{log_folder}' created.")
-        # Create the file if it does not exist
-        if not log_file.exists():
-            log_file.touch()
-            print(f"File '{log_file}' created.")
-        handler = RotatingFileHandler(log_filename, maxBytes=10*1024*1024, backupCount=10)
-
-    handler.setLevel(logging.DEBUG)
-
-    # Create a console handler to log messages to stdout
+    logger.setLevel(level)
+
+    handler = _file_handler(log_filename)
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
-
-    # Define the format for log messages
-    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    if log_format == "json":
+        formatter = JSONFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(task_id)s - %(message)s')
     handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
 
-    # Add handlers to the logger
-    logger.addHandler(handler)
-    logger.addHandler(console_handler)
+    # Callers only enqueue; the listener thread formats and writes
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(debug_sample_rate))
+    queue_handler.addFilter(ContextFilter())
+    listener = QueueListener(log_queue, handler, console_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    logger.addHandler(queue_handler)
 
     # Log a message indicating that logging has been configured
     logger.info("Logging is configured.")
@@ -48,4 +132,4 @@ def setup_logging(log_filename='logs//app.log'):
     return logger
 
 # Set up the logger
-logger = setup_logging()
\ No newline at end of file
+logger = setup_logging()
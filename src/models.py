@@ -1,8 +1,19 @@
+import os
 from pydantic import Field, BaseModel,field_validator
 from typing import Optional, List, Literal
 from fastapi.exceptions import RequestValidationError
 from src.log import logger
 
+
+def _env(name: str, cast, fallback=None):
+    """Factory of a default read from the environment when a request is
+    created, or `fallback` (None: use the shared setting) when unset"""
+    def default():
+        value = os.getenv(name)
+        return cast(value) if value else fallback
+    return default
+
+
 class SummaryRequestModel(BaseModel):
 
     paragraphs: List[str] = Field(
@@ -31,11 +42,139 @@ class SummaryRequestModel(BaseModel):
         default=None
     )
     primary_chunk_size: Optional[int] = 15
-    secondary_chunk_size: Optional[int] = 10    # paragraphs per secondary chunk
-    max_parallel_requests: Optional[int] = 10   # concurrent API requests
+    secondary_chunk_size: Optional[int] = 10    # summaries combined per reduction call (0: token budget only)
+    max_parallel_requests: Optional[int] = Field(default=10, gt=0, description="Concurrent API requests of this request")
     temperature: Optional[float] = 0.3
     max_tokens_per_request: Optional[int] = 700
     stream: Optional[bool] = False
+    chunking_mode: Optional[Literal['paragraphs', 'tokens']] = 'paragraphs'
+    primary_chunk_tokens: Optional[int] = Field(
+        default=2000,
+        gt=0,
+        description="Token budget per primary chunk when chunking_mode is 'tokens'"
+    )
+    final_input_tokens: Optional[int] = Field(
+        default=6000,
+        gt=0,
+        description="Token budget of the final reduction input; summaries are reduced level by level until they fit"
+    )
+    use_cache: Optional[bool] = Field(
+        default=True,
+        description="Reuse cached summaries of byte-identical chunk calls"
+    )
+    max_retries: Optional[int] = Field(default=3, ge=0, description="Retries of a failed LLM call")
+    request_timeout: Optional[float] = Field(default=120.0, gt=0, description="Per-attempt LLM call timeout in seconds")
+    hedge_percentile: Optional[float] = Field(
+        default=0.0,
+        ge=0,
+        lt=100,
+        description="Send a duplicate LLM request once a call exceeds this latency percentile (0 disables hedging)"
+    )
+    prompt_version: Optional[str] = Field(
+        default=None,
+        description="Named prompt template version used for prompts that are not provided"
+    )
+    document_id: Optional[str] = Field(
+        default=None,
+        min_length=1,
+        description="Stores the reduction tree under this ID and reuses unchanged chunk summaries on later runs"
+    )
+    sse_flush_interval: Optional[float] = Field(
+        default_factory=_env("SSE_FLUSH_INTERVAL", float, 0.05),
+        ge=0,
+        description="Seconds streamed final summary tokens are batched into one event (0 with sse_flush_bytes 0 sends every token)"
+    )
+    sse_flush_bytes: Optional[int] = Field(
+        default_factory=_env("SSE_FLUSH_BYTES", int, 512),
+        ge=0,
+        description="Batched token bytes that trigger an event before the flush interval ends"
+    )
+    auto_tune: Optional[bool] = Field(
+        default=False,
+        description="Choose primary_chunk_tokens, secondary_chunk_size and max_parallel_requests from the input size and observed latency"
+    )
+    target_latency: Optional[float] = Field(
+        default=None,
+        gt=0,
+        description="With auto_tune, seconds to finish within; the cheapest plan meeting it is chosen instead of the fastest"
+    )
+    token_budget: Optional[int] = Field(
+        default=None,
+        gt=0,
+        description="With auto_tune, maximum estimated prompt plus completion tokens of the run"
+    )
+    context_tokens: Optional[int] = Field(
+        default=int(os.getenv("LLM_CONTEXT_TOKENS", "16384")),
+        gt=0,
+        description="Context window of the model, bounding every call of an auto-tuned plan"
+    )
+    deduplicate: Optional[bool] = Field(
+        default=False,
+        description="Collapse exact and near-duplicate paragraphs into one annotated paragraph before chunking"
+    )
+    dedup_threshold: Optional[float] = Field(
+        default=0.85,
+        gt=0,
+        le=1,
+        description="Estimated word-shingle Jaccard similarity at which paragraphs count as near-duplicates"
+    )
+    engine: Optional[Literal['llm', 'extractive', 'hybrid']] = Field(
+        default='llm',
+        description="'extractive' selects sentences locally without LLM calls; 'hybrid' does so for primary chunks only"
+    )
+    extractive_fallback: Optional[bool] = Field(
+        default=False,
+        description="Answer LLM calls that still fail after their retries with an extractive summary"
+    )
+    primary_model: Optional[str] = Field(
+        default_factory=_env("LLM_PRIMARY_MODEL", str),
+        description="Model of the primary stage (default: LLM_MODEL)"
+    )
+    primary_temperature: Optional[float] = Field(
+        default_factory=_env("LLM_PRIMARY_TEMPERATURE", float),
+        ge=0,
+        le=2,
+        description="Temperature of the primary stage (default: temperature)"
+    )
+    primary_max_tokens: Optional[int] = Field(
+        default_factory=_env("LLM_PRIMARY_MAX_TOKENS", int),
+        gt=0,
+        description="Completion token limit of the primary stage (default: max_tokens_per_request)"
+    )
+    secondary_model: Optional[str] = Field(
+        default_factory=_env("LLM_SECONDARY_MODEL", str),
+        description="Model of the secondary stage (default: LLM_MODEL)"
+    )
+    secondary_temperature: Optional[float] = Field(
+        default_factory=_env("LLM_SECONDARY_TEMPERATURE", float),
+        ge=0,
+        le=2,
+        description="Temperature of the secondary stage (default: temperature)"
+    )
+    secondary_max_tokens: Optional[int] = Field(
+        default_factory=_env("LLM_SECONDARY_MAX_TOKENS", int),
+        gt=0,
+        description="Completion token limit of the secondary stage (default: max_tokens_per_request)"
+    )
+    final_model: Optional[str] = Field(
+        default_factory=_env("LLM_FINAL_MODEL", str),
+        description="Model of the final stage (default: LLM_MODEL)"
+    )
+    final_temperature: Optional[float] = Field(
+        default_factory=_env("LLM_FINAL_TEMPERATURE", float),
+        ge=0,
+        le=2,
+        description="Temperature of the final stage (default: temperature)"
+    )
+    final_max_tokens: Optional[int] = Field(
+        default_factory=_env("LLM_FINAL_MAX_TOKENS", int),
+        gt=0,
+        description="Completion token limit of the final stage (default: max_tokens_per_request)"
+    )
+    reuse_results: Optional[bool] = Field(
+        default=False,
+        description="Answer identical requests from the result store and attach to an identical running one"
+    )
     # @validator('paragraphs') # deprecated in pydantic v2
     @field_validator('paragraphs')
     def validate_paragraphs(cls, v):
@@ -43,6 +182,15 @@ class SummaryRequestModel(BaseModel):
             raise RequestValidationError([{'msg':"All paragraph elements must be non-empty strings"}])
         return v
 
+class BatchRequestModel(BaseModel):
+
+    input_path: str = Field(description="JSONL file with one summary request per line, relative to BATCH_DIR")
+    output_path: Optional[str] = Field(
+        default=None,
+        description="JSONL file (relative to BATCH_DIR) receiving results; reusing it resumes an interrupted batch"
+    )
+    max_concurrent_documents: Optional[int] = Field(default=4, gt=0)
+
 # Input data model is in JSON
 class LinkData(BaseModel):
     json_data: dict  # Input JSON with links
\ No newline at end of file
@@ -0,0 +1,166 @@
+"""Auto-Tuning Planner
+This module picks chunking and parallelism for a request instead of leaving
+`primary_chunk_size`, `secondary_chunk_size` and `max_parallel_requests` to
+the caller. It estimates the call tree of candidate plans from the input size
+in tokens, the model's context window and the per-call latency observed by
+this process, and returns:
+
+- with a target latency: the cheapest plan (fewest tokens, then fewest
+  parallel calls) expected to meet it, or the fastest plan if none does;
+- otherwise: the fastest plan within the token budget.
+
+Estimates assume every summary uses its full token limit, like the reduction
+planning in the executor, and add up the waves of each level
+without the overlap that pipelining gains, so they err on the slow side.
+
+Key Components:
+- Plan: The chosen settings and the estimates behind them.
+- estimate_plan: Call count, tokens and wall-clock time of one candidate.
+- plan_request: Searches the candidates for a request.
+"""
+import math
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional
+
+from src.chunking import estimate_tokens
+from src.retry import LatencyTracker
+
+# Assumed duration of a full-length completion before any call was observed (sec)
+DEFAULT_CALL_LATENCY = 8.0
+# Observed calls needed before their latency replaces the default
+MIN_LATENCY_SAMPLES = 5
+# Extra time per input token, on top of the generation-bound base latency (sec)
+PREFILL_SECONDS_PER_TOKEN = 0.0002
+# Tokens reserved for the system and instruction prompts of each call
+PROMPT_OVERHEAD_TOKENS = 300
+
+CHUNK_TOKEN_CANDIDATES = (500, 1000, 1500, 2000, 3000, 4000, 6000, 8000, 12000)
+FAN_IN_CANDIDATES = (2, 3, 4, 5, 6, 8, 10, 12, 16)
+
+
+@dataclass
+class Plan:
+    """
+    Settings chosen by the planner and their estimated cost.
+
+    Attributes:
+        primary_chunk_tokens (int): Token budget per primary chunk ("tokens" chunking).
+        secondary_chunk_size (int): Reduction fan-in.
+        max_parallel_requests (int): Concurrent LLM calls for the request.
+        final_input_tokens (int): Token budget of a reduction or final call's content.
+        input_tokens (int): Estimated tokens of the input paragraphs.
+        estimated_calls (int): LLM calls of the plan, including the final one.
+        estimated_tokens (int): Prompt plus completion tokens of all calls.
+        estimated_latency (float): Estimated wall-clock time (sec).
+        call_latency (float): Per-call latency the estimate is based on (sec).
+        latency_source (str): "observed" or "default".
+        meets_target (Optional[bool]): Whether the estimate is within the target latency.
+    """
+    primary_chunk_tokens: int
+    secondary_chunk_size: int
+    max_parallel_requests: int
+    final_input_tokens: int
+    input_tokens: int
+    estimated_calls: int
+    estimated_tokens: int
+    estimated_latency: float
+    call_latency: float
+    latency_source: str
+    meets_target: Optional[bool] = None
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def _call_time(call_latency: float, input_tokens: int) -> float:
+    return call_latency + input_tokens * PREFILL_SECONDS_PER_TOKEN
+
+
+def estimate_plan(input_tokens: int, chunk_tokens: int, fan_in: int, parallel: int, max_tokens: int,
+                  final_input_tokens: int, call_latency: float, max_levels: int = 8) -> Dict:
+    """
+    Estimates calls, tokens and wall-clock time of a plan, level by level.
+    """
+    chunks = max(1, math.ceil(input_tokens / chunk_tokens))
+    calls, tokens, latency = 0, 0, 0.0
+    summaries = chunks
+    if chunks > 1:
+        size = min(chunk_tokens, input_tokens) + PROMPT_OVERHEAD_TOKENS
+        calls += chunks
+        tokens += input_tokens + chunks * (PROMPT_OVERHEAD_TOKENS + max_tokens)
+        latency += math.ceil(chunks / parallel) * _call_time(call_latency, size)
+    else:
+        summaries = 1
+    level = 0
+    # Fan-in is capped so worst-case summaries fit one reduction call
+    fan_in = max(2, min(fan_in, final_input_tokens // max(max_tokens, 1)))
+    while summaries > 1 and summaries * max_tokens > final_input_tokens and level < max_levels:
+        level += 1
+        groups = math.ceil(summaries / fan_in)
+        size = fan_in * max_tokens + PROMPT_OVERHEAD_TOKENS
+        calls += groups
+        tokens += summaries * max_tokens + groups * (PROMPT_OVERHEAD_TOKENS + max_tokens)
+        latency += math.ceil(groups / parallel) * _call_time(call_latency, size)
+        summaries = groups
+    final_input = min(summaries * max_tokens, input_tokens) if chunks > 1 else input_tokens
+    calls += 1
+    tokens += final_input + PROMPT_OVERHEAD_TOKENS + max_tokens
+    latency += _call_time(call_latency, final_input + PROMPT_OVERHEAD_TOKENS)
+    return {"calls": calls, "tokens": tokens, "latency": latency, "levels": level}
+
+
+def plan_request(paragraphs: List[str], context_tokens: int, max_tokens: int, max_parallel: int,
+                 latencies: Optional[LatencyTracker] = None, target_latency: Optional[float] = None,
+                 token_budget: Optional[int] = None, final_input_tokens: Optional[int] = None) -> Plan:
+    """
+    Chooses chunk size, fan-in and parallelism for summarizing `paragraphs`.
+
+    `context_tokens` bounds every call (prompt, content and completion), and
+    `max_parallel` caps the parallelism considered, e.g. at the scheduler's
+    process-wide limit.
+    """
+    input_tokens = sum(estimate_tokens(paragraph) for paragraph in paragraphs)
+    if latencies is not None and len(latencies) >= MIN_LATENCY_SAMPLES:
+        call_latency, source = latencies.percentile(50), "observed"
+    else:
+        call_latency, source = DEFAULT_CALL_LATENCY, "default"
+
+    content_limit = max(max_tokens, context_tokens - PROMPT_OVERHEAD_TOKENS - max_tokens)
+    final_input = min(final_input_tokens or content_limit, content_limit)
+    chunk_options = [size for size in CHUNK_TOKEN_CANDIDATES if size <= content_limit] or [content_limit]
+    parallel_options = sorted({p for p in (1, 2, 4, 8, 16, 32, 64) if p < max_parallel} | {max(1, max_parallel)})
+
+    candidates = []
+    for chunk_tokens in chunk_options:
+        for fan_in in FAN_IN_CANDIDATES:
+            for parallel in parallel_options:
+                estimate = estimate_plan(input_tokens, chunk_tokens, fan_in, parallel, max_tokens,
+                                         final_input, call_latency)
+                candidates.append((estimate, chunk_tokens, fan_in, parallel))
+
+    within_budget = [c for c in candidates if token_budget is None or c[0]["tokens"] <= token_budget]
+    pool = within_budget or candidates
+    if target_latency is not None:
+        meeting = [c for c in pool if c[0]["latency"] <= target_latency]
+        if meeting:
+            best = min(meeting, key=lambda c: (c[0]["tokens"], c[3], c[0]["latency"], -c[2]))
+        else:
+            best = min(pool, key=lambda c: (c[0]["latency"], c[0]["tokens"], c[3], -c[2]))
+    else:
+        # Remaining ties prefer the larger fan-in, which leaves headroom when summaries run short
+        best = min(pool, key=lambda c: (round(c[0]["latency"], 3), c[0]["tokens"], c[3], -c[2]))
+
+    estimate, chunk_tokens, fan_in, parallel = best
+    return Plan(
+        primary_chunk_tokens=chunk_tokens,
+        secondary_chunk_size=fan_in,
+        max_parallel_requests=parallel,
+        final_input_tokens=final_input,
+        input_tokens=input_tokens,
+        estimated_calls=estimate["calls"],
+        estimated_tokens=estimate["tokens"],
+        estimated_latency=round(estimate["latency"], 3),
+        call_latency=round(call_latency, 3),
+        latency_source=source,
+        meets_target=None if target_latency is None else estimate["latency"] <= target_latency,
+    )
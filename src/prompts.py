@@ -0,0 +1,119 @@
+"""Prompt Template Registry
+This module loads the prompt templates once at startup and serves them from
+memory. Templates are resolved relative to the package, not the working
+directory, and may come in named versions:
+
+    prompt_templates/primary_prompt.txt        -> version "default"
+    prompt_templates/v2/primary_prompt.txt     -> version "v2"
+
+A version only needs to contain the templates it changes; missing ones fall
+back to the default version. A background watcher compares file modification
+times and reloads templates that changed on disk.
+
+Key Components:
+- PromptRegistry: In-memory, versioned template store with mtime-based reload.
+- prompt_registry: Shared instance over the repository's `prompt_templates` folder.
+"""
+import os
+import asyncio
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from src.log import logger
+
+DEFAULT_VERSION = "default"
+PROMPT_DIR = Path(__file__).resolve().parent.parent / "prompt_templates"
+
+
+class PromptRegistry:
+    """
+    Versioned prompt templates held in memory.
+
+    Attributes:
+        directory (Path): Root folder of the templates.
+        reload_interval (float): Seconds between modification time checks.
+    """
+
+    def __init__(self, directory: Path = PROMPT_DIR, reload_interval: float = 5.0):
+        self.directory = Path(directory)
+        self.reload_interval = reload_interval
+        self._templates: Dict[str, Dict[str, str]] = {}
+        self._mtimes: Dict[Path, float] = {}
+        self._loaded = False
+
+    def _scan(self) -> Dict[Path, Tuple[str, str, float]]:
+        """
+        Lists template files as {path: (version, name, mtime)}.
+        """
+        files = {}
+        for path in self.directory.glob("*.txt"):
+            files[path] = (DEFAULT_VERSION, path.stem, path.stat().st_mtime)
+        for path in self.directory.glob("*/*.txt"):
+            files[path] = (path.parent.name, path.stem, path.stat().st_mtime)
+        return files
+
+    def load(self) -> bool:
+        """
+        Reads templates whose modification time changed since the last load.
+        Returns whether anything changed.
+        """
+        files = self._scan()
+        changed = set(files) != set(self._mtimes) or any(
+            self._mtimes.get(path) != mtime for path, (_, _, mtime) in files.items()
+        )
+        if not changed and self._loaded:
+            return False
+        templates: Dict[str, Dict[str, str]] = {}
+        for path, (version, name, mtime) in files.items():
+            if self._mtimes.get(path) == mtime and name in self._templates.get(version, {}):
+                text = self._templates[version][name]
+            else:
+                text = path.read_text()
+            templates.setdefault(version, {})[name] = text
+        self._templates = templates
+        self._mtimes = {path: mtime for path, (_, _, mtime) in files.items()}
+        if self._loaded:
+            logger.info("Prompt templates reloaded from %s", self.directory)
+        self._loaded = True
+        return True
+
+    def get(self, name: str, version: Optional[str] = None) -> str:
+        """
+        Returns template `name` of `version`, falling back to the default version.
+        Raises KeyError for unknown versions or templates.
+        """
+        if not self._loaded:
+            self.load()
+        version = version or DEFAULT_VERSION
+        if version not in self._templates:
+            raise KeyError(f"Unknown prompt version '{version}'")
+        template = self._templates[version].get(name, self._templates.get(DEFAULT_VERSION, {}).get(name))
+        if template is None:
+            raise KeyError(f"Unknown prompt template '{name}'")
+        return template
+
+    def versions(self) -> Dict[str, list]:
+        """
+        Lists the template names defined by each version.
+        """
+        if not self._loaded:
+            self.load()
+        return {version: sorted(names) for version, names in self._templates.items()}
+
+    async def watch(self):
+        """
+        Reloads changed templates every `reload_interval` seconds, doing the
+        file system checks in a worker thread. Runs until cancelled.
+        """
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                await asyncio.to_thread(self.load)
+            except OSError as e:
+                logger.error("Error reloading prompt templates: %s", e)
+
+
+prompt_registry = PromptRegistry(
+    Path(os.getenv("PROMPT_TEMPLATE_DIR", PROMPT_DIR)),
+    reload_interval=float(os.getenv("PROMPT_RELOAD_INTERVAL", "5")),
+)
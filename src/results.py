@@ -0,0 +1,152 @@
+"""Request-Level Result Store
+When several clients ask for the same summary, only one run should happen.
+This module keys whole requests on their normalized paragraphs, resolved
+prompts and generation settings and:
+
+- keeps completed results in a bounded store (an in-memory LRU, optionally
+  backed by SQLite, both with a TTL), so a repeated request is answered
+  without running the pipeline;
+- tracks runs in flight (single-flight), so an identical request arriving
+  while one is running attaches to it and shares its progress stream and
+  result instead of starting another.
+
+Key Components:
+- request_key: Key over everything that determines a request's summary.
+- is_storable: Whether a run's result may be served again.
+- Flight: A running summarization shared by identical requests.
+- ResultStore: Completed results and in-flight runs.
+- result_store: Shared instance configured from the environment.
+"""
+import os
+import json
+import time
+import asyncio
+from typing import Awaitable, Dict, Optional, Tuple
+
+from src.log import logger
+from src.models import SummaryRequestModel
+from src.cache import ResponseCache, create_cache, make_key
+
+# Request fields that change how a run executes or is delivered, not its summary
+EXECUTION_FIELDS = frozenset({
+    "paragraphs", "system_prompt", "primary_prompt", "secondary_reduction_prompt", "final_reduction_prompt",
+    "stream", "max_parallel_requests", "use_cache", "max_retries", "request_timeout", "hedge_percentile",
+    "sse_flush_interval", "sse_flush_bytes", "reuse_results",
+})
+
+
+def request_key(request: SummaryRequestModel, prompts: Tuple[str, ...], model: Optional[str]) -> str:
+    """
+    Returns the key of a request: paragraphs with whitespace normalized, the
+    resolved prompts, the default model and every generation setting.
+    """
+    paragraphs = [" ".join(paragraph.split()) for paragraph in request.paragraphs]
+    settings = request.model_dump(exclude=set(EXECUTION_FIELDS))
+    return make_key(paragraphs, list(prompts), model, sorted(settings.items()))
+
+
+def is_storable(stats: Dict) -> bool:
+    """
+    Whether a finished run may be served to later requests: results with
+    calls answered by the extractive fallback stand in for a failed LLM and
+    are not kept.
+    """
+    return not any(stage.get("fallbacks") for stage in stats.get("stages", {}).values())
+
+
+class Flight:
+    """
+    A summarization run that identical requests attach to.
+
+    Attributes:
+        key (str): Request key of the run.
+        task_id (str): Task whose progress events the run broadcasts.
+        summarizer: Summarizer running it; its task manager carries the events.
+        task (asyncio.Task): Resolves to the run's SummaryResult.
+        attached (int): Requests that joined after the first one.
+    """
+
+    def __init__(self, key: str, task_id: str, summarizer):
+        self.key = key
+        self.task_id = task_id
+        self.summarizer = summarizer
+        self.task: Optional[asyncio.Task] = None
+        self.attached = 0
+
+
+class ResultStore:
+    """
+    Completed request results and the runs in flight.
+
+    Attributes:
+        cache (ResponseCache): Bounded store of JSON-encoded results.
+    """
+
+    def __init__(self, cache: ResponseCache):
+        self.cache = cache
+        self._flights: Dict[str, Flight] = {}
+        self.attached = 0
+
+    async def get(self, key: str) -> Optional[Dict]:
+        value = await self.cache.get(key)
+        return json.loads(value) if value is not None else None
+
+    async def put(self, key: str, result: Dict):
+        await self.cache.set(key, json.dumps(result))
+
+    def attach(self, key: str) -> Optional[Flight]:
+        """
+        Returns the run in flight for `key`, counting the caller as attached.
+        """
+        flight = self._flights.get(key)
+        if flight is not None:
+            flight.attached += 1
+            self.attached += 1
+        return flight
+
+    def start(self, key: str, task_id: str, summarizer, run: Awaitable) -> Flight:
+        """
+        Starts `run`, the summarization of the request keyed `key`, in the
+        background. Its result is stored when it succeeds without extractive
+        fallbacks; failed runs store nothing. Either way the flight ends and
+        the task's progress state is cleaned up. The run is not tied to any
+        one connection, so attached requests keep their stream when the first
+        client disconnects.
+        """
+        flight = Flight(key, task_id, summarizer)
+
+        async def fly():
+            try:
+                result = await run
+                if not is_storable(result.stats):
+                    logger.info("Not storing the result of task %s: it used the extractive fallback", task_id)
+                    return result
+                stored = {"summary": result.summary, "timings": result.timings, "stats": result.stats,
+                          "stored_at": time.time()}
+                if result.plan is not None:
+                    stored["plan"] = result.plan
+                try:
+                    await self.put(key, stored)
+                except Exception as e:
+                    logger.error("Storing the result of task %s failed: %s", task_id, e)
+                return result
+            finally:
+                self._flights.pop(key, None)
+                summarizer.task_manager.cleanup_task(task_id)
+
+        flight.task = asyncio.create_task(fly())
+        # Failures reach the clients through their error events or the awaited task
+        flight.task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        self._flights[key] = flight
+        return flight
+
+    def stats(self) -> Dict:
+        return {**self.cache.stats(), "in_flight": len(self._flights), "attached": self.attached}
+
+
+result_store = ResultStore(create_cache(
+    os.getenv("RESULT_STORE_BACKEND", "memory"),
+    max_entries=int(os.getenv("RESULT_STORE_SIZE", "1000")),
+    ttl=float(os.getenv("RESULT_STORE_TTL", "3600")),
+    path=os.getenv("RESULT_STORE_PATH", "cache/results.sqlite3"),
+))
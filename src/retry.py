@@ -0,0 +1,163 @@
+"""Resilient LLM Calls
+This module wraps individual LLM calls with a retry policy: exponential backoff
+with full jitter, `Retry-After` handling for rate limits, and optional hedged
+requests, where a duplicate call is started once the original has been running
+longer than a latency percentile and the first result wins.
+
+Key Components:
+- RetryPolicy: Retry, timeout and hedging parameters.
+- LatencyTracker: Rolling window of call latencies used for the hedging threshold.
+- call_with_retry: Runs a call factory under a policy, reporting retries and hedges.
+"""
+import random
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, Optional, TypeVar
+
+from openai import (APIConnectionError, APITimeoutError, RateLimitError,
+                    InternalServerError, APIStatusError)
+
+T = TypeVar("T")
+
+# Errors worth another attempt; anything else fails the call immediately
+RETRYABLE_ERRORS = (APIConnectionError, APITimeoutError, RateLimitError,
+                    InternalServerError, asyncio.TimeoutError)
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Retry behaviour of a single LLM call.
+
+    Attributes:
+        max_retries (int): Extra attempts after the first one fails.
+        base_delay (float): Backoff ceiling of the first retry, doubled per retry (sec).
+        max_delay (float): Upper bound of any backoff (sec).
+        timeout (float): Per-attempt timeout of the model call (sec).
+        hedge_percentile (float): Latency percentile after which a duplicate
+            request is sent; 0 disables hedging.
+        hedge_min_samples (int): Latencies observed before hedging kicks in.
+    """
+    max_retries: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    timeout: float = 120.0
+    hedge_percentile: float = 0.0
+    hedge_min_samples: int = 20
+
+
+class LatencyTracker:
+    """
+    Rolling window of recent call latencies.
+    """
+
+    def __init__(self, window: int = 500):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def add(self, latency: float):
+        self._samples.append(latency)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+        return ordered[index]
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """
+    Reads the server's requested wait (sec) from a rate limit or status error.
+    """
+    if not isinstance(error, APIStatusError):
+        return None
+    headers = error.response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        return None
+    return None
+
+
+def backoff_delay(policy: RetryPolicy, retry: int, error: Exception) -> float:
+    """
+    Full-jitter exponential backoff, never shorter than the server's Retry-After.
+    """
+    ceiling = min(policy.max_delay, policy.base_delay * (2 ** retry))
+    delay = random.uniform(0, ceiling)
+    requested = retry_after(error)
+    if requested is not None:
+        delay = max(delay, min(requested, policy.max_delay))
+    return delay
+
+
+async def _hedged(call: Callable[[asyncio.Event], Awaitable[T]], threshold: Optional[float],
+                  on_hedge: Optional[Callable[[], Awaitable[None]]]) -> T:
+    """
+    Runs `call`, and if it has been running for `threshold` seconds after
+    getting started, races it against a duplicate. The loser is cancelled.
+    """
+    started = asyncio.Event()
+    if threshold is None:
+        return await call(started)
+    primary = asyncio.create_task(call(started))
+    tasks = {primary}
+    try:
+        started_waiter = asyncio.create_task(started.wait())
+        await asyncio.wait({primary, started_waiter}, return_when=asyncio.FIRST_COMPLETED)
+        started_waiter.cancel()
+        if not primary.done():
+            done, _ = await asyncio.wait({primary}, timeout=threshold)
+            if not done:
+                if on_hedge:
+                    await on_hedge()
+                tasks.add(asyncio.create_task(call(asyncio.Event())))
+        error = None
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def call_with_retry(call: Callable[[asyncio.Event], Awaitable[T]], policy: RetryPolicy,
+                          latencies: Optional[LatencyTracker] = None,
+                          on_retry: Optional[Callable[[int, float, Exception], Awaitable[None]]] = None,
+                          on_hedge: Optional[Callable[[], Awaitable[None]]] = None) -> T:
+    """
+    Calls `call(started)` until it succeeds or the policy gives up.
+
+    `call` receives an event it sets once the request actually goes out (e.g.
+    after queueing for a scheduler slot), so hedging thresholds exclude queue
+    time. Retryable errors are retried after a backoff; the last error is
+    re-raised once the retries are exhausted.
+    """
+    for retry in range(policy.max_retries + 1):
+        threshold = None
+        if policy.hedge_percentile and latencies is not None and len(latencies) >= policy.hedge_min_samples:
+            threshold = latencies.percentile(policy.hedge_percentile)
+        try:
+            return await _hedged(call, threshold, on_hedge)
+        except RETRYABLE_ERRORS as e:
+            if retry == policy.max_retries:
+                raise
+            delay = backoff_delay(policy, retry, e)
+            if on_retry:
+                await on_retry(retry + 1, delay, e)
+            await asyncio.sleep(delay)
+
+
+# Latencies of non-streaming chat completions across the process
+call_latencies = LatencyTracker()
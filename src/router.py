@@ -0,0 +1,284 @@
+"""Multi-Endpoint LLM Router
+Spreads LLM calls over several OpenAI-compatible endpoints serving the same
+model, e.g. replicas of a self-hosted inference server. Each call goes to the
+available endpoint with the lowest expected cost: its exponentially weighted
+moving average (EWMA) latency scaled by its outstanding requests, or just the
+outstanding requests, divided by the endpoint's weight.
+
+Endpoints are health-checked two ways:
+- passively: connection errors, timeouts, 429s and 5xx responses count as
+  failures, and `failure_threshold` consecutive failures open the endpoint's
+  circuit breaker, ejecting it for `reset_timeout` seconds; afterwards a
+  single probe call decides whether it closes again;
+- actively: a background task lists the models of every endpoint each
+  `health_interval` seconds. Failing endpoints are skipped, and a passing
+  check lets an ejected endpoint be probed early.
+
+Without `LLM_ENDPOINTS`, no router is created and summarizers call `BASE_URL`
+directly.
+
+Key Components:
+- Endpoint: One upstream, its client, latency estimate and circuit breaker.
+- LLMRouter: Endpoint selection, passive and active health checking.
+- NoEndpointAvailable: Raised (and retried) while every endpoint is ejected.
+- parse_endpoints / create_router: Configuration from the environment.
+- llm_router: Shared router of this process, or None.
+"""
+import os
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+from openai import AsyncOpenAI, APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+
+from src.log import logger
+from src.clients import client_registry
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+STRATEGIES = ("ewma", "least_outstanding")
+
+
+class NoEndpointAvailable(APIConnectionError):
+    """
+    Every endpoint is ejected or unhealthy. A connection error, so the call
+    is retried with backoff while breakers reset.
+    """
+
+    def __init__(self):
+        super().__init__(message="No LLM endpoint available",
+                         request=httpx.Request("POST", "http://llm-router/chat/completions"))
+
+
+def is_endpoint_failure(error: BaseException) -> bool:
+    """
+    Whether an error says something about the endpoint's health, as opposed
+    to the request (4xx) or a cancelled hedge.
+    """
+    if isinstance(error, (APIConnectionError, APITimeoutError, RateLimitError, asyncio.TimeoutError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+class Endpoint:
+    """
+    An upstream OpenAI-compatible endpoint.
+
+    Attributes:
+        base_url (str): API base URL, e.g. "http://gpu-1:8000/v1".
+        weight (float): Relative share of traffic; higher takes more calls.
+        ewma_latency (Optional[float]): Smoothed call latency (sec), None until measured.
+        outstanding (int): Calls in flight.
+        state (str): Circuit breaker state: "closed", "open" or "half_open".
+        healthy (bool): Result of the last active health check.
+        failures (int): Consecutive failed calls.
+    """
+
+    def __init__(self, base_url: str, weight: float = 1.0, api_key: Optional[str] = None,
+                 http_client: Optional[httpx.AsyncClient] = None):
+        self.base_url = base_url
+        self.weight = max(weight, 1e-6)
+        self.api_key = api_key
+        self._http_client = http_client
+        self._client: Optional[AsyncOpenAI] = None
+        self.ewma_latency: Optional[float] = None
+        self.outstanding = 0
+        self.state = CLOSED
+        self.healthy = True
+        self.failures = 0
+        self.opened_at = 0.0
+        self.calls = 0
+        self.errors = 0
+        self.ejections = 0
+
+    def client(self) -> AsyncOpenAI:
+        http_client = self._http_client or client_registry.http_client()
+        # Rebuilt when the shared pool was replaced, e.g. for a new event loop
+        if self._client is None or self._client._client is not http_client:
+            self._client = AsyncOpenAI(api_key=self.api_key or os.getenv("OPENAI_API_KEY"),
+                                       base_url=self.base_url, http_client=http_client,
+                                       max_retries=0)
+        return self._client
+
+    def stats(self) -> Dict:
+        return {"base_url": self.base_url, "weight": self.weight, "state": self.state,
+                "healthy": self.healthy, "outstanding": self.outstanding,
+                "ewma_latency (sec)": self.ewma_latency, "calls": self.calls,
+                "errors": self.errors, "ejections": self.ejections}
+
+
+class LLMRouter:
+    """
+    Routes LLM calls over endpoints by load and latency, ejecting failing ones.
+
+    Attributes:
+        endpoints (List[Endpoint]): Upstreams, in configuration order.
+        strategy (str): "ewma" (latency times load) or "least_outstanding".
+        ewma_alpha (float): Weight of the newest latency in the moving average.
+        failure_threshold (int): Consecutive failures that eject an endpoint.
+        reset_timeout (float): Seconds an ejected endpoint waits for a probe call.
+        health_interval (float): Seconds between active health checks; 0 disables them.
+    """
+
+    def __init__(self, endpoints: List[Endpoint], strategy: str = "ewma", ewma_alpha: float = 0.3,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0, health_interval: float = 10.0,
+                 health_timeout: float = 5.0):
+        if not endpoints:
+            raise ValueError("LLMRouter needs at least one endpoint")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown routing strategy {strategy!r}, expected one of {STRATEGIES}")
+        self.endpoints = endpoints
+        self.strategy = strategy
+        self.ewma_alpha = ewma_alpha
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self._health_task: Optional[asyncio.Task] = None
+
+    def _available(self, endpoint: Endpoint, now: float) -> bool:
+        if endpoint.state == OPEN and now - endpoint.opened_at >= self.reset_timeout:
+            endpoint.state = HALF_OPEN
+        if endpoint.state == HALF_OPEN:
+            # A single probe call at a time decides whether the breaker closes
+            return endpoint.outstanding == 0
+        return endpoint.state == CLOSED and endpoint.healthy
+
+    def _cost(self, endpoint: Endpoint) -> float:
+        load = endpoint.outstanding + 1
+        if self.strategy == "ewma":
+            # Unmeasured endpoints look as fast as the fastest one, so they get tried
+            measured = [e.ewma_latency for e in self.endpoints if e.ewma_latency is not None]
+            latency = endpoint.ewma_latency if endpoint.ewma_latency is not None else min(measured, default=1.0)
+            return latency * load / endpoint.weight
+        return load / endpoint.weight
+
+    def select(self) -> Endpoint:
+        """
+        Returns the available endpoint with the lowest cost.
+
+        Raises:
+            NoEndpointAvailable: Every endpoint is ejected or failed its health check.
+        """
+        now = time.monotonic()
+        candidates = [endpoint for endpoint in self.endpoints if self._available(endpoint, now)]
+        if not candidates:
+            raise NoEndpointAvailable()
+        return min(candidates, key=self._cost)
+
+    def record_success(self, endpoint: Endpoint, latency: Optional[float]):
+        if latency is not None:
+            endpoint.ewma_latency = latency if endpoint.ewma_latency is None else (
+                self.ewma_alpha * latency + (1 - self.ewma_alpha) * endpoint.ewma_latency)
+        if endpoint.state != CLOSED:
+            logger.info("LLM endpoint %s recovered", endpoint.base_url)
+        endpoint.state = CLOSED
+        endpoint.failures = 0
+
+    def record_failure(self, endpoint: Endpoint, error: BaseException):
+        endpoint.errors += 1
+        endpoint.failures += 1
+        if endpoint.state == HALF_OPEN or (endpoint.state == CLOSED and endpoint.failures >= self.failure_threshold):
+            endpoint.state = OPEN
+            endpoint.opened_at = time.monotonic()
+            endpoint.ejections += 1
+            logger.warning("Ejecting LLM endpoint %s for %ss after %s failures: %r",
+                           endpoint.base_url, self.reset_timeout, endpoint.failures, error)
+
+    @asynccontextmanager
+    async def route(self, measure_latency: bool = True) -> AsyncIterator[AsyncOpenAI]:
+        """
+        Selects an endpoint and yields its client for one call, recording the
+        outcome. Streamed calls pass `measure_latency=False`, since only the
+        opening of the stream happens inside the block.
+        """
+        endpoint = self.select()
+        endpoint.outstanding += 1
+        endpoint.calls += 1
+        start_time = time.monotonic()
+        try:
+            yield endpoint.client()
+        except BaseException as e:
+            # A cancelled call (e.g. a losing hedge) or a rejected request says nothing about the endpoint
+            if is_endpoint_failure(e):
+                self.record_failure(endpoint, e)
+            raise
+        else:
+            self.record_success(endpoint, time.monotonic() - start_time if measure_latency else None)
+        finally:
+            endpoint.outstanding -= 1
+
+    async def check(self, endpoint: Endpoint) -> bool:
+        """
+        Actively checks an endpoint by listing its models.
+        """
+        try:
+            await asyncio.wait_for(endpoint.client().models.list(), self.health_timeout)
+            healthy = True
+        except Exception as e:
+            healthy = False
+            logger.warning("Health check of LLM endpoint %s failed: %r", endpoint.base_url, e)
+        if healthy and endpoint.state == OPEN:
+            # Let the next call probe it without waiting out the reset timeout
+            endpoint.state = HALF_OPEN
+        endpoint.healthy = healthy
+        return healthy
+
+    async def check_all(self):
+        await asyncio.gather(*[self.check(endpoint) for endpoint in self.endpoints])
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            await self.check_all()
+
+    def start(self):
+        """
+        Starts the active health checks. Called by the FastAPI lifespan.
+        """
+        if self.health_interval > 0 and (self._health_task is None or self._health_task.done()):
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def aclose(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+    def stats(self) -> Dict:
+        return {"strategy": self.strategy, "endpoints": [endpoint.stats() for endpoint in self.endpoints]}
+
+
+def parse_endpoints(spec: str) -> List[Endpoint]:
+    """
+    Parses a comma-separated list of base URLs, each optionally followed by
+    `|weight`, e.g. "http://gpu-1:8000/v1|2,http://gpu-2:8000/v1".
+    """
+    endpoints = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        url, _, weight = item.partition("|")
+        endpoints.append(Endpoint(url.strip(), float(weight) if weight else 1.0))
+    return endpoints
+
+
+def create_router(spec: Optional[str]) -> Optional[LLMRouter]:
+    """
+    Builds the router configured by the environment, or None without endpoints.
+    """
+    endpoints = parse_endpoints(spec or "")
+    if not endpoints:
+        return None
+    return LLMRouter(
+        endpoints,
+        strategy=os.getenv("LLM_ROUTING", "ewma"),
+        failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+        reset_timeout=float(os.getenv("LLM_BREAKER_RESET", "30")),
+        health_interval=float(os.getenv("LLM_HEALTH_INTERVAL", "10")),
+    )
+
+
+llm_router = create_router(os.getenv("LLM_ENDPOINTS"))
@@ -0,0 +1,148 @@
+"""LLM Concurrency Scheduler
+This module implements a process-wide scheduler that gates every LLM call made
+by the summarizer. It caps the number of in-flight calls globally and per task,
+and hands out free slots round-robin across tasks so that one large job cannot
+starve smaller ones queued behind it.
+
+Key Components:
+- LLMScheduler: Fair, two-level (global + per-task) admission control.
+- scheduler: Shared instance used by all `Summarizer` objects in the process.
+"""
+import os
+import time
+import asyncio
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional, Tuple
+
+
+class LLMScheduler:
+    """
+    Fair-queuing admission control for LLM calls.
+
+    Each task owns a FIFO of waiters. Whenever a slot frees up, tasks are
+    visited in round-robin order and the first one below its own limit is
+    granted the slot, so concurrent jobs share the global capacity evenly.
+
+    Attributes:
+        max_concurrency (int): Global cap on in-flight calls across all tasks.
+    """
+
+    def __init__(self, max_concurrency: int = 32):
+        self.max_concurrency = max(1, max_concurrency)
+        self._in_flight = 0
+        self._task_in_flight: Dict[str, int] = defaultdict(int)
+        self._task_limits: Dict[str, int] = {}
+        self._waiters: Dict[str, Deque[Tuple[asyncio.Future, float]]] = {}
+        self._round_robin: Deque[str] = deque()
+        self._granted = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _can_run(self, task_id: str) -> bool:
+        return self._task_in_flight[task_id] < self._task_limits.get(task_id, self.max_concurrency)
+
+    def _grant(self, task_id: str, waiter: asyncio.Future, enqueued_at: float):
+        wait = time.monotonic() - enqueued_at
+        self._in_flight += 1
+        self._task_in_flight[task_id] += 1
+        self._granted += 1
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
+        waiter.set_result(wait)
+
+    def _dispatch(self):
+        """
+        Hands free global slots to waiting tasks in round-robin order.
+        """
+        while self._in_flight < self.max_concurrency and self._round_robin:
+            for _ in range(len(self._round_robin)):
+                task_id = self._round_robin[0]
+                self._round_robin.rotate(-1)
+                queue = self._waiters.get(task_id)
+                if not queue:
+                    self._round_robin.remove(task_id)
+                    self._waiters.pop(task_id, None)
+                    break
+                if self._can_run(task_id):
+                    waiter, enqueued_at = queue.popleft()
+                    if not waiter.done():
+                        self._grant(task_id, waiter, enqueued_at)
+                    break
+            else:
+                # Every waiting task is at its own limit
+                return
+
+    async def acquire(self, task_id: str, limit: Optional[int] = None) -> float:
+        """
+        Waits for a slot for `task_id` and returns the time spent queued (sec).
+
+        Raises:
+            ValueError: `limit` is less than 1, which no call could ever satisfy.
+        """
+        if limit is not None:
+            if limit < 1:
+                raise ValueError(f"Per-task concurrency limit must be at least 1, got {limit}")
+            self._task_limits[task_id] = limit
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        if task_id not in self._waiters:
+            self._waiters[task_id] = deque()
+            self._round_robin.append(task_id)
+        self._waiters[task_id].append((waiter, time.monotonic()))
+        self._dispatch()
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was granted while we were being cancelled
+                self.release(task_id)
+            else:
+                queue = self._waiters.get(task_id)
+                if queue:
+                    self._waiters[task_id] = deque(w for w in queue if w[0] is not waiter)
+                self._dispatch()
+            raise
+
+    def release(self, task_id: str):
+        """
+        Returns a slot held by `task_id` and wakes the next eligible waiter.
+        """
+        self._in_flight = max(0, self._in_flight - 1)
+        self._task_in_flight[task_id] -= 1
+        if self._task_in_flight[task_id] <= 0:
+            del self._task_in_flight[task_id]
+            if task_id not in self._waiters:
+                self._task_limits.pop(task_id, None)
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, task_id: str, limit: Optional[int] = None):
+        """
+        Context manager holding one scheduler slot for the duration of a call.
+        Yields the queue wait in seconds.
+        """
+        wait = await self.acquire(task_id, limit)
+        try:
+            yield wait
+        finally:
+            self.release(task_id)
+
+    def stats(self) -> Dict:
+        """
+        Snapshot of scheduler load: in-flight calls, queue depth and wait times.
+        """
+        queued = {task_id: len(queue) for task_id, queue in self._waiters.items() if queue}
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._in_flight,
+            "queue_depth": sum(queued.values()),
+            "queued_per_task": queued,
+            "in_flight_per_task": dict(self._task_in_flight),
+            "granted": self._granted,
+            "avg_wait_sec": self._total_wait / self._granted if self._granted else 0.0,
+            "max_wait_sec": self._max_wait,
+        }
+
+
+scheduler = LLMScheduler(int(os.getenv("LLM_MAX_CONCURRENCY", "32")))
@@ -0,0 +1,208 @@
+"""Pipeline Statistics
+This module records where the time of a summarization run goes: stage
+timings, per-call latencies and scheduler queue waits, token usage and LLM
+call counts per stage. A run's figures are returned with its result; the
+process-wide aggregate over recent runs is served by `/stats` to tune chunk
+sizes and parallelism from real traffic.
+
+Key Components:
+- RunStats: Collects the figures of one run.
+- PipelineStats: Aggregates finished runs.
+- pipeline_stats: Shared aggregate of this process.
+"""
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Optional, Set
+
+STAGES = ("primary", "secondary", "final")
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "p50": ordered[len(ordered) // 2],
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max": ordered[-1],
+    }
+
+
+class StageStats:
+    """
+    Figures of one pipeline stage within a run.
+
+    Attributes:
+        calls (int): Completed LLM calls.
+        cached (int): Chunks answered from the cache or a previous document tree.
+        retries (int): Retried calls.
+        hedges (int): Duplicate requests sent by hedging.
+        extractive (int): Summaries produced by the local extractive engine.
+        fallbacks (int): Failed LLM calls answered by the extractive engine.
+        models (Set[str]): Models that served the stage's calls.
+        latencies (List[float]): Duration of each call (sec).
+        queue_waits (List[float]): Scheduler wait of each call (sec).
+        prompt_tokens (int): Prompt tokens reported by the LLM.
+        completion_tokens (int): Completion tokens reported by the LLM.
+        started (float): Run-relative time the first call of the stage started.
+        finished (float): Run-relative time the last call of the stage ended.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.cached = 0
+        self.retries = 0
+        self.hedges = 0
+        self.extractive = 0
+        self.fallbacks = 0
+        self.models: Set[str] = set()
+        self.latencies: List[float] = []
+        self.queue_waits: List[float] = []
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "cached": self.cached,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "extractive": self.extractive,
+            "fallbacks": self.fallbacks,
+            "models": sorted(self.models),
+            # Wall-clock window of the stage; stages overlap when reductions are pipelined
+            "window (sec)": [self.started, self.finished] if self.started is not None else None,
+            "latency (sec)": _summary(self.latencies),
+            "queue_wait (sec)": _summary(self.queue_waits),
+            "tokens": {"prompt": self.prompt_tokens, "completion": self.completion_tokens},
+        }
+
+
+class RunStats:
+    """
+    Collects the statistics of one summarization run.
+
+    Attributes:
+        timings (Dict[str, float]): Seconds spent per top-level step.
+        stages (Dict[str, StageStats]): Per-stage call figures.
+        deduplication (Optional[Dict]): Paragraphs kept and removed by the deduplication stage.
+    """
+
+    def __init__(self):
+        self.start_time = time.monotonic()
+        self.timings: Dict[str, float] = {}
+        self.stages: Dict[str, StageStats] = defaultdict(StageStats)
+        self.deduplication: Optional[Dict] = None
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start_time
+
+    def record_call(self, stage: str, started: float, latency: float, queue_wait: float = 0.0, usage=None,
+                    model: Optional[str] = None):
+        """
+        Records an LLM call attempt that started at monotonic time `started`.
+        """
+        stats = self.stages[stage]
+        stats.calls += 1
+        stats.latencies.append(latency)
+        stats.queue_waits.append(queue_wait)
+        if model:
+            stats.models.add(model)
+        offset = started - self.start_time
+        stats.started = offset if stats.started is None else min(stats.started, offset)
+        stats.finished = max(stats.finished or 0.0, offset + latency)
+        if usage is not None:
+            stats.prompt_tokens += getattr(usage, "prompt_tokens", None) or 0
+            stats.completion_tokens += getattr(usage, "completion_tokens", None) or 0
+
+    def record_extractive(self, stage: str, started: float, duration: float):
+        """
+        Records a summary produced locally by the extractive engine.
+        """
+        stats = self.stages[stage]
+        stats.extractive += 1
+        offset = started - self.start_time
+        stats.started = offset if stats.started is None else min(stats.started, offset)
+        stats.finished = max(stats.finished or 0.0, offset + duration)
+
+    def record_fallback(self, stage: str):
+        self.stages[stage].fallbacks += 1
+
+    def record_cached(self, stage: str):
+        self.stages[stage].cached += 1
+
+    def record_retry(self, stage: str):
+        self.stages[stage].retries += 1
+
+    def record_hedge(self, stage: str):
+        self.stages[stage].hedges += 1
+
+    def to_dict(self) -> Dict:
+        stages = {stage: self.stages[stage].to_dict() for stage in STAGES if stage in self.stages}
+        stats = {
+            "timings (sec)": dict(self.timings),
+            "llm_calls": sum(stage["calls"] for stage in stages.values()),
+            "tokens": {
+                "prompt": sum(stage["tokens"]["prompt"] for stage in stages.values()),
+                "completion": sum(stage["tokens"]["completion"] for stage in stages.values()),
+            },
+            "stages": stages,
+        }
+        if self.deduplication is not None:
+            stats["deduplication"] = dict(self.deduplication)
+        return stats
+
+
+class PipelineStats:
+    """
+    Aggregates finished runs: totals, and distributions over the last `window` runs.
+    """
+
+    def __init__(self, window: int = 500):
+        self.runs = 0
+        self.failed = 0
+        self._timings: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+        self._latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window * 10))
+        self._queue_waits: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window * 10))
+        self._calls: Dict[str, Deque[int]] = defaultdict(lambda: deque(maxlen=window))
+        self._totals: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._models: Dict[str, Set[str]] = defaultdict(set)
+
+    def add(self, run: RunStats, failed: bool = False):
+        self.runs += 1
+        if failed:
+            self.failed += 1
+            return
+        for name, seconds in run.timings.items():
+            self._timings[name].append(seconds)
+        for name, stage in run.stages.items():
+            self._latencies[name].extend(stage.latencies)
+            self._queue_waits[name].extend(stage.queue_waits)
+            self._calls[name].append(stage.calls)
+            self._models[name].update(stage.models)
+            for key in ("calls", "cached", "retries", "hedges", "extractive", "fallbacks", "prompt_tokens", "completion_tokens"):
+                self._totals[name][key] += getattr(stage, key)
+
+    def stats(self) -> Dict:
+        return {
+            "runs": self.runs,
+            "failed": self.failed,
+            "timings (sec)": {name: _summary(list(samples)) for name, samples in self._timings.items()},
+            "stages": {
+                name: {
+                    "totals": dict(self._totals[name]),
+                    "models": sorted(self._models[name]),
+                    "calls_per_run": _summary([float(c) for c in self._calls[name]]),
+                    "latency (sec)": _summary(list(self._latencies[name])),
+                    "queue_wait (sec)": _summary(list(self._queue_waits[name])),
+                }
+                for name in STAGES if name in self._totals
+            },
+        }
+
+
+pipeline_stats = PipelineStats()
@@ -0,0 +1,353 @@
+"""Task Manager Backends
+This module defines where task progress lives: the job state, the numbered
+progress events kept for replay, and the pub/sub fan-out to SSE subscribers.
+The in-memory backend keeps everything in the process. The Redis backend keeps
+it in a shared store (anything speaking the Redis protocol), so a job started
+by one worker can be followed and fetched through any other.
+
+Key Components:
+- TaskManagerBackend: Interface used by the Summarizer and the jobs endpoints.
+- TaskManager: In-memory backend.
+- RedisTaskManager: Shared-store backend over a `redis.asyncio` client.
+- create_task_backend: Builds the backend named by `TASK_BACKEND`.
+"""
+import os
+import json
+import asyncio
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from typing import Dict, Optional, Set
+
+from src.log import logger
+from src.events import Event, SubscriberQueue
+from monitoring.otel import sse_subscribers
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # redis is only needed for TASK_BACKEND=redis
+    aioredis = None
+
+
+class TaskManagerBackend(ABC):
+    """
+    Interface of a task progress store.
+
+    Events are numbered per task (`Event.seq`), and subscribers may resume after
+    a given sequence number from the backend's replay buffer.
+    """
+
+    TERMINAL_EVENTS = ("completed", "error")
+
+    @abstractmethod
+    async def create_subscriber(self, task_id: str, last_event_id: Optional[int] = None,
+                                overflow_policy: Optional[str] = None) -> SubscriberQueue:
+        ...
+
+    @abstractmethod
+    async def remove_subscriber(self, task_id: str, queue: asyncio.Queue):
+        ...
+
+    @abstractmethod
+    async def start_run(self, task_id: str):
+        ...
+
+    @abstractmethod
+    async def broadcast_progress(self, task_id: str, event_type: str, data: Dict):
+        ...
+
+    @abstractmethod
+    async def has_subscribers(self, task_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def set_state(self, task_id: str, state: Dict):
+        ...
+
+    @abstractmethod
+    async def get_state(self, task_id: str) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    def cleanup_task(self, task_id: str):
+        ...
+
+
+class TaskManager(TaskManagerBackend):
+    """
+    Manages task lifecycle and progress broadcasting for each summarization job.
+
+    Responsibilities:
+        - Tracks progress for each task.
+        - Manages multiple SSE subscribers per task.
+        - Keeps a ring buffer of recent events so late subscribers can catch up.
+        - Cleans up completed tasks.
+
+    Publishing never waits on subscribers: each one has a bounded buffer, and
+    token events beyond it are coalesced or dropped per `overflow_policy`.
+    """
+
+    def __init__(self, max_buffer: int = int(os.getenv("SSE_BUFFER_SIZE", "1000")),
+                 overflow_policy: str = os.getenv("SSE_OVERFLOW_POLICY", "coalesce"),
+                 replay_size: int = int(os.getenv("SSE_REPLAY_SIZE", "256"))):
+        self.max_buffer = max_buffer
+        self.overflow_policy = overflow_policy
+        self.replay_size = replay_size
+        self.tasks = defaultdict(lambda: {
+            'primary_progress': 0,
+            'secondary_progress': 0,
+            'primary_chunks': [],
+            'secondary_chunks': [],
+            'subscribers': set(),
+            'history': deque(maxlen=self.replay_size),
+            'seq': 0,
+            'finished': False,
+            'state': None
+        })
+
+    async def create_subscriber(self, task_id: str, last_event_id: Optional[int] = None,
+                                overflow_policy: Optional[str] = None) -> SubscriberQueue:
+        """
+        Registers a new subscriber to a task's progress stream. Buffered events
+        after `last_event_id` (all of them if None) are replayed first.
+        """
+        queue = SubscriberQueue(self.max_buffer, overflow_policy or self.overflow_policy)
+        task = self.tasks[task_id]
+        for event in task['history']:
+            if last_event_id is None or event.seq > last_event_id:
+                queue.offer(event)
+        if task['finished']:
+            queue.stale_through = task['seq']
+        task['subscribers'].add(queue)
+        sse_subscribers.add(1)
+        return queue
+
+    async def remove_subscriber(self, task_id: str, queue: asyncio.Queue):
+        """
+        Unsubscribes a listener from a task's progress events.
+        """
+        if task_id in self.tasks and queue in self.tasks[task_id]['subscribers']:
+            self.tasks[task_id]['subscribers'].discard(queue)
+            sse_subscribers.add(-1)
+
+    async def start_run(self, task_id: str):
+        """
+        Marks the start of a run on the task. If an earlier run with the same
+        ID has finished, its events leave the replay buffer and the queues of
+        subscribers that only received them as replay, so they are not taken
+        for the new run's. Sequence numbers keep counting up.
+        """
+        task = self.tasks.get(task_id)
+        if task is not None and task['finished']:
+            task['history'].clear()
+            task['finished'] = False
+            for queue in task['subscribers']:
+                queue.discard_stale()
+
+    def publish(self, task_id: str, event_type: str, data: Dict) -> Event:
+        """
+        Records an event in the task's replay buffer and offers it to every
+        subscriber without blocking.
+        """
+        task = self.tasks[task_id]
+        task['seq'] += 1
+        event = Event({'type': event_type, **data}, seq=task['seq'])
+        task['history'].append(event)
+        task['finished'] = event_type in self.TERMINAL_EVENTS
+        for queue in task['subscribers']:
+            queue.offer(event)
+        return event
+
+    async def broadcast_progress(self, task_id: str, event_type: str, data: Dict):
+        """
+        Broadcasts progress updates to all subscribers of a task.
+        """
+        self.publish(task_id, event_type, data)
+
+    async def has_subscribers(self, task_id: str) -> bool:
+        return task_id in self.tasks and bool(self.tasks[task_id]['subscribers'])
+
+    async def set_state(self, task_id: str, state: Dict):
+        """
+        Stores the task's job state.
+        """
+        self.tasks[task_id]['state'] = state
+
+    async def get_state(self, task_id: str) -> Optional[Dict]:
+        """
+        Returns the task's job state, or None for unknown tasks.
+        """
+        if task_id not in self.tasks:
+            return None
+        return self.tasks[task_id]['state']
+
+    def cleanup_task(self, task_id: str):
+        """
+        Deletes the task's metadata and removes all subscribers.
+        """
+        if task_id in self.tasks:
+            sse_subscribers.add(-len(self.tasks[task_id]['subscribers']))
+            del self.tasks[task_id]
+
+
+class RedisTaskManager(TaskManagerBackend):
+    """
+    Task progress kept in a Redis-protocol store, shared by all workers.
+
+    Per task, `{prefix}:{task_id}:seq` numbers the events, `:events` holds the
+    last `replay_size` of them, `:state` the job state and `:channel` carries
+    live events. Keys expire `ttl` seconds after the last write.
+
+    Attributes:
+        redis: `redis.asyncio` client (or a compatible stand-in).
+        prefix (str): Key prefix.
+        replay_size (int): Events kept per task for late subscribers.
+        ttl (int): Expiry of a task's keys (sec).
+    """
+
+    def __init__(self, redis, prefix: str = "summarizer", max_buffer: int = 1000,
+                 overflow_policy: str = "coalesce", replay_size: int = 256, ttl: int = 3600):
+        self.redis = redis
+        self.prefix = prefix
+        self.max_buffer = max_buffer
+        self.overflow_policy = overflow_policy
+        self.replay_size = replay_size
+        self.ttl = ttl
+        # Publishing a task's events is serialized so they reach the channel in seq order
+        self._publish_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._readers: Dict[int, tuple] = {}
+        self._queues: Dict[str, Set[SubscriberQueue]] = defaultdict(set)
+        self._pending = set()
+
+    def _key(self, task_id: str, name: str) -> str:
+        return f"{self.prefix}:{task_id}:{name}"
+
+    @staticmethod
+    def _decode(payload) -> Event:
+        message = json.loads(payload)
+        return Event(message["event"], seq=message["seq"])
+
+    async def create_subscriber(self, task_id: str, last_event_id: Optional[int] = None,
+                                overflow_policy: Optional[str] = None) -> SubscriberQueue:
+        """
+        Subscribes to the task's channel, then replays stored events after
+        `last_event_id`. Live events already covered by the replay are skipped.
+        """
+        queue = SubscriberQueue(self.max_buffer, overflow_policy or self.overflow_policy)
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(self._key(task_id, "channel"))
+        delivered = last_event_id or 0
+        event = None
+        for payload in await self.redis.lrange(self._key(task_id, "events"), 0, -1):
+            event = self._decode(payload)
+            if event.seq > delivered:
+                queue.offer(event)
+                delivered = event.seq
+        if event is not None and event["type"] in self.TERMINAL_EVENTS:
+            queue.stale_through = event.seq
+        reader = asyncio.create_task(self._read(pubsub, queue, delivered))
+        self._readers[id(queue)] = (pubsub, reader, task_id)
+        self._queues[task_id].add(queue)
+        sse_subscribers.add(1)
+        return queue
+
+    async def _read(self, pubsub, queue: SubscriberQueue, delivered: int):
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                event = self._decode(message["data"])
+                if event.seq > delivered:
+                    queue.offer(event)
+                    delivered = event.seq
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Task event subscription failed: %s", e)
+
+    async def remove_subscriber(self, task_id: str, queue: asyncio.Queue):
+        """
+        Stops delivering events to the queue and closes its subscription.
+        """
+        pubsub, reader, _ = self._readers.pop(id(queue), (None, None, None))
+        if reader is None:
+            return
+        self._queues[task_id].discard(queue)
+        if not self._queues[task_id]:
+            del self._queues[task_id]
+        sse_subscribers.add(-1)
+        reader.cancel()
+        try:
+            await reader
+        except asyncio.CancelledError:
+            pass
+        await pubsub.unsubscribe()
+        await pubsub.aclose()
+
+    async def start_run(self, task_id: str):
+        """
+        Drops the replay list of a finished earlier run with the same ID, and
+        its events replayed to this worker's subscribers. Sequence numbers
+        keep counting up.
+        """
+        events = self._key(task_id, "events")
+        last = await self.redis.lindex(events, -1)
+        if last is not None and self._decode(last)["type"] in self.TERMINAL_EVENTS:
+            await self.redis.delete(events)
+            for queue in self._queues.get(task_id, ()):
+                queue.discard_stale()
+
+    async def broadcast_progress(self, task_id: str, event_type: str, data: Dict):
+        """
+        Numbers the event, appends it to the replay list and publishes it.
+        """
+        async with self._publish_locks[task_id]:
+            seq = await self.redis.incr(self._key(task_id, "seq"))
+            payload = json.dumps({"seq": seq, "event": {"type": event_type, **data}})
+            events = self._key(task_id, "events")
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.rpush(events, payload)
+                pipe.ltrim(events, -self.replay_size, -1)
+                pipe.expire(events, self.ttl)
+                pipe.expire(self._key(task_id, "seq"), self.ttl)
+                pipe.publish(self._key(task_id, "channel"), payload)
+                await pipe.execute()
+
+    async def has_subscribers(self, task_id: str) -> bool:
+        channels = await self.redis.pubsub_numsub(self._key(task_id, "channel"))
+        return any(count for _, count in channels)
+
+    async def set_state(self, task_id: str, state: Dict):
+        await self.redis.set(self._key(task_id, "state"), json.dumps(state), ex=self.ttl)
+
+    async def get_state(self, task_id: str) -> Optional[Dict]:
+        state = await self.redis.get(self._key(task_id, "state"))
+        return json.loads(state) if state is not None else None
+
+    def cleanup_task(self, task_id: str):
+        """
+        Schedules deletion of the task's keys.
+        """
+        self._publish_locks.pop(task_id, None)
+        keys = [self._key(task_id, name) for name in ("seq", "events", "state")]
+        task = asyncio.get_running_loop().create_task(self.redis.delete(*keys))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+
+def create_task_backend(backend: str = "memory", url: Optional[str] = None) -> TaskManagerBackend:
+    """
+    Builds the task backend for the given name: "memory" or "redis".
+    """
+    if backend == "redis":
+        if aioredis is None:
+            raise RuntimeError("TASK_BACKEND=redis requires the 'redis' package")
+        return RedisTaskManager(
+            aioredis.from_url(url or "redis://localhost:6379/0"),
+            prefix=os.getenv("REDIS_KEY_PREFIX", "summarizer"),
+            replay_size=int(os.getenv("SSE_REPLAY_SIZE", "256")),
+            ttl=int(os.getenv("JOB_TTL", "3600")),
+        )
+    return TaskManager()
+
+
+task_backend = create_task_backend(os.getenv("TASK_BACKEND", "memory"), os.getenv("REDIS_URL"))
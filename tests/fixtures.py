@@ -1,8 +1,12 @@
 import pytest
 import os
+import asyncio
+from types import SimpleNamespace
 from fastapi.testclient import TestClient
 from src.executor import Summarizer, TaskManager,SummaryConfig
 from src.endpoints import app
+from src.scheduler import LLMScheduler
+from src.cache import MemoryCache
 
 @pytest.fixture
 def summarizer():
@@ -27,6 +31,46 @@ def task_manager():
     task_manager = TaskManager()
     return task_manager
 
+class FakeCompletions:
+    """Offline stand-in for `client.chat.completions` returning short canned summaries"""
+
+    def __init__(self, reply: str = "Summary of the given content.", delay=0.0):
+        self.reply = reply
+        self.delay = delay  # seconds, or a callable taking the request kwargs
+        self.calls = []
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        await asyncio.sleep(self.delay(kwargs) if callable(self.delay) else self.delay)
+        if kwargs.get('stream'):
+            return self._stream((kwargs.get('stream_options') or {}).get('include_usage', False))
+        message = SimpleNamespace(content=self.reply)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    async def _stream(self, include_usage: bool = False):
+        words = self.reply.split(' ')
+        for word in words:
+            delta = SimpleNamespace(content=word + ' ')
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+        if include_usage:
+            yield SimpleNamespace(choices=[], usage=SimpleNamespace(prompt_tokens=10, completion_tokens=len(words)))
+
+
+@pytest.fixture
+def fake_llm():
+    return FakeCompletions()
+
+@pytest.fixture
+def offline_summarizer(fake_llm):
+    summarizer = Summarizer("test-key", SummaryConfig(model="test-model"), cache=MemoryCache(),
+                            task_manager=TaskManager())
+    summarizer.client = SimpleNamespace(chat=SimpleNamespace(completions=fake_llm))
+    return summarizer
+
+@pytest.fixture
+def llm_scheduler():
+    return LLMScheduler(max_concurrency=4)
+
 
 @pytest.fixture
 def paragraphs():
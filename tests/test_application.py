@@ -1,12 +1,17 @@
 import pytest
 import asyncio
 import json
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from src.endpoints import app
+from src.clients import ClientRegistry, client_registry
+from src.executor import Summarizer
 from tests.fixtures import (summarizer,client,
                             task_id,
                             system_prompt,primary_prompt,secondary_reduction_prompt,final_reduction_prompt,
                             paragraphs,
                             secondary_summaries,
-                            task_manager)
+                            task_manager, offline_summarizer, fake_llm)
 
 
 class TestApplication:
@@ -57,4 +62,51 @@ class TestApplication:
         assert response.status_code == 200
         assert 'summary' in json_response.keys()
         assert 'time_taken (sec)' in json_response.keys()
-        assert isinstance(json_response['summary'], str)
\ No newline at end of file
+        assert isinstance(json_response['summary'], str)
+
+    def test_lifespan_shares_connection_pool(self):
+        with TestClient(app) as lifespan_client:
+            pool = client_registry.http_client()
+            assert Summarizer("test-key").client._client is pool
+            assert lifespan_client.get('/summarizer/v1/stats').status_code == 200
+        assert pool.is_closed
+
+    def test_new_event_loop_closes_previous_pool(self):
+        registry = ClientRegistry()
+
+        async def get_pool():
+            pool = registry.http_client()
+            await asyncio.sleep(0)
+            return pool
+
+        previous = asyncio.run(get_pool())
+        current = asyncio.run(get_pool())
+        assert current is not previous
+        assert previous.is_closed and not current.is_closed
+        asyncio.run(registry.aclose())
+
+    def test_static_api_skips_streaming(self, client, paragraphs, offline_summarizer, fake_llm):
+        with patch('src.executor.build_summarizer', return_value=offline_summarizer):
+            response = client.post(url='/summarizer/v1/summarize',
+                                   content=json.dumps({'paragraphs': paragraphs, 'stream': False}))
+        json_response = response.json()
+
+        assert response.status_code == 200
+        assert json_response['summary'] == 'Summary of the given content.'
+        assert {'chunking', 'map_reduce', 'final', 'total'} <= set(json_response['timings'])
+        assert json_response['stats']['llm_calls'] == len(fake_llm.calls)
+        assert not any(call['stream'] for call in fake_llm.calls)
+        assert not offline_summarizer.task_manager.tasks
+
+    @pytest.mark.asyncio
+    async def test_final_summary_streams_to_subscribers(self, offline_summarizer, task_id, paragraphs,
+                                                        system_prompt, primary_prompt,
+                                                        secondary_reduction_prompt, final_reduction_prompt):
+        prompts = (system_prompt, primary_prompt, secondary_reduction_prompt, final_reduction_prompt)
+        queue = await offline_summarizer.task_manager.create_subscriber(task_id)
+        result = await offline_summarizer.summarize(task_id, paragraphs, *prompts)
+        events = [queue.get_nowait()['type'] for _ in range(queue.qsize())]
+
+        assert result.streamed
+        assert result.summary.strip() == 'Summary of the given content.'
+        assert 'final_summary' in events
@@ -0,0 +1,60 @@
+import json
+import pytest
+from unittest.mock import patch
+from src.batch import BatchJob, main
+from tests.fixtures import client, offline_summarizer, fake_llm, paragraphs
+
+
+class TestBatchJob:
+
+    @pytest.fixture
+    def batch_files(self, tmp_path, paragraphs):
+        input_path = tmp_path / 'input.jsonl'
+        records = [{'paragraphs': paragraphs[:2]}, {'paragraphs': paragraphs[2:]}, {'paragraphs': 'not a list'}]
+        input_path.write_text('\n'.join(json.dumps(record) for record in records) + '\n')
+        return str(input_path), str(tmp_path / 'output.jsonl')
+
+    def read_output(self, output_path):
+        with open(output_path) as f:
+            return [json.loads(line) for line in f]
+
+    @pytest.mark.asyncio
+    async def test_results_written_per_record(self, batch_files, offline_summarizer):
+        input_path, output_path = batch_files
+        job = BatchJob(input_path, output_path, max_concurrent_documents=2)
+        with patch('src.batch.build_summarizer', return_value=offline_summarizer):
+            await job.run()
+        results = {result['index']: result for result in self.read_output(output_path)}
+        assert results[0]['status'] == results[1]['status'] == 'completed'
+        assert results[0]['summary'].strip() == 'Summary of the given content.'
+        assert results[2]['status'] == 'failed'
+        assert job.progress()['records'] == {'completed': 2, 'failed': 1}
+
+    @pytest.mark.asyncio
+    async def test_resume_skips_completed_records(self, batch_files, offline_summarizer, fake_llm):
+        input_path, output_path = batch_files
+        with open(output_path, 'w') as f:
+            f.write(json.dumps({'index': 0, 'status': 'completed', 'summary': 'done before'}) + '\n')
+            f.write('{"index": 1, "status": "compl')  # torn write from a crash
+        job = BatchJob(input_path, output_path)
+        with patch('src.batch.build_summarizer', return_value=offline_summarizer):
+            await job.run()
+        statuses = [(result['index'], result['status']) for result in self.read_output(output_path)[1:]]
+        assert (0, 'completed') not in statuses
+        assert (1, 'completed') in statuses
+        assert job.progress()['records']['skipped'] == 1
+
+    def test_cli(self, batch_files, offline_summarizer):
+        input_path, output_path = batch_files
+        with patch('src.batch.build_summarizer', return_value=offline_summarizer):
+            assert main([input_path, output_path, '--concurrency', '1']) == 1  # record 2 is invalid
+        assert len(self.read_output(output_path)) == 3
+
+    def test_api_paths_stay_in_batch_folder(self, client, tmp_path, batch_files):
+        with patch('src.batch.BATCH_DIR', str(tmp_path)):
+            for body in ({'input_path': '/etc/passwd'},
+                         {'input_path': '../input.jsonl'},
+                         {'input_path': 'input.jsonl', 'output_path': '/tmp/output.jsonl'},
+                         {'input_path': 'input.jsonl', 'output_path': 'nested/../../output.jsonl'}):
+                assert client.post(url='/summarizer/v1/batches', json=body).status_code == 400
+            assert client.post(url='/summarizer/v1/batches', json={'input_path': 'missing.jsonl'}).status_code == 404
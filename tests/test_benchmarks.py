@@ -0,0 +1,69 @@
+import random
+import httpx
+import pytest
+from unittest.mock import patch
+from openai import AsyncOpenAI
+from src.endpoints import app
+from src.executor import Summarizer, SummaryConfig, TaskManager
+from src.cache import NullCache
+from benchmarks.mock_llm import MockConfig, LatencyDistribution, create_app
+from benchmarks.run import make_document, percentiles, summarize_once
+from tests.fixtures import paragraphs
+
+
+def mock_summarizer(config: MockConfig) -> Summarizer:
+    summarizer = Summarizer("mock-key", SummaryConfig(model="mock-model", max_retries=0),
+                            cache=NullCache(), task_manager=TaskManager())
+    transport = httpx.ASGITransport(app=create_app(config))
+    summarizer.client = AsyncOpenAI(api_key="mock-key", base_url="http://mock/v1", max_retries=0,
+                                    http_client=httpx.AsyncClient(transport=transport))
+    return summarizer
+
+
+class TestBenchmarks:
+
+    def test_latency_distributions(self):
+        rng = random.Random(0)
+        assert LatencyDistribution("fixed:0.5").sample(rng) == 0.5
+        assert 0.1 <= LatencyDistribution("uniform:0.1:0.2").sample(rng) <= 0.2
+        with pytest.raises(ValueError):
+            LatencyDistribution("pareto:1")
+
+    def test_percentiles_and_documents(self):
+        stats = percentiles([float(i) for i in range(1, 101)])
+        assert (stats['p50'], stats['p95'], stats['p99']) == (51.0, 96.0, 100.0)
+        assert percentiles([]) is None
+        assert make_document(3, 2) == make_document(3, 2) != make_document(4, 2)
+
+    @pytest.mark.asyncio
+    async def test_mock_injects_rate_limits(self):
+        transport = httpx.ASGITransport(app=create_app(MockConfig(rate_limit_rate=1.0, retry_after=2.0)))
+        async with httpx.AsyncClient(transport=transport, base_url="http://mock") as client:
+            response = await client.post("/v1/chat/completions", json={"model": "m", "messages": []})
+            stats = (await client.get("/mock/stats")).json()
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "2.0"
+        assert stats["rate_limited"] == 1
+
+    @pytest.mark.asyncio
+    async def test_mock_streams_usage_when_asked(self):
+        summarizer = mock_summarizer(MockConfig(latency="fixed:0", token_rate=0, reply_tokens=5))
+        stream = await summarizer.client.chat.completions.create(
+            model="mock-model", messages=[{"role": "user", "content": "hello " * 20}], stream=True,
+            stream_options={"include_usage": True})
+        chunks = [chunk async for chunk in stream]
+        assert chunks[-1].choices == []
+        assert chunks[-1].usage.completion_tokens == 5 and chunks[-1].usage.prompt_tokens > 0
+        assert all(chunk.usage is None for chunk in chunks[:-1])
+
+    @pytest.mark.asyncio
+    async def test_summarize_against_mock(self, paragraphs):
+        summarizer = mock_summarizer(MockConfig(latency="fixed:0", token_rate=0, reply_tokens=12))
+        with patch('src.executor.build_summarizer', return_value=summarizer):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://app") as client:
+                result = await summarize_once(client, "/summarizer/v1/summarize",
+                                              {"paragraphs": paragraphs, "stream": True})
+        assert result["ok"]
+        assert result["ttft"] is not None and result["ttft"] <= result["latency"]
+
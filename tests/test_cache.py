@@ -0,0 +1,56 @@
+import pytest
+import asyncio
+from src.cache import MemoryCache, ResponseCache, SQLiteCache, make_key
+from tests.fixtures import offline_summarizer, fake_llm, system_prompt, primary_prompt
+
+
+class TestResponseCache:
+
+    def test_incomplete_backend_fails_on_creation(self):
+        class ReadOnly(ResponseCache):
+            async def _get(self, key):
+                return None
+
+        with pytest.raises(TypeError):
+            ReadOnly()
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        cache = MemoryCache(max_entries=2)
+        await cache.set('a', '1')
+        await cache.set('b', '2')
+        await cache.get('a')
+        await cache.set('c', '3')
+        assert await cache.get('b') is None
+        assert await cache.get('a') == '1'
+        assert cache.stats()['entries'] == 2
+
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self):
+        cache = MemoryCache(ttl=0.05)
+        await cache.set('a', '1')
+        assert await cache.get('a') == '1'
+        await asyncio.sleep(0.06)
+        assert await cache.get('a') is None
+
+    @pytest.mark.asyncio
+    async def test_sqlite_survives_restart(self, tmp_path):
+        path = str(tmp_path / 'cache.sqlite3')
+        await SQLiteCache(path).set('a', '1')
+        cache = MemoryCache(backing=SQLiteCache(path))
+        assert await cache.get('a') == '1'
+        assert cache.stats()['backing']['hits'] == 1
+
+    def test_key_depends_on_every_input(self):
+        base = make_key('model', 0.3, 700, 'system', 'user')
+        assert base == make_key('model', 0.3, 700, 'system', 'user')
+        assert base != make_key('model', 0.4, 700, 'system', 'user')
+        assert base != make_key('other', 0.3, 700, 'system', 'user')
+
+    @pytest.mark.asyncio
+    async def test_process_chunk_hits_cache(self, offline_summarizer, fake_llm, system_prompt, primary_prompt):
+        first = await offline_summarizer.process_chunk(system_prompt, primary_prompt)
+        second = await offline_summarizer.process_chunk(system_prompt, primary_prompt)
+        assert first == second
+        assert len(fake_llm.calls) == 1
+        assert offline_summarizer.cache.stats()['hits'] == 1
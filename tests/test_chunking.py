@@ -0,0 +1,37 @@
+from src.chunking import estimate_tokens, split_paragraph, pack_paragraphs
+from src.executor import Summarizer, SummaryConfig
+from tests.fixtures import paragraphs
+
+
+class TestChunking:
+
+    def test_pack_respects_budget(self, paragraphs):
+        budget = 400
+        chunks = pack_paragraphs(paragraphs * 10, budget)
+        for chunk in chunks:
+            assert sum(estimate_tokens(p) for p in chunk) <= budget
+        # Packing never drops or reorders text
+        packed = " ".join(p for chunk in chunks for p in chunk)
+        assert packed.split() == " ".join(paragraphs * 10).split()
+
+    def test_short_paragraphs_are_packed_together(self):
+        bullets = [f"Item {i} done." for i in range(50)]
+        chunks = pack_paragraphs(bullets, 100)
+        assert len(chunks) < 10
+        assert [p for chunk in chunks for p in chunk] == bullets
+
+    def test_oversized_paragraph_split_at_sentences(self):
+        paragraph = " ".join(f"Sentence number {i} is here." for i in range(100))
+        pieces = split_paragraph(paragraph, 50)
+        assert len(pieces) > 1
+        assert all(piece.endswith(".") for piece in pieces)
+        assert all(estimate_tokens(piece) <= 50 for piece in pieces)
+        assert " ".join(pieces) == paragraph
+
+    def test_create_chunks_token_mode(self, paragraphs):
+        summarizer = Summarizer("test-key", SummaryConfig(model="test-model",
+                                                         chunking_mode="tokens",
+                                                         primary_chunk_tokens=100000))
+        primary_chunks, primary_count, _ = summarizer.create_chunks(paragraphs * 20)
+        assert primary_count == 1
+        assert primary_chunks[0] == paragraphs * 20
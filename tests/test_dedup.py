@@ -0,0 +1,68 @@
+import re
+import random
+import pytest
+import numpy as np
+from unittest.mock import patch
+from src.dedup import deduplicate, minhash_signatures
+from tests.fixtures import (offline_summarizer, fake_llm, task_id, paragraphs,
+                            system_prompt, primary_prompt, secondary_reduction_prompt, final_reduction_prompt)
+
+
+def templated_records(paragraphs, count, seed=0):
+    """
+    Copies of the fixture records that differ only in their event ID.
+    """
+    rng = random.Random(seed)
+    return [re.sub(r"Event ID \d+", f"Event ID {rng.randint(1000, 9999)}", paragraphs[i % len(paragraphs)])
+            for i in range(count)]
+
+
+class TestDedup:
+
+    def test_signatures_estimate_similarity(self, paragraphs):
+        edited = paragraphs[0].replace("Talkatora Indoor Stadium", "Indoor Stadium")
+        signatures = minhash_signatures([paragraphs[0], edited, paragraphs[1]])
+
+        assert (signatures[0] == signatures[1]).mean() > 0.85
+        assert (signatures[0] == signatures[2]).mean() < 0.5
+
+    def test_collapses_exact_and_near_duplicates(self, paragraphs):
+        records = templated_records(paragraphs, 400) + [paragraphs[0].upper()]
+        result = deduplicate(records)
+
+        assert result.paragraphs[0].startswith(records[0])
+        assert result.removed == len(records) - len(paragraphs)
+        assert result.exact >= 1
+        assert sum(len(members) for members in result.groups.values()) == len(records)
+        assert "stands for 101 identical or near-identical records" in result.paragraphs[0]
+
+    def test_distinct_paragraphs_are_kept(self, paragraphs):
+        result = deduplicate(paragraphs)
+        assert result.paragraphs == paragraphs
+        assert result.to_dict() == {'kept': len(paragraphs), 'removed': 0, 'exact': 0, 'near': 0}
+        assert deduplicate(templated_records(paragraphs, 8), threshold=1.0).removed == 0
+
+    def test_pairs_beyond_first_bucket_member(self):
+        # Two bands of four rows: all three share the first band, only the last two are alike overall
+        signatures = np.array([[1, 2, 3, 4, 10, 11, 12, 13],
+                               [1, 2, 3, 4, 20, 21, 22, 23],
+                               [1, 2, 3, 4, 20, 21, 22, 99]], dtype=np.uint64)
+        with patch('src.dedup.minhash_signatures', return_value=signatures):
+            result = deduplicate(["first", "second", "third"], num_perm=8, bands=2)
+
+        assert result.groups == {1: [1, 2]}
+        assert result.paragraphs[0] == "first"
+
+    @pytest.mark.asyncio
+    async def test_fewer_primary_calls(self, offline_summarizer, fake_llm, task_id, paragraphs,
+                                       system_prompt, primary_prompt,
+                                       secondary_reduction_prompt, final_reduction_prompt):
+        records = templated_records(paragraphs, 40)
+        offline_summarizer.config.primary_chunk_size = 2
+        offline_summarizer.config.deduplicate = True
+        result = await offline_summarizer.summarize(task_id, records, system_prompt, primary_prompt,
+                                                    secondary_reduction_prompt, final_reduction_prompt)
+
+        assert result.stats['deduplication']['removed'] == 40 - len(paragraphs)
+        assert result.stats['stages']['primary']['calls'] == -(-len(paragraphs) // 2)
+        assert 'deduplication' in result.timings
@@ -0,0 +1,41 @@
+import pytest
+from unittest.mock import patch
+from src.documents import DocumentStore
+from tests.fixtures import (offline_summarizer, fake_llm, task_id, paragraphs,
+                            system_prompt, primary_prompt, secondary_reduction_prompt, final_reduction_prompt)
+
+
+class TestIncrementalSummary:
+
+    @pytest.mark.asyncio
+    async def test_store_persists_to_directory(self, tmp_path):
+        await DocumentStore(directory=str(tmp_path)).save('doc/1', {'k': {'level': 0, 'chunk': 1, 'summary': 's'}})
+        document = await DocumentStore(directory=str(tmp_path)).load('doc/1')
+        assert document['nodes']['k']['summary'] == 's'
+        assert await DocumentStore(directory=str(tmp_path)).delete('doc/1')
+
+    @pytest.mark.asyncio
+    async def test_appended_paragraphs_only_rerun_changed_chunks(self, offline_summarizer, fake_llm, task_id,
+                                                                 paragraphs, system_prompt, primary_prompt,
+                                                                 secondary_reduction_prompt, final_reduction_prompt):
+        offline_summarizer.config.use_cache = False
+        offline_summarizer.config.primary_chunk_size = 2
+        offline_summarizer.config.secondary_chunk_size = 2
+        offline_summarizer.config.final_input_tokens = 20
+        offline_summarizer.config.max_tokens_per_request = 10
+        prompts = (system_prompt, primary_prompt, secondary_reduction_prompt, final_reduction_prompt)
+        document = [f"{p} (day {i})" for i, p in enumerate(paragraphs * 2)]
+
+        with patch('src.executor.document_store', DocumentStore()):
+            await offline_summarizer.process_text(task_id, document, *prompts, document_id='events')
+            first_run_calls = len(fake_llm.calls)
+            fake_llm.calls.clear()
+
+            queue = await offline_summarizer.task_manager.create_subscriber(task_id)
+            await offline_summarizer.process_text(task_id, document + ["Event ID 9999 was added today."],
+                                                  *prompts, document_id='events')
+
+        completed = [e for e in [queue.get_nowait() for _ in range(queue.qsize())] if e['type'] == 'completed'][0]
+        # 4 unchanged primary chunks and the first reduction branch are reused
+        assert completed['reused_chunks'] >= 5
+        assert len(fake_llm.calls) < first_run_calls
@@ -0,0 +1,78 @@
+import time
+import pytest
+from openai import OpenAIError
+from src.chunking import estimate_tokens
+from src.extractive import extract_summary, split_sentences, tfidf_matrix, textrank
+from benchmarks.run import make_document
+from tests.fixtures import (offline_summarizer, fake_llm, task_id, paragraphs,
+                            system_prompt, primary_prompt, secondary_reduction_prompt, final_reduction_prompt)
+
+
+class TestExtractive:
+
+    def test_central_sentences_within_budget(self, paragraphs):
+        text = "\n\n".join(paragraphs)
+        sentences = split_sentences(text)
+        summary = extract_summary(text, max_tokens=80)
+        chosen = split_sentences(summary)
+
+        assert 1 < len(chosen) < len(sentences)
+        assert estimate_tokens(summary) <= 80 + len(chosen)
+        positions = [sentences.index(sentence) for sentence in chosen]
+        assert positions == sorted(positions)
+        assert len(set(chosen)) == len(chosen)
+
+    def test_textrank_prefers_shared_content(self):
+        sentences = ["Rahul Gandhi attended the rally in Delhi.",
+                     "The rally in Delhi was attended by thousands.",
+                     "Gandhi spoke at the Delhi rally.",
+                     "Bananas are yellow."]
+        scores = textrank(tfidf_matrix(sentences))
+        assert scores.argmin() == 3
+        assert scores.sum() == pytest.approx(1.0)
+
+    def test_400_paragraphs_in_milliseconds(self):
+        document = make_document(0, 400)
+        start = time.perf_counter()
+        for i in range(0, len(document), 15):
+            extract_summary("\n\n".join(document[i:i + 15]), 700)
+        assert time.perf_counter() - start < 0.5
+
+    @pytest.mark.asyncio
+    async def test_extractive_engine_makes_no_llm_calls(self, offline_summarizer, fake_llm, task_id, paragraphs,
+                                                        system_prompt, primary_prompt,
+                                                        secondary_reduction_prompt, final_reduction_prompt):
+        offline_summarizer.config.engine = "extractive"
+        offline_summarizer.config.primary_chunk_size = 2
+        queue = await offline_summarizer.task_manager.create_subscriber(task_id)
+        result = await offline_summarizer.summarize(task_id, paragraphs, system_prompt, primary_prompt,
+                                                    secondary_reduction_prompt, final_reduction_prompt)
+        events = [queue.get_nowait() for _ in range(queue.qsize())]
+
+        assert not fake_llm.calls
+        assert result.summary and result.stats['llm_calls'] == 0
+        assert result.stats['stages']['primary']['extractive'] == 2
+        assert [event['token'] for event in events if event['type'] == 'final_summary'] == [result.summary]
+
+    @pytest.mark.asyncio
+    async def test_hybrid_and_fallback(self, offline_summarizer, fake_llm, task_id, paragraphs,
+                                       system_prompt, primary_prompt,
+                                       secondary_reduction_prompt, final_reduction_prompt):
+        async def broken_create(**kwargs):
+            fake_llm.calls.append(kwargs)
+            raise OpenAIError('model unavailable')
+        fake_llm.create = broken_create
+        offline_summarizer.config.engine = "hybrid"
+        offline_summarizer.config.extractive_fallback = True
+        offline_summarizer.config.primary_chunk_size = 2
+        queue = await offline_summarizer.task_manager.create_subscriber(task_id)
+        result = await offline_summarizer.summarize(task_id, paragraphs, system_prompt, primary_prompt,
+                                                    secondary_reduction_prompt, final_reduction_prompt)
+        events = [queue.get_nowait() for _ in range(queue.qsize())]
+        stages = result.stats['stages']
+
+        assert result.summary
+        assert stages['primary']['extractive'] == 2 and stages['primary']['calls'] == 0
+        assert stages['final']['fallbacks'] == 1
+        assert {event['stage'] for event in events if event['type'] == 'fallback'} == {'final'}
+        assert all(call['stream'] for call in fake_llm.calls)
@@ -0,0 +1,84 @@
+import json
+import time
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from src.endpoints import app
+from src.jobs import Job, JobRegistry
+from tests.fixtures import offline_summarizer, fake_llm, paragraphs
+
+
+class TestJobs:
+
+    @pytest.fixture
+    def job_client(self, offline_summarizer):
+        with patch('src.jobs.build_summarizer', return_value=offline_summarizer), \
+                patch('src.jobs.job_registry', JobRegistry()):
+            with TestClient(app) as client:
+                yield client
+
+    def wait_for(self, client, task_id):
+        for _ in range(100):
+            job = client.get(f'/summarizer/v1/jobs/{task_id}').json()
+            if job['status'] != 'running':
+                return job
+            time.sleep(0.01)
+        raise AssertionError('job did not finish')
+
+    def parse_events(self, text):
+        events = []
+        for message in text.strip().split('\n\n'):
+            lines = dict(line.split(': ', 1) for line in message.split('\n'))
+            events.append((int(lines['id']), json.loads(lines['data'])))
+        return events
+
+    def test_submit_and_fetch_result(self, job_client, paragraphs):
+        response = job_client.post('/summarizer/v1/jobs', content=json.dumps({'paragraphs': paragraphs}))
+        assert response.status_code == 202
+        job = self.wait_for(job_client, response.json()['task_id'])
+        assert job['status'] == 'completed'
+        assert job['summary'].strip() == 'Summary of the given content.'
+
+    def test_reattach_with_last_event_id(self, job_client, paragraphs):
+        task_id = job_client.post('/summarizer/v1/jobs', content=json.dumps({'paragraphs': paragraphs})).json()['task_id']
+        self.wait_for(job_client, task_id)
+
+        events = self.parse_events(job_client.get(f'/summarizer/v1/jobs/{task_id}/events').text)
+        assert events[-1][1]['type'] == 'completed'
+        resume_from = events[2][0]
+        resumed = self.parse_events(job_client.get(f'/summarizer/v1/jobs/{task_id}/events',
+                                                   headers={'Last-Event-ID': str(resume_from)}).text)
+        assert resumed == events[3:]
+
+    def test_resume_past_replay_buffer_reports_gap(self, job_client, offline_summarizer, paragraphs):
+        offline_summarizer.task_manager.replay_size = 2
+        task_id = job_client.post('/summarizer/v1/jobs', content=json.dumps({'paragraphs': paragraphs})).json()['task_id']
+        self.wait_for(job_client, task_id)
+
+        resumed = self.parse_events(job_client.get(f'/summarizer/v1/jobs/{task_id}/events',
+                                                   headers={'Last-Event-ID': '1'}).text)
+        gap_id, gap = resumed[0]
+        assert gap['type'] == 'reset' and gap['missed_after'] == 1
+        assert gap_id == resumed[1][0] - 1 == gap['resumes_at'] - 1
+        assert len(resumed) == 3 and resumed[-1][1]['type'] == 'completed'
+
+    def test_failed_job_lookup_succeeds(self, job_client, offline_summarizer, paragraphs):
+        with patch.object(offline_summarizer, 'process_text', side_effect=Exception('LLM down')):
+            task_id = job_client.post('/summarizer/v1/jobs',
+                                      content=json.dumps({'paragraphs': paragraphs})).json()['task_id']
+            self.wait_for(job_client, task_id)
+        response = job_client.get(f'/summarizer/v1/jobs/{task_id}')
+        assert response.status_code == 200
+        assert response.json()['status'] == 'failed' and response.json()['error'] == 'LLM down'
+
+    def test_unknown_job(self, job_client):
+        assert job_client.get('/summarizer/v1/jobs/missing').status_code == 404
+
+    def test_finished_jobs_are_evicted(self, offline_summarizer):
+        registry = JobRegistry(ttl=60, max_finished=1)
+        for task_id, age in [('expired', 120), ('older', 30), ('newer', 10)]:
+            job = Job(task_id, offline_summarizer)
+            job.finished_at = time.time() - age
+            registry._jobs[task_id] = job
+        registry.evict()
+        assert list(registry._jobs) == ['newer']
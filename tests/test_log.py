@@ -0,0 +1,36 @@
+import json
+import queue
+import logging
+from src.log import (JSONFormatter, ContextFilter, SamplingFilter, DeferredQueueHandler,
+                     task_id_var)
+
+
+class TestLogging:
+
+    def make_record(self, level=logging.INFO, msg='Primary count: %s', args=(3,)):
+        return logging.LogRecord('src.executor', level, __file__, 1, msg, args, None)
+
+    def test_records_carry_task_id_as_json(self):
+        token = task_id_var.set('task-1')
+        try:
+            record = self.make_record()
+            ContextFilter().filter(record)
+        finally:
+            task_id_var.reset(token)
+        entry = json.loads(JSONFormatter().format(record))
+        assert entry['task_id'] == 'task-1'
+        assert entry['message'] == 'Primary count: 3'
+        assert entry['level'] == 'INFO'
+
+    def test_queue_handler_defers_formatting(self):
+        log_queue = queue.SimpleQueue()
+        handler = DeferredQueueHandler(log_queue)
+        handler.handle(self.make_record())
+        queued = log_queue.get_nowait()
+        assert queued.msg == 'Primary count: %s'
+        assert queued.args == (3,)
+
+    def test_debug_records_are_sampled(self):
+        sampler = SamplingFilter(rate=0.0)
+        assert not sampler.filter(self.make_record(level=logging.DEBUG))
+        assert sampler.filter(self.make_record(level=logging.WARNING))
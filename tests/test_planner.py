@@ -0,0 +1,73 @@
+import pytest
+from unittest.mock import patch
+from src.models import SummaryRequestModel
+from src.executor import build_summarizer
+from src.planner import plan_request, estimate_plan
+from src.retry import LatencyTracker
+from tests.fixtures import (offline_summarizer, fake_llm, task_id, paragraphs,
+                            system_prompt, primary_prompt, secondary_reduction_prompt, final_reduction_prompt)
+
+# ~150k tokens
+LONG_DOCUMENT = ["word " * 300] * 400
+
+
+class TestPlanner:
+
+    def test_estimate_counts_reduction_levels(self):
+        # Fan-in is capped at 6000 // 700 = 8 summaries per reduction call
+        flat = estimate_plan(40000, 2000, 10, 20, 700, 6000, call_latency=1.0)
+        deep = estimate_plan(40000, 2000, 2, 20, 700, 6000, call_latency=1.0)
+
+        assert (flat["calls"], flat["levels"]) == (20 + 3 + 1, 1)
+        assert (deep["calls"], deep["levels"]) == (20 + 10 + 5 + 1, 2)
+        assert deep["latency"] > flat["latency"]
+
+    def test_fastest_plan_within_context(self):
+        plan = plan_request(LONG_DOCUMENT, context_tokens=8192, max_tokens=700, max_parallel=32)
+
+        assert plan.primary_chunk_tokens + 300 + 700 <= 8192
+        assert plan.final_input_tokens <= 8192 - 300 - 700
+        assert plan.max_parallel_requests <= 32
+        assert plan.latency_source == "default" and plan.meets_target is None
+
+    def test_target_latency_trades_speed_for_cost(self):
+        fastest = plan_request(LONG_DOCUMENT, 8192, 700, 32)
+        relaxed = plan_request(LONG_DOCUMENT, 8192, 700, 32, target_latency=fastest.estimated_latency * 3)
+        impossible = plan_request(LONG_DOCUMENT, 8192, 700, 32, target_latency=0.1)
+
+        assert relaxed.meets_target
+        assert relaxed.estimated_tokens <= fastest.estimated_tokens
+        assert relaxed.max_parallel_requests <= fastest.max_parallel_requests
+        assert impossible.meets_target is False
+        assert impossible.estimated_latency == fastest.estimated_latency
+
+    def test_token_budget_and_observed_latency(self):
+        latencies = LatencyTracker()
+        for _ in range(10):
+            latencies.add(2.0)
+        cheapest = min(estimate_plan(150000, size, 16, 32, 700, 15384, 2.0)["tokens"]
+                       for size in (500, 1000, 2000, 4000, 8000, 12000))
+        plan = plan_request(LONG_DOCUMENT, 16384, 700, 32, latencies, token_budget=cheapest)
+
+        assert plan.latency_source == "observed" and plan.call_latency == 2.0
+        assert plan.estimated_tokens <= cheapest
+
+    @pytest.mark.asyncio
+    async def test_plan_reported_with_result(self, offline_summarizer, task_id, paragraphs,
+                                             system_prompt, primary_prompt,
+                                             secondary_reduction_prompt, final_reduction_prompt):
+        request = SummaryRequestModel(paragraphs=paragraphs, auto_tune=True, context_tokens=4096)
+        with patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'}):
+            configured = build_summarizer(request)
+        offline_summarizer.config = configured.config
+        offline_summarizer.plan = configured.plan
+        queue = await offline_summarizer.task_manager.create_subscriber(task_id)
+        result = await offline_summarizer.summarize(task_id, paragraphs, system_prompt, primary_prompt,
+                                                    secondary_reduction_prompt, final_reduction_prompt)
+        events = [queue.get_nowait() for _ in range(queue.qsize())]
+        completed = [event for event in events if event['type'] == 'completed'][-1]
+
+        assert configured.config.chunking_mode == "tokens"
+        assert configured.config.primary_chunk_tokens == configured.plan.primary_chunk_tokens
+        assert result.plan == completed['plan'] == configured.plan.to_dict()
+        assert list(completed)[-1] == 'message'
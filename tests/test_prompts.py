@@ -0,0 +1,44 @@
+import os
+import json
+import pytest
+from src.prompts import PromptRegistry, PROMPT_DIR
+from tests.fixtures import client
+
+
+class TestPromptRegistry:
+
+    @pytest.fixture
+    def template_dir(self, tmp_path):
+        (tmp_path / 'primary_prompt.txt').write_text('default primary')
+        (tmp_path / 'system_prompt.txt').write_text('default system')
+        (tmp_path / 'v2').mkdir()
+        (tmp_path / 'v2' / 'primary_prompt.txt').write_text('v2 primary')
+        return tmp_path
+
+    def test_repository_templates_resolve_from_any_cwd(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        registry = PromptRegistry(PROMPT_DIR)
+        assert registry.get('system_prompt').startswith('Create a polished final summary')
+
+    def test_versions_fall_back_to_default(self, template_dir):
+        registry = PromptRegistry(template_dir)
+        assert registry.get('primary_prompt', 'v2') == 'v2 primary'
+        assert registry.get('system_prompt', 'v2') == 'default system'
+        with pytest.raises(KeyError):
+            registry.get('primary_prompt', 'v3')
+
+    def test_reload_on_mtime_change(self, template_dir):
+        registry = PromptRegistry(template_dir)
+        registry.load()
+        assert not registry.load()
+        path = template_dir / 'primary_prompt.txt'
+        path.write_text('edited primary')
+        os.utime(path, (path.stat().st_atime, path.stat().st_mtime + 10))
+        assert registry.load()
+        assert registry.get('primary_prompt') == 'edited primary'
+
+    def test_unknown_version_is_rejected(self, client):
+        kwargs = {'paragraphs': ['Some paragraph to summarize.'], 'prompt_version': 'does-not-exist'}
+        response = client.post(url='/summarizer/v1/summarize', content=json.dumps(kwargs))
+        assert response.status_code == 422
+        assert 'does-not-exist' in response.json()['message']
@@ -0,0 +1,68 @@
+import pytest
+from tests.fixtures import (offline_summarizer, fake_llm, task_id, paragraphs,
+                            system_prompt, primary_prompt, secondary_reduction_prompt, final_reduction_prompt)
+
+
+class TestReductionTree:
+
+    async def run(self, summarizer, task_id, paragraphs, *prompts):
+        queue = await summarizer.task_manager.create_subscriber(task_id)
+        await summarizer.process_text(task_id, paragraphs, *prompts)
+        events = []
+        while not queue.empty():
+            events.append(queue.get_nowait())
+        return events
+
+    def test_reduction_groups_respect_fan_in(self, offline_summarizer):
+        offline_summarizer.config.secondary_chunk_size = 3
+        groups = offline_summarizer.create_reduction_groups([f"summary {i}" for i in range(10)])
+        assert [len(group) for group in groups] == [3, 3, 3, 1]
+
+    def test_reduction_groups_respect_token_budget(self, offline_summarizer):
+        offline_summarizer.config.secondary_chunk_size = 0
+        offline_summarizer.config.final_input_tokens = 100
+        groups = offline_summarizer.create_reduction_groups(["x" * 160] * 6)
+        assert [len(group) for group in groups] == [2, 2, 2]
+
+    @pytest.mark.asyncio
+    async def test_small_input_skips_extra_levels(self, offline_summarizer, task_id, paragraphs,
+                                                  system_prompt, primary_prompt,
+                                                  secondary_reduction_prompt, final_reduction_prompt):
+        offline_summarizer.config.primary_chunk_size = 2
+        events = await self.run(offline_summarizer, task_id, paragraphs, system_prompt, primary_prompt,
+                                secondary_reduction_prompt, final_reduction_prompt)
+        assert not [e for e in events if e['type'] == 'secondary_progress']
+        assert events[-1]['type'] == 'completed'
+
+    @pytest.mark.asyncio
+    async def test_tree_depth_adapts_to_budget(self, offline_summarizer, fake_llm, task_id, paragraphs,
+                                               system_prompt, primary_prompt,
+                                               secondary_reduction_prompt, final_reduction_prompt):
+        fake_llm.reply = "word " * 100
+        offline_summarizer.config.primary_chunk_size = 1
+        offline_summarizer.config.secondary_chunk_size = 2
+        offline_summarizer.config.final_input_tokens = 300
+        offline_summarizer.config.max_tokens_per_request = 125
+        events = await self.run(offline_summarizer, task_id, paragraphs * 4, system_prompt, primary_prompt,
+                                secondary_reduction_prompt, final_reduction_prompt)
+        levels = {e['level'] for e in events if e['type'] == 'secondary_progress'}
+        # 16 summaries of ~125 tokens need to come down to two to fit in 300 tokens
+        assert levels == {1, 2, 3}
+        assert events[-1]['type'] == 'completed'
+
+    @pytest.mark.asyncio
+    async def test_reduction_starts_before_slowest_primary(self, offline_summarizer, fake_llm, task_id,
+                                                           paragraphs, system_prompt, primary_prompt,
+                                                           secondary_reduction_prompt, final_reduction_prompt):
+        slow_paragraph = paragraphs[0]
+        fake_llm.delay = lambda kwargs: 0.2 if slow_paragraph in kwargs['messages'][1]['content'] else 0.0
+        offline_summarizer.config.primary_chunk_size = 1
+        offline_summarizer.config.secondary_chunk_size = 2
+        offline_summarizer.config.final_input_tokens = 100
+        offline_summarizer.config.max_tokens_per_request = 100
+        events = await self.run(offline_summarizer, task_id, paragraphs, system_prompt, primary_prompt,
+                                secondary_reduction_prompt, final_reduction_prompt)
+        order = [(e['type'], e.get('level'), e['chunk']) for e in events if 'chunk' in e]
+        # The second reduction group does not wait for the slow first primary chunk
+        assert order.index(('secondary_progress', 1, 2)) < order.index(('primary_progress', None, 1))
+        assert events[-1]['type'] == 'completed'
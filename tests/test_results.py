@@ -0,0 +1,120 @@
+import json
+import asyncio
+import httpx
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from src.cache import MemoryCache, create_cache
+from src.endpoints import app
+from src.models import SummaryRequestModel
+from src.results import ResultStore, request_key
+from tests.fixtures import (client, offline_summarizer, fake_llm, task_id, paragraphs,
+                            system_prompt, primary_prompt, secondary_reduction_prompt, final_reduction_prompt)
+
+
+class TestResults:
+
+    def test_key_ignores_whitespace_and_delivery(self, paragraphs):
+        prompts = ("system", "primary", "secondary", "final")
+        key = request_key(SummaryRequestModel(paragraphs=paragraphs), prompts, "test-model")
+        spaced = [f"  {paragraph.replace(' ', '   ')}\n" for paragraph in paragraphs]
+
+        assert request_key(SummaryRequestModel(paragraphs=spaced, stream=True, max_parallel_requests=2),
+                           prompts, "test-model") == key
+        assert request_key(SummaryRequestModel(paragraphs=paragraphs, temperature=0.9), prompts, "test-model") != key
+        assert request_key(SummaryRequestModel(paragraphs=paragraphs), prompts, "other-model") != key
+        assert request_key(SummaryRequestModel(paragraphs=paragraphs), ("other",) + prompts[1:], "test-model") != key
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_share_one_run(self, offline_summarizer, fake_llm, task_id, paragraphs,
+                                                    system_prompt, primary_prompt,
+                                                    secondary_reduction_prompt, final_reduction_prompt):
+        prompts = (system_prompt, primary_prompt, secondary_reduction_prompt, final_reduction_prompt)
+        store = ResultStore(MemoryCache())
+        fake_llm.delay = 0.01
+        flight = store.start("key", task_id, offline_summarizer,
+                             offline_summarizer.summarize(task_id, paragraphs, *prompts))
+        attached = store.attach("key")
+        queue = await offline_summarizer.task_manager.create_subscriber(attached.task_id)
+        first, second = await asyncio.gather(flight.task, attached.task)
+        events = [queue.get_nowait()['type'] for _ in range(queue.qsize())]
+
+        assert attached is flight
+        assert first is second
+        assert events[-1] == 'completed'
+        assert first.stats['llm_calls'] == len(fake_llm.calls)
+        assert (await store.get("key"))['summary'] == first.summary
+        assert store.stats()['in_flight'] == 0 and store.stats()['attached'] == 1
+        assert not offline_summarizer.task_manager.tasks
+
+    def test_repeated_request_is_served_from_store(self, client, paragraphs, offline_summarizer, fake_llm):
+        body = json.dumps({'paragraphs': paragraphs, 'stream': False, 'reuse_results': True})
+        with patch('src.executor.build_summarizer', return_value=offline_summarizer), \
+                patch('src.executor.result_store', ResultStore(MemoryCache())):
+            first = client.post(url='/summarizer/v1/summarize', content=body).json()
+            calls = len(fake_llm.calls)
+            second = client.post(url='/summarizer/v1/summarize', content=body).json()
+            streamed = client.post(url='/summarizer/v1/summarize',
+                                   content=json.dumps({'paragraphs': paragraphs, 'stream': True,
+                                                       'reuse_results': True}))
+            reused_calls = len(fake_llm.calls)
+            default = client.post(url='/summarizer/v1/summarize',
+                                  content=json.dumps({'paragraphs': paragraphs})).json()
+
+        assert first['cache_hit'] is False and first['attached'] is False
+        assert second['cache_hit'] is True
+        assert second['summary'] == first['summary']
+        assert second['stats'] == first['stats']
+        assert reused_calls == calls
+        assert '"type": "final_summary"' in streamed.text and '"cache_hit": true' in streamed.text
+        assert default['cache_hit'] is False and len(fake_llm.calls) > reused_calls
+
+    @pytest.mark.asyncio
+    async def test_stream_attaching_during_final_call_gets_summary(self, offline_summarizer, fake_llm, paragraphs,
+                                                                   final_reduction_prompt):
+        def is_final(call):
+            return any(final_reduction_prompt in message['content'] for message in call['messages'])
+
+        fake_llm.delay = lambda kwargs: 0.1 if is_final(kwargs) else 0
+        transport = httpx.ASGITransport(app=app)
+        with patch('src.executor.build_summarizer', return_value=offline_summarizer), \
+                patch('src.executor.result_store', ResultStore(MemoryCache())):
+            async with httpx.AsyncClient(transport=transport, base_url="http://app") as client:
+                url = '/summarizer/v1/summarize'
+                body = {'paragraphs': paragraphs, 'final_reduction_prompt': final_reduction_prompt,
+                        'reuse_results': True}
+                starter = asyncio.create_task(client.post(url, json=body))
+                # The stream request attaches once the non-streaming request's final call is running
+                for _ in range(200):
+                    if any(is_final(call) for call in fake_llm.calls):
+                        break
+                    await asyncio.sleep(0.005)
+                streamed = await client.post(url, json={**body, 'stream': True})
+                result = (await starter).json()
+
+        events = [json.loads(line[len('data: '):]) for line in streamed.text.split('\n') if line.startswith('data: ')]
+        tokens = ''.join(event['token'] for event in events if event['type'] == 'final_summary')
+        assert events[-1]['type'] == 'completed' and 'cache_hit' not in events[-1]
+        assert result['attached'] is False
+        assert tokens == result['summary'] and result['summary'].strip() == 'Summary of the given content.'
+
+    @pytest.mark.asyncio
+    async def test_fallback_results_are_not_stored(self, offline_summarizer, task_id):
+        store = ResultStore(MemoryCache())
+
+        async def degraded_run():
+            return SimpleNamespace(summary="extracted", timings={}, plan=None,
+                                   stats={'stages': {'primary': {'fallbacks': 1}, 'final': {'fallbacks': 0}}})
+
+        result = await store.start("key", task_id, offline_summarizer, degraded_run()).task
+        assert result.summary == "extracted"
+        assert await store.get("key") is None
+
+    @pytest.mark.asyncio
+    async def test_sqlite_store_expires(self, tmp_path):
+        store = ResultStore(create_cache("sqlite", max_entries=10, ttl=0.05, path=str(tmp_path / "results.sqlite3")))
+        await store.put("key", {"summary": "stored"})
+
+        assert (await store.get("key"))['summary'] == "stored"
+        await asyncio.sleep(0.1)
+        assert await store.get("key") is None
@@ -0,0 +1,94 @@
+import pytest
+import asyncio
+import httpx
+from fastapi.exceptions import HTTPException
+from openai import RateLimitError, APIConnectionError, OpenAIError
+from src.retry import RetryPolicy, LatencyTracker, call_with_retry, backoff_delay
+from tests.fixtures import offline_summarizer, fake_llm, task_id, system_prompt, primary_prompt
+
+
+def rate_limit_error(retry_after: str) -> RateLimitError:
+    request = httpx.Request('POST', 'http://llm/v1/chat/completions')
+    response = httpx.Response(429, headers={'retry-after': retry_after}, request=request)
+    return RateLimitError('rate limited', response=response, body=None)
+
+
+class TestRetry:
+
+    def test_backoff_honours_retry_after(self):
+        policy = RetryPolicy(base_delay=0.01, max_delay=5)
+        assert backoff_delay(policy, 0, rate_limit_error('2')) >= 2
+        assert backoff_delay(policy, 0, RuntimeError()) <= 0.01
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_errors(self):
+        attempts, retries = [], []
+        async def call(started):
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise APIConnectionError(request=httpx.Request('POST', 'http://llm'))
+            return 'ok'
+        async def on_retry(attempt, delay, error):
+            retries.append(attempt)
+
+        result = await call_with_retry(call, RetryPolicy(base_delay=0.001), on_retry=on_retry)
+        assert result == 'ok'
+        assert retries == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_non_retryable_error_fails_fast(self):
+        attempts = []
+        async def call(started):
+            attempts.append(1)
+            raise OpenAIError('bad request')
+        with pytest.raises(OpenAIError):
+            await call_with_retry(call, RetryPolicy(base_delay=0.001))
+        assert len(attempts) == 1
+
+    @pytest.mark.asyncio
+    async def test_hedged_request_beats_straggler(self):
+        latencies = LatencyTracker()
+        for _ in range(20):
+            latencies.add(0.01)
+        calls, hedges = [], []
+        async def call(started):
+            started.set()
+            calls.append(1)
+            await asyncio.sleep(1.0 if len(calls) == 1 else 0.01)
+            return f'call {len(calls)}'
+        async def on_hedge():
+            hedges.append(1)
+
+        policy = RetryPolicy(hedge_percentile=95, hedge_min_samples=20)
+        result = await asyncio.wait_for(call_with_retry(call, policy, latencies, on_hedge=on_hedge), 0.5)
+        assert result == 'call 2'
+        assert hedges == [1]
+
+    @pytest.mark.asyncio
+    async def test_process_chunk_reports_retries(self, offline_summarizer, fake_llm, task_id,
+                                                 system_prompt, primary_prompt):
+        failures = [rate_limit_error('0'), rate_limit_error('0')]
+        original = fake_llm.create
+        async def flaky_create(**kwargs):
+            if failures:
+                raise failures.pop()
+            return await original(**kwargs)
+        fake_llm.create = flaky_create
+        offline_summarizer.retry_policy.base_delay = 0.001
+        queue = await offline_summarizer.task_manager.create_subscriber(task_id)
+
+        summary = await offline_summarizer.process_chunk(system_prompt, primary_prompt, task_id)
+        assert summary == fake_llm.reply
+        events = [queue.get_nowait() for _ in range(queue.qsize())]
+        assert [e['attempt'] for e in events if e['type'] == 'retry'] == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_process_chunk_fails_job_after_retries(self, offline_summarizer, fake_llm,
+                                                         system_prompt, primary_prompt):
+        async def broken_create(**kwargs):
+            raise rate_limit_error('0')
+        fake_llm.create = broken_create
+        offline_summarizer.retry_policy.base_delay = 0.001
+        with pytest.raises(HTTPException) as error:
+            await offline_summarizer.process_chunk(system_prompt, primary_prompt)
+        assert error.value.status_code == 503
@@ -0,0 +1,85 @@
+import httpx
+import pytest
+from openai import APIConnectionError
+from src.executor import Summarizer, SummaryConfig, TaskManager
+from src.cache import NullCache
+from src.router import Endpoint, LLMRouter, NoEndpointAvailable, parse_endpoints, OPEN, HALF_OPEN, CLOSED
+from benchmarks.mock_llm import MockConfig, create_app
+from tests.fixtures import system_prompt, primary_prompt
+
+
+def mock_endpoint(name: str, weight: float = 1.0, **config) -> Endpoint:
+    transport = httpx.ASGITransport(app=create_app(MockConfig(latency="fixed:0", token_rate=0, **config)))
+    return Endpoint(f"http://{name}/v1", weight, api_key="mock-key",
+                    http_client=httpx.AsyncClient(transport=transport))
+
+
+def connection_error() -> APIConnectionError:
+    return APIConnectionError(request=httpx.Request('POST', 'http://llm'))
+
+
+class TestRouter:
+
+    def test_parse_endpoints(self):
+        endpoints = parse_endpoints("http://a/v1|2, http://b/v1,")
+        assert [(e.base_url, e.weight) for e in endpoints] == [("http://a/v1", 2.0), ("http://b/v1", 1.0)]
+
+    def test_selects_lowest_ewma_latency_per_load(self):
+        fast, slow = Endpoint("http://fast/v1"), Endpoint("http://slow/v1")
+        router = LLMRouter([slow, fast])
+        router.record_success(fast, 0.1)
+        router.record_success(slow, 1.0)
+        assert router.select() is fast
+        fast.outstanding = 20
+        assert router.select() is slow
+        assert LLMRouter([slow, fast], strategy="least_outstanding").select() is slow
+
+    def test_circuit_breaker_ejects_and_probes(self):
+        first, second = Endpoint("http://a/v1"), Endpoint("http://b/v1")
+        router = LLMRouter([first, second], failure_threshold=2, reset_timeout=60)
+        for _ in range(2):
+            router.record_failure(first, connection_error())
+        assert first.state == OPEN
+        assert router.select() is second
+        router.record_failure(second, connection_error())
+        router.record_failure(second, connection_error())
+        with pytest.raises(NoEndpointAvailable):
+            router.select()
+
+        router.reset_timeout = 0
+        assert router.select() in (first, second)
+        assert first.state == HALF_OPEN
+        router.record_failure(first, connection_error())
+        assert first.state == OPEN and first.ejections == 2
+        router.record_success(second, 0.2)
+        assert second.state == CLOSED and second.failures == 0
+
+    @pytest.mark.asyncio
+    async def test_routes_chunks_around_a_failing_endpoint(self, system_prompt, primary_prompt):
+        healthy, broken = mock_endpoint("healthy"), mock_endpoint("broken", weight=10, error_rate=1.0)
+        router = LLMRouter([broken, healthy], failure_threshold=1, reset_timeout=60, health_interval=0)
+        summarizer = Summarizer("mock-key", SummaryConfig(model="mock-model"), cache=NullCache(),
+                                task_manager=TaskManager(), router=router)
+        summarizer.retry_policy.base_delay = 0.001
+
+        summaries = [await summarizer.process_chunk(system_prompt, primary_prompt, chunk_idx=i) for i in range(5)]
+
+        assert all(summaries)
+        assert broken.state == OPEN and broken.calls == 1
+        assert healthy.calls == 5 and healthy.ewma_latency is not None
+        assert router.stats()['endpoints'][0]['ejections'] == 1
+
+    @pytest.mark.asyncio
+    async def test_active_health_check(self):
+        endpoint = mock_endpoint("up")
+        unreachable = Endpoint("http://down/v1", api_key="mock-key",
+                               http_client=httpx.AsyncClient(transport=httpx.MockTransport(
+                                   lambda request: httpx.Response(503))))
+        router = LLMRouter([endpoint, unreachable], health_interval=0)
+        router.record_failure(endpoint, connection_error())
+        endpoint.state, unreachable.state = OPEN, CLOSED
+        await router.check_all()
+
+        assert endpoint.healthy and endpoint.state == HALF_OPEN
+        assert not unreachable.healthy
+        assert router.select() is endpoint
@@ -0,0 +1,76 @@
+import pytest
+import asyncio
+from pydantic import ValidationError
+from src.models import SummaryRequestModel
+from tests.fixtures import llm_scheduler
+
+
+class TestLLMScheduler:
+
+    @pytest.mark.asyncio
+    async def test_per_task_limit(self, llm_scheduler):
+        peak = 0
+        async def call():
+            nonlocal peak
+            async with llm_scheduler.slot('job_a', limit=2):
+                peak = max(peak, llm_scheduler.stats()['in_flight_per_task']['job_a'])
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*[call() for _ in range(10)])
+        assert peak == 2
+        assert llm_scheduler.stats()['in_flight'] == 0
+
+    @pytest.mark.asyncio
+    async def test_global_limit(self, llm_scheduler):
+        peak = 0
+        async def call(task_id):
+            nonlocal peak
+            async with llm_scheduler.slot(task_id, limit=10):
+                peak = max(peak, llm_scheduler.stats()['in_flight'])
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*[call(f'job_{i % 3}') for i in range(30)])
+        assert peak == llm_scheduler.max_concurrency
+
+    @pytest.mark.asyncio
+    async def test_fair_queuing(self, llm_scheduler):
+        order = []
+        async def call(task_id):
+            async with llm_scheduler.slot(task_id, limit=4):
+                order.append(task_id)
+                await asyncio.sleep(0.01)
+
+        big_job = [call('big') for _ in range(20)]
+        small_job = [call('small') for _ in range(2)]
+        await asyncio.gather(*big_job, *small_job)
+        # The small job is served within the first round instead of after the big one
+        assert order.index('small') < 6
+        assert llm_scheduler.stats()['queue_depth'] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_releases_queue(self, llm_scheduler):
+        async def hold():
+            async with llm_scheduler.slot('job', limit=1):
+                await asyncio.sleep(0.05)
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(llm_scheduler.acquire('job', limit=1))
+        await asyncio.sleep(0)
+        assert llm_scheduler.stats()['queue_depth'] == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await holder
+        stats = llm_scheduler.stats()
+        assert stats['queue_depth'] == 0
+        assert stats['in_flight'] == 0
+
+    @pytest.mark.asyncio
+    async def test_rejects_non_positive_limit(self, llm_scheduler):
+        for limit in (0, -1):
+            with pytest.raises(ValueError):
+                await llm_scheduler.acquire('job', limit=limit)
+        assert llm_scheduler.stats()['queue_depth'] == 0
+        with pytest.raises(ValidationError):
+            SummaryRequestModel(paragraphs=['text'], max_parallel_requests=-1)
@@ -0,0 +1,51 @@
+import pytest
+from unittest.mock import patch
+from src.models import SummaryRequestModel
+from src.executor import SummaryConfig, build_summarizer
+from tests.fixtures import (offline_summarizer, fake_llm, task_id, paragraphs,
+                            system_prompt, primary_prompt, secondary_reduction_prompt, final_reduction_prompt)
+
+
+class TestStages:
+
+    def test_stage_settings_fall_back_to_shared_ones(self):
+        config = SummaryConfig(model="strong", temperature=0.3, max_tokens_per_request=800,
+                               primary_model="fast", primary_max_tokens=300, final_temperature=0.0)
+        primary, secondary, final = (config.for_stage(stage) for stage in ("primary", "secondary", "final"))
+
+        assert (primary.model, primary.temperature, primary.max_tokens) == ("fast", 0.3, 300)
+        assert (secondary.model, secondary.max_tokens) == ("strong", 800)
+        assert (final.model, final.temperature) == ("strong", 0.0)
+        assert config.max_summary_tokens == 800
+
+    def test_defaults_from_environment(self, paragraphs):
+        environ = {'LLM_PRIMARY_MODEL': 'fast', 'LLM_FINAL_MAX_TOKENS': '1200', 'OPENAI_API_KEY': 'test-key'}
+        with patch.dict('os.environ', environ):
+            request = SummaryRequestModel(paragraphs=paragraphs, final_temperature=0.1)
+            config = build_summarizer(request).config
+        assert (request.primary_model, request.final_max_tokens) == ("fast", 1200)
+        assert request.secondary_model is None
+        assert config.for_stage("primary").model == "fast"
+        assert (config.for_stage("final").temperature, config.for_stage("final").max_tokens) == (0.1, 1200)
+        with patch.dict('os.environ', {'LLM_PRIMARY_MODEL': 'fast'}):
+            assert SummaryRequestModel(paragraphs=paragraphs, primary_model="strong").primary_model == "strong"
+
+    @pytest.mark.asyncio
+    async def test_calls_use_stage_models(self, offline_summarizer, fake_llm, task_id, paragraphs,
+                                          system_prompt, primary_prompt,
+                                          secondary_reduction_prompt, final_reduction_prompt):
+        config = offline_summarizer.config
+        config.primary_chunk_size = 1
+        config.final_input_tokens = 1000
+        config.primary_model, config.primary_max_tokens = "fast-model", 200
+        config.final_model = "strong-model"
+        result = await offline_summarizer.summarize(task_id, paragraphs, system_prompt, primary_prompt,
+                                                    secondary_reduction_prompt, final_reduction_prompt)
+        models = {(call['model'], call['max_tokens']) for call in fake_llm.calls}
+        stages = result.stats['stages']
+
+        assert models == {("fast-model", 200), ("test-model", config.max_tokens_per_request),
+                          ("strong-model", config.max_tokens_per_request)}
+        assert stages['primary']['models'] == ["fast-model"]
+        assert stages['secondary']['models'] == ["test-model"]
+        assert stages['final']['models'] == ["strong-model"]
@@ -0,0 +1,65 @@
+import pytest
+from types import SimpleNamespace
+from src.stats import RunStats, PipelineStats
+from tests.fixtures import (offline_summarizer, fake_llm, task_id, paragraphs,
+                            system_prompt, primary_prompt, secondary_reduction_prompt, final_reduction_prompt)
+
+
+class TestStats:
+
+    def test_run_stats_per_stage(self):
+        run = RunStats()
+        usage = SimpleNamespace(prompt_tokens=100, completion_tokens=20)
+        run.record_call('primary', run.start_time, 0.5, queue_wait=0.1, usage=usage)
+        run.record_call('primary', run.start_time + 0.2, 0.5, usage=usage)
+        run.record_cached('primary')
+        run.record_retry('final')
+        stats = run.to_dict()
+
+        primary = stats['stages']['primary']
+        assert (primary['calls'], primary['cached']) == (2, 1)
+        assert primary['window (sec)'] == pytest.approx([0.0, 0.7])
+        assert primary['queue_wait (sec)']['max'] == 0.1
+        assert stats['tokens'] == {'prompt': 200, 'completion': 40}
+        assert stats['stages']['final']['retries'] == 1
+
+    def test_pipeline_aggregates_runs(self):
+        aggregate = PipelineStats()
+        run = RunStats()
+        run.timings['total'] = 2.0
+        run.record_call('final', run.start_time, 1.5)
+        aggregate.add(run)
+        aggregate.add(RunStats(), failed=True)
+        stats = aggregate.stats()
+
+        assert (stats['runs'], stats['failed']) == (2, 1)
+        assert stats['timings (sec)']['total']['p50'] == 2.0
+        assert stats['stages']['final']['totals']['calls'] == 1
+
+    @pytest.mark.asyncio
+    async def test_completed_event_carries_stats(self, offline_summarizer, task_id, paragraphs,
+                                                 system_prompt, primary_prompt,
+                                                 secondary_reduction_prompt, final_reduction_prompt):
+        prompts = (system_prompt, primary_prompt, secondary_reduction_prompt, final_reduction_prompt)
+        offline_summarizer.config.primary_chunk_size = 2
+        first = await offline_summarizer.summarize(task_id, paragraphs, *prompts)
+        queue = await offline_summarizer.task_manager.create_subscriber(task_id)
+        second = await offline_summarizer.summarize(task_id, paragraphs, *prompts)
+        events = [queue.get_nowait() for _ in range(queue.qsize())]
+        completed = [event for event in events if event['type'] == 'completed'][-1]
+
+        assert first.stats['stages']['primary']['calls'] == 2
+        assert second.stats['stages']['primary'] == completed['stats']['stages']['primary']
+        assert completed['stats']['stages']['primary']['cached'] == 2
+        assert list(completed)[-1] == 'message'
+
+    @pytest.mark.asyncio
+    async def test_streamed_final_records_tokens(self, offline_summarizer, task_id, paragraphs,
+                                                 system_prompt, primary_prompt,
+                                                 secondary_reduction_prompt, final_reduction_prompt):
+        prompts = (system_prompt, primary_prompt, secondary_reduction_prompt, final_reduction_prompt)
+        result = await offline_summarizer.summarize(task_id, paragraphs, *prompts, stream_final=True)
+        final = result.stats['stages']['final']
+
+        assert final['calls'] == 1
+        assert final['tokens'] == {'prompt': 10, 'completion': len(result.summary.split())}
@@ -0,0 +1,77 @@
+import asyncio
+import pytest
+from src.task_backends import TaskManager, TaskManagerBackend, RedisTaskManager, create_task_backend
+from tests.fixtures import task_id
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+class TestTaskBackends:
+
+    @pytest.fixture
+    def redis_backend(self):
+        return RedisTaskManager(fakeredis.aioredis.FakeRedis(), prefix="test", replay_size=3)
+
+    async def next_event(self, queue):
+        return await asyncio.wait_for(queue.get(), timeout=1)
+
+    def test_default_backend_is_in_memory(self):
+        assert isinstance(create_task_backend(), TaskManager)
+
+    def test_incomplete_backend_fails_on_creation(self):
+        class StateOnly(TaskManagerBackend):
+            async def set_state(self, task_id, state):
+                pass
+
+        with pytest.raises(TypeError):
+            StateOnly()
+
+    @pytest.mark.asyncio
+    async def test_memory_state(self, task_id):
+        backend = TaskManager()
+        assert await backend.get_state(task_id) is None
+        await backend.set_state(task_id, {'status': 'running'})
+        assert await backend.get_state(task_id) == {'status': 'running'}
+
+    @pytest.mark.asyncio
+    async def test_redis_pubsub(self, redis_backend, task_id):
+        queue = await redis_backend.create_subscriber(task_id)
+        await redis_backend.broadcast_progress(task_id, 'primary_progress', {'progress': 50})
+        event = await self.next_event(queue)
+        assert event == {'type': 'primary_progress', 'progress': 50}
+        assert event.seq == 1
+        await redis_backend.remove_subscriber(task_id, queue)
+
+    @pytest.mark.asyncio
+    async def test_redis_replay_and_resume(self, redis_backend, task_id):
+        for i in range(5):
+            await redis_backend.broadcast_progress(task_id, 'primary_progress', {'chunk': i})
+        queue = await redis_backend.create_subscriber(task_id)
+        assert [queue.get_nowait().seq for _ in range(queue.qsize())] == [3, 4, 5]
+        resumed = await redis_backend.create_subscriber(task_id, last_event_id=4)
+        await redis_backend.broadcast_progress(task_id, 'completed', {'message': 'done'})
+        assert [(await self.next_event(resumed)).seq for _ in range(2)] == [5, 6]
+        await redis_backend.remove_subscriber(task_id, queue)
+        await redis_backend.remove_subscriber(task_id, resumed)
+
+    @pytest.mark.asyncio
+    async def test_redis_new_run_drops_finished_run_history(self, redis_backend, task_id):
+        await redis_backend.broadcast_progress(task_id, 'completed', {'message': 'done'})
+        stale = await redis_backend.create_subscriber(task_id)
+        await redis_backend.start_run(task_id)
+        await redis_backend.broadcast_progress(task_id, 'primary_progress', {'chunk': 1})
+        assert (await self.next_event(stale)).seq == 2
+        late = await redis_backend.create_subscriber(task_id)
+        assert [late.get_nowait().seq for _ in range(late.qsize())] == [2]
+        await redis_backend.remove_subscriber(task_id, stale)
+        await redis_backend.remove_subscriber(task_id, late)
+
+    @pytest.mark.asyncio
+    async def test_redis_state_shared_between_workers(self, task_id):
+        redis = fakeredis.aioredis.FakeRedis()
+        worker, other = RedisTaskManager(redis), RedisTaskManager(redis)
+        await worker.set_state(task_id, {'status': 'completed', 'summary': 'done'})
+        assert await other.get_state(task_id) == {'status': 'completed', 'summary': 'done'}
+        worker.cleanup_task(task_id)
+        await asyncio.sleep(0.01)
+        assert await other.get_state(task_id) is None
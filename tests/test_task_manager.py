@@ -1,8 +1,14 @@
 import pytest
 import asyncio
 import json
+from types import SimpleNamespace
+from unittest.mock import patch
+from src.executor import TaskManager, create_summary
+from src.events import TokenBatcher
+from src.models import SummaryRequestModel
 from tests.fixtures import (task_id,
-                            task_manager)
+                            task_manager, offline_summarizer, fake_llm, paragraphs,
+                            system_prompt, primary_prompt, secondary_reduction_prompt, final_reduction_prompt)
 
 class TestTaskManager:
     """This will test the async queue management functionality implemented"""
@@ -37,3 +43,144 @@ class TestTaskManager:
         queue = asyncio.Queue()
         await task_manager.remove_subscriber(task_id, queue)
         # Ensure no exceptions are raised even if task_id doesn't exist
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_is_bounded(self, task_id):
+        task_manager = TaskManager(max_buffer=10, overflow_policy='drop')
+        queue = await task_manager.create_subscriber(task_id)
+        for _ in range(100):
+            await task_manager.broadcast_progress(task_id, 'final_summary', {'token': 'a'})
+        await task_manager.broadcast_progress(task_id, 'completed', {'message': 'done'})
+        assert queue.qsize() == 11
+        assert queue.dropped == 90
+
+    @pytest.mark.asyncio
+    async def test_token_events_coalesce(self, task_id):
+        task_manager = TaskManager(max_buffer=5, overflow_policy='coalesce')
+        queue = await task_manager.create_subscriber(task_id)
+        for i in range(20):
+            await task_manager.broadcast_progress(task_id, 'final_summary', {'token': str(i % 10)})
+        events = [queue.get_nowait() for _ in range(queue.qsize())]
+        assert len(events) == 5
+        assert ''.join(e['token'] for e in events) == '0123456789' * 2
+        assert events[-1].seq == 20
+
+    @pytest.mark.asyncio
+    async def test_late_subscriber_replay(self, task_id):
+        task_manager = TaskManager(replay_size=3)
+        for i in range(5):
+            await task_manager.broadcast_progress(task_id, 'primary_progress', {'chunk': i})
+        queue = await task_manager.create_subscriber(task_id)
+        assert [queue.get_nowait()['chunk'] for _ in range(queue.qsize())] == [2, 3, 4]
+        resumed = await task_manager.create_subscriber(task_id, last_event_id=4)
+        assert [resumed.get_nowait()['chunk'] for _ in range(resumed.qsize())] == [4]
+
+    @pytest.mark.asyncio
+    async def test_new_run_drops_finished_run_history(self, task_manager, task_id):
+        live = await task_manager.create_subscriber(task_id)
+        await task_manager.broadcast_progress(task_id, 'primary_progress', {'chunk': 0})
+        await task_manager.broadcast_progress(task_id, 'completed', {'message': 'done'})
+        stale = await task_manager.create_subscriber(task_id)
+        assert stale.qsize() == 2
+
+        await task_manager.start_run(task_id)
+        await task_manager.broadcast_progress(task_id, 'primary_progress', {'chunk': 1})
+        assert [stale.get_nowait().seq for _ in range(stale.qsize())] == [3]
+        # A subscriber of the earlier run still receives that run's events
+        assert [live.get_nowait().seq for _ in range(live.qsize())] == [1, 2, 3]
+        late = await task_manager.create_subscriber(task_id)
+        assert [late.get_nowait()['chunk'] for _ in range(late.qsize())] == [1]
+
+    @pytest.mark.asyncio
+    async def test_events_are_encoded_once(self, task_manager, task_id):
+        first = await task_manager.create_subscriber(task_id)
+        second = await task_manager.create_subscriber(task_id)
+        await task_manager.broadcast_progress(task_id, 'final_summary', {'token': 'a'})
+        line = first.get_nowait().data_line
+        assert line == 'data: {"type": "final_summary", "token": "a"}\n\n'
+        assert second.get_nowait().data_line is line
+
+    @pytest.mark.asyncio
+    async def test_token_batcher_flushes_by_size_and_time(self):
+        emitted = []
+
+        async def emit(text):
+            emitted.append(text)
+
+        batcher = TokenBatcher(emit, flush_interval=0.02, flush_bytes=4)
+        for token in ['ab', 'cd', 'e']:
+            await batcher.add(token)
+        assert emitted == ['abcd']
+        await asyncio.sleep(0.05)
+        assert emitted == ['abcd', 'e']
+        await batcher.add('f')
+        await batcher.aclose()
+        assert emitted == ['abcd', 'e', 'f']
+
+    @pytest.mark.asyncio
+    async def test_failed_stream_flushes_before_error(self, offline_summarizer, fake_llm, task_id, paragraphs,
+                                                      system_prompt, primary_prompt,
+                                                      secondary_reduction_prompt, final_reduction_prompt):
+        async def broken_stream(include_usage):
+            for word in ['partial ', 'summary ']:
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=word))])
+            raise RuntimeError("connection dropped")
+
+        fake_llm._stream = broken_stream
+        offline_summarizer.config.sse_flush_interval = 0.05
+        queue = await offline_summarizer.task_manager.create_subscriber(task_id)
+        with pytest.raises(Exception):
+            await offline_summarizer.summarize(task_id, paragraphs, system_prompt, primary_prompt,
+                                               secondary_reduction_prompt, final_reduction_prompt, stream_final=True)
+        await asyncio.sleep(0.1)
+        events = [queue.get_nowait() for _ in range(queue.qsize())]
+
+        assert [event['type'] for event in events][-2:] == ['final_summary', 'error']
+        assert events[-2]['token'] == 'partial summary '
+
+    @pytest.mark.asyncio
+    async def test_token_batcher_closed(self):
+        emitted = []
+
+        async def emit(text):
+            emitted.append(text)
+
+        batcher = TokenBatcher(emit, flush_interval=0.02, flush_bytes=0)
+        await batcher.add('a')
+        await batcher.aclose()
+        await batcher.add('b')
+        await asyncio.sleep(0.05)
+        assert emitted == ['a', 'b']
+
+    def test_flush_defaults_from_environment(self, paragraphs):
+        with patch.dict('os.environ', {'SSE_FLUSH_INTERVAL': '0.2', 'SSE_FLUSH_BYTES': '64'}):
+            request = SummaryRequestModel(paragraphs=paragraphs)
+        assert (request.sse_flush_interval, request.sse_flush_bytes) == (0.2, 64)
+        with patch.dict('os.environ', {'SSE_FLUSH_INTERVAL': '', 'SSE_FLUSH_BYTES': ''}):
+            request = SummaryRequestModel(paragraphs=paragraphs)
+        assert (request.sse_flush_interval, request.sse_flush_bytes) == (0.05, 512)
+
+    @pytest.mark.asyncio
+    async def test_token_batcher_disabled(self):
+        emitted = []
+
+        async def emit(text):
+            emitted.append(text)
+
+        batcher = TokenBatcher(emit, flush_interval=0, flush_bytes=0)
+        for token in ['a', 'b']:
+            await batcher.add(token)
+        assert emitted == ['a', 'b']
+
+    @pytest.mark.asyncio
+    async def test_stream_disconnect_cleans_up_after_run(self, offline_summarizer, fake_llm, paragraphs):
+        fake_llm.delay = 0.05
+        with patch('src.executor.build_summarizer', return_value=offline_summarizer):
+            response = await create_summary(SummaryRequestModel(paragraphs=paragraphs, stream=True))
+            await response.body_iterator.__anext__()
+            await response.body_iterator.aclose()
+            # The run outlives the client and keeps publishing until it completes
+            await asyncio.sleep(0.3)
+
+        assert fake_llm.calls
+        assert not offline_summarizer.task_manager.tasks
@@ -0,0 +1,49 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+from opentelemetry import trace
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from monitoring.otel import llm_call_span, record_usage
+from tests.fixtures import (offline_summarizer, fake_llm, task_id, paragraphs,
+                            system_prompt, primary_prompt, secondary_reduction_prompt, final_reduction_prompt)
+
+
+class TestTelemetry:
+
+    @pytest.fixture
+    def spans(self):
+        exporter = InMemorySpanExporter()
+        processor = SimpleSpanProcessor(exporter)
+        trace.get_tracer_provider().add_span_processor(processor)
+        yield exporter
+        processor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_llm_calls_get_child_spans(self, spans, offline_summarizer, task_id, paragraphs,
+                                             system_prompt, primary_prompt,
+                                             secondary_reduction_prompt, final_reduction_prompt):
+        offline_summarizer.config.primary_chunk_size = 2
+        await offline_summarizer.summarize(task_id, paragraphs, system_prompt, primary_prompt,
+                                           secondary_reduction_prompt, final_reduction_prompt)
+        finished = spans.get_finished_spans()
+        calls = [span for span in finished if span.name == 'llm_call']
+        parents = {span.context.span_id: span.name for span in finished}
+
+        assert [span.attributes['llm.stage'] for span in calls].count('primary') == 2
+        assert calls[-1].attributes['llm.stage'] == 'final'
+        assert all('llm.latency' in span.attributes for span in calls)
+        assert {parents.get(span.parent.span_id) for span in calls} == {'map_reduce', 'final_summarization'}
+
+    def test_usage_and_errors_are_recorded(self):
+        with patch('monitoring.otel.llm_tokens') as tokens, patch('monitoring.otel.llm_errors') as errors:
+            span = MagicMock()
+            record_usage(span, 'primary', SimpleNamespace(prompt_tokens=120, completion_tokens=30))
+            with pytest.raises(TimeoutError):
+                with llm_call_span({'stage': 'primary', 'chunk': 1}, 'test-model'):
+                    raise TimeoutError()
+
+        span.set_attribute.assert_any_call('llm.usage.prompt_tokens', 120)
+        tokens.add.assert_any_call(30, {'stage': 'primary', 'kind': 'completion'})
+        errors.add.assert_called_once_with(1, {'stage': 'primary', 'model': 'test-model',
+                                               'error.type': 'TimeoutError'})